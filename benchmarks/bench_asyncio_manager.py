@@ -0,0 +1,103 @@
+"""
+Simulate brand checks against a local stub HTTP server and compare the
+thread-based AsyncAPIManager with the event-loop AsyncioWorkManager.
+
+    python -m benchmarks.bench_asyncio_manager --brands 1000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.async_manager import (
+    AsyncAPIManager,
+    AsyncioWorkManager,
+    CoroutineUnit,
+    CustomUnit,
+)
+
+
+def _start_stub_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps({"path": self.path, "status": "succeeded"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_brand(port: int, brand_id: int) -> dict:
+    response = requests.get(f"http://127.0.0.1:{port}/brands/{brand_id}", timeout=30)
+    return response.json()
+
+
+async def check_brand_async(port: int, brand_id: int) -> dict:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /brands/{brand_id} HTTP/1.0\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--threads", type=int, default=AsyncAPIManager.MAX_NUM_THREADS)
+    parser.add_argument(
+        "--per-host", type=int, default=AsyncioWorkManager.MAX_CONCURRENCY
+    )
+    args = parser.parse_args()
+
+    server = _start_stub_server(args.latency_ms / 1000)
+    port = server.server_address[1]
+    host = f"127.0.0.1:{port}"
+
+    try:
+        threaded = AsyncAPIManager(max_num_threads=args.threads)
+        for brand_id in range(args.brands):
+            threaded.add_work_unit(CustomUnit(check_brand, port, brand_id))
+        start = time.perf_counter()
+        threaded_results = threaded.run()
+        threaded_time = time.perf_counter() - start
+
+        event_loop = AsyncioWorkManager(max_per_host=args.per_host)
+        for brand_id in range(args.brands):
+            event_loop.add_work_unit(
+                CoroutineUnit(check_brand_async, port, brand_id, host=host)
+            )
+        start = time.perf_counter()
+        async_results = event_loop.run()
+        async_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    assert threaded_results == async_results
+    print(f"brand checks:                 {args.brands}")
+    print(f"AsyncAPIManager ({args.threads} threads): {threaded_time:.2f} s")
+    print(f"AsyncioWorkManager ({args.per_host}/host):  {async_time:.2f} s")
+    print(f"speedup:                      {threaded_time / async_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Time the vectorised OTL classification in get_all_brand_statuses against
+the previous per-brand, per-channel Python comparisons, at 10k brands x every
+AdvertisementChannel.
+
+    python -m benchmarks.bench_brand_statuses --brands 10000
+"""
+
+import argparse
+import datetime
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import util
+from src.model import AdvertisementChannel, Status
+from src.sql import engine as sql_engine
+from src.sql.fixture import create_fixture_engine, seed_fixture
+
+
+def classify_per_row(last_insight_dates, now):
+    statuses = []
+    for last_insight_in_db in last_insight_dates:
+        if last_insight_in_db is None:
+            statuses.append(Status.UNKNOWN)
+        elif last_insight_in_db < now - datetime.timedelta(
+            days=1
+        ) and last_insight_in_db > now - datetime.timedelta(days=2):
+            statuses.append(Status.WARNING)
+        elif last_insight_in_db < now - datetime.timedelta(days=2):
+            statuses.append(Status.FAILED)
+        else:
+            statuses.append(Status.OK)
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=10_000)
+    parser.add_argument(
+        "--db",
+        action="store_true",
+        help="also time get_all_brand_statuses end to end on a seeded fixture",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = datetime.datetime.now()
+    n_rows = args.brands * len(AdvertisementChannel)
+    ages = rng.exponential(1.5, n_rows)
+    dates = [
+        None if missing else now - datetime.timedelta(days=float(age))
+        for age, missing in zip(ages, rng.random(n_rows) < 0.05)
+    ]
+
+    start = time.perf_counter()
+    expected = classify_per_row(dates, now)
+    per_row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    series = pd.Series(pd.to_datetime(dates))
+    vectorised = util.classify_last_insight_dates(series, now=now)
+    vectorised_time = time.perf_counter() - start
+
+    assert [s.name for s in expected] == list(vectorised)
+    print(f"brand x channel rows: {n_rows}")
+    print(f"per-row classify:     {per_row_time * 1000:.1f} ms")
+    print(f"vectorised classify:  {vectorised_time * 1000:.1f} ms")
+    print(f"speedup:              {per_row_time / vectorised_time:.1f}x")
+
+    if args.db:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = create_fixture_engine(f"sqlite:///{tmp_dir}/fixture.sqlite")
+            seed_fixture(
+                engine,
+                n_brands=args.brands,
+                insight_rows_per_platform_info=5,
+                entities_per_platform_info=0,
+            )
+            sql_engine._engine = engine
+            start = time.perf_counter()
+            statuses = util.get_all_brand_statuses()
+            db_time = time.perf_counter() - start
+        print(
+            f"get_all_brand_statuses on fixture ({len(statuses)} rows, 1 query): "
+            f"{db_time * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
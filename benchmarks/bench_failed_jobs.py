@@ -0,0 +1,83 @@
+"""
+Compare answering "is there a pending failed job?" with one query per brand
+against the FailedJobsMonitor index, on a seeded SQLite fixture.
+
+    python -m benchmarks.bench_failed_jobs --brands 1000 --jobs 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+
+import sqlalchemy
+
+from src.failed_jobs import FAILED_JOBS_RESOLVED_STATUSES, FailedJobsMonitor
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.fixture import create_fixture_engine, seed_failed_jobs, seed_fixture
+from src.sql.tables import FailedJobs, PlatformInfo
+
+
+def query_has_pending(engine, brand_id):
+    stmt = sqlalchemy.select(
+        sqlalchemy.exists()
+        .where(PlatformInfo.brand_id == brand_id)
+        .where(PlatformInfo.deleted_at.is_(None))
+        .where(FailedJobs.platform_id == PlatformInfo.platform_id)
+        .where(FailedJobs.account_id == PlatformInfo.account_id)
+        .where(
+            sqlalchemy.func.lower(FailedJobs.status).not_in(
+                FAILED_JOBS_RESOLVED_STATUSES
+            )
+        )
+    )
+    with engine.connect() as conn:
+        return conn.scalar(stmt)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_fixture_engine(f"sqlite:///{tmp_dir}/fixture.sqlite")
+        seed_fixture(
+            engine,
+            n_brands=args.brands,
+            insight_rows_per_platform_info=0,
+            entities_per_platform_info=0,
+        )
+        seed_failed_jobs(engine, args.jobs)
+        sql_engine._engine = engine
+        brand_ids = sql_manager.get_all_brand_ids()
+
+        start = time.perf_counter()
+        expected = {b: query_has_pending(engine, b) for b in brand_ids}
+        query_time = time.perf_counter() - start
+
+        monitor = FailedJobsMonitor()
+        start = time.perf_counter()
+        monitor.refresh()
+        load_time = time.perf_counter() - start
+        start = time.perf_counter()
+        monitor.refresh()
+        refresh_time = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = {b: monitor.has_pending(b) for b in brand_ids}
+        lookup_time = time.perf_counter() - start
+
+    assert actual == expected, "monitor disagrees with the per-brand query"
+    print(f"brands: {len(brand_ids)}, failed jobs: {args.jobs}")
+    print(f"query per brand:        {query_time * 1000:10.1f} ms")
+    print(f"monitor initial load:   {load_time * 1000:10.1f} ms")
+    print(f"monitor refresh:        {refresh_time * 1000:10.1f} ms")
+    print(f"monitor lookups:        {lookup_time * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
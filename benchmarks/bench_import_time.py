@@ -0,0 +1,78 @@
+"""
+Report the cost of importing the dashboard modules, using the interpreter's
+own `-X importtime` instrumentation in a fresh subprocess per module.
+
+    python -m benchmarks.bench_import_time --top 15
+
+Importing must not touch the network: the run uses Secrets Manager mode with
+no SECRET_NAME configured, so any secret lookup at import time fails loudly.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = [
+    "src.secrets_manager",
+    "src.sql.engine",
+    "src.sql",
+    "src.sql.sql_manager",
+    "src.util",
+    "src.airbyte_util",
+]
+
+
+def _import_time(module: str, env: dict):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    wall = time.perf_counter() - start
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        entries.append((int(cumulative_us), int(self_us), name.strip()))
+    return proc.returncode, wall, entries, proc.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["USE_SECRET_MANAGER"] = "True"
+    env.pop("SECRET_NAME", None)
+    env.pop("LOCAL_TO_PROD", None)
+    env["PYTHONPATH"] = os.getcwd()
+
+    for module in args.modules:
+        returncode, wall, entries, stderr = _import_time(module, env)
+        if returncode != 0:
+            print(f"{module}: import FAILED")
+            errors = [l for l in stderr.splitlines() if not l.startswith("import time")]
+            print(errors[-1] if errors else "")
+            continue
+        own = [e for e in entries if e[2].lstrip().startswith("src")]
+        total_us = max((e[0] for e in entries), default=0)
+        print(
+            f"{module}: wall {wall * 1000:.0f} ms, "
+            f"import tree {total_us / 1000:.0f} ms"
+        )
+        for cumulative_us, self_us, name in sorted(entries, reverse=True)[: args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+        for cumulative_us, self_us, name in own:
+            print(f"  {self_us / 1000:8.1f} ms self        {name}")
+
+
+if __name__ == "__main__":
+    main()
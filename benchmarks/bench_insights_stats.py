@@ -0,0 +1,107 @@
+"""
+Compare the batched get_insights_stats query against the previous
+one-query-per-insight-table loop on a seeded SQLite fixture.
+
+    python -m benchmarks.bench_insights_stats --brands 2000 --rows 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+
+import sqlalchemy
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.model import AdvertisementChannel
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.fixture import create_fixture_engine, seed_fixture
+from src.sql.tables import Brands, PlatformInfo
+
+
+def legacy_get_insights_stats(engine):
+    statistics = {}
+    with Session(engine) as session:
+        for table in sql_manager.INSIGHT_TABLES:
+            stmt = (
+                sqlalchemy.select(
+                    Brands.id,
+                    Brands.name,
+                    PlatformInfo.platform_id,
+                    func.max(table.date).label(f"latest_{table.__tablename__}_date"),
+                )
+                .join(PlatformInfo, Brands.id == PlatformInfo.brand_id)
+                .outerjoin(table, PlatformInfo.id == table.platform_info_id)
+                .where(Brands.is_active.is_(True))
+                .where(PlatformInfo.deleted_at.is_(None))
+                .group_by(Brands.id, PlatformInfo.platform_id)
+            )
+            for row in session.execute(stmt).fetchall():
+                row = row._asdict()
+                row["platform"] = AdvertisementChannel(row["platform_id"]).name
+                statistics.setdefault(f'{row["id"]}|{row["platform_id"]}', []).append(
+                    row
+                )
+
+    unified_list = []
+    for val_list in statistics.values():
+        unified_entry = {
+            "brand_id": val_list[0]["id"],
+            "brand_name": val_list[0]["name"],
+            "platform": val_list[0]["platform"],
+        }
+        for val in val_list:
+            for k in val:
+                if "date" in k:
+                    unified_entry[k] = val[k].strftime("%Y-%m-%d") if val[k] else "NULL"
+        unified_list.append(unified_entry)
+    return unified_list
+
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_fixture_engine(f"sqlite:///{tmp_dir}/fixture.sqlite")
+        seed_fixture(
+            engine, n_brands=args.brands, insight_rows_per_platform_info=args.rows
+        )
+        sql_engine._engine = engine
+
+        legacy_time, legacy = _best_of(
+            lambda: legacy_get_insights_stats(engine), args.repeat
+        )
+        batched_time, batched = _best_of(
+            lambda: sql_manager.get_insights_stats_columns.__wrapped__().to_records(),
+            args.repeat,
+        )
+
+    def by_key(rows):
+        return sorted(rows, key=lambda r: (r["brand_id"], r["platform"]))
+
+    assert by_key(legacy) == by_key(batched), "batched result differs from loop"
+    print(f"rows returned:   {len(batched)}")
+    print(f"per-table loop:  {legacy_time * 1000:.1f} ms")
+    print(f"batched query:   {batched_time * 1000:.1f} ms")
+    print(f"speedup:         {legacy_time / batched_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
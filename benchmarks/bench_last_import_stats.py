@@ -0,0 +1,96 @@
+"""
+Compare get_last_import_stats_bulk against calling the previous
+ten-scalar-subquery get_last_import_stats once per platform info, on a
+seeded SQLite fixture.
+
+    python -m benchmarks.bench_last_import_stats --brands 300
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+
+import sqlalchemy
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.fixture import create_fixture_engine, seed_fixture
+from src.sql.tables import Ads, PlatformInfo
+from src.sql.watermark import ASSET_TABLES
+
+
+def legacy_get_last_import_stats(engine, platform_info_id):
+    with Session(engine) as session:
+        subq = []
+        for table in sql_manager.LAST_IMPORT_STATS_TABLES:
+            if table in ASSET_TABLES:
+                ads_stmt = sqlalchemy.select(Ads.id).where(
+                    Ads.platform_info_id == platform_info_id
+                )
+                stmt = sqlalchemy.select(func.max(table.updated_at)).where(
+                    table.ad_id.in_(ads_stmt)
+                )
+            else:
+                column = (
+                    table.date
+                    if table in sql_manager.INSIGHT_TABLES
+                    else table.updated_at
+                )
+                stmt = sqlalchemy.select(func.max(column)).where(
+                    table.platform_info_id == platform_info_id
+                )
+            subq.append(stmt.scalar_subquery().label(table.__name__))
+        return dict(session.execute(sqlalchemy.select(*subq)).first()._mapping)
+
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_fixture_engine(f"sqlite:///{tmp_dir}/fixture.sqlite")
+        seed_fixture(
+            engine, n_brands=args.brands, insight_rows_per_platform_info=args.rows
+        )
+        sql_engine._engine = engine
+        with engine.connect() as conn:
+            platform_info_ids = conn.scalars(sqlalchemy.select(PlatformInfo.id)).all()
+
+        loop_time, loop = _best_of(
+            lambda: [
+                legacy_get_last_import_stats(engine, platform_info_id)
+                for platform_info_id in platform_info_ids
+            ],
+            args.repeat,
+        )
+        bulk_time, bulk = _best_of(
+            lambda: sql_manager.get_last_import_stats_bulk(platform_info_ids),
+            args.repeat,
+        )
+
+    assert bulk.to_dict("records") == loop, "bulk result differs from loop"
+    print(f"platform infos:  {len(platform_info_ids)}")
+    print(f"per-id loop:     {loop_time * 1000:.1f} ms")
+    print(f"bulk query:      {bulk_time * 1000:.1f} ms")
+    print(f"speedup:         {loop_time / bulk_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
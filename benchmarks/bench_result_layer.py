@@ -0,0 +1,180 @@
+"""
+Time and memory of the result layer per 100k rows: the previous per-row
+dict/ORM paths against the columnar InsightsStats and the Core-select,
+slotted AccountDetails, on a seeded SQLite fixture.
+
+    python -m benchmarks.bench_result_layer --rows 100000
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+
+import sqlalchemy
+from sqlalchemy.orm import Session
+
+from src.model import AdvertisementChannel
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.fixture import bulk_insert_insights, create_fixture_engine, seed_fixture
+from src.sql.tables import Brands, PlatformInfo, Platforms
+from src.sql.util import get_all_account_details_from_db
+
+
+class LegacyAccountDetails:
+    def __init__(
+        self,
+        account_id,
+        channel,
+        brand_id=None,
+        account_name=None,
+        token1=None,
+        token2=None,
+        target_words=None,
+    ):
+        self.brand_id = brand_id
+        self.account_id = account_id
+        self.account_name = account_name
+        self.channel = channel
+        self.token1 = token1
+        self.token2 = token2
+        self.target_words = target_words
+        self.description = f"({channel})[{self.account_id} | {account_name}]"
+
+
+def legacy_get_insights_stats(engine):
+    latest = sql_manager._latest_insight_dates_subquery()
+    date_columns = [
+        sqlalchemy.func.max(
+            sqlalchemy.case(
+                (latest.c.table_name == table.__tablename__, latest.c.max_date)
+            )
+        ).label(f"latest_{table.__tablename__}_date")
+        for table in sql_manager.INSIGHT_TABLES
+    ]
+    stmt = (
+        sqlalchemy.select(
+            Brands.id, Brands.name, PlatformInfo.platform_id, *date_columns
+        )
+        .join(PlatformInfo, Brands.id == PlatformInfo.brand_id)
+        .outerjoin(latest, PlatformInfo.id == latest.c.platform_info_id)
+        .where(Brands.is_active.is_(True))
+        .where(PlatformInfo.deleted_at.is_(None))
+        .group_by(Brands.id, Brands.name, PlatformInfo.platform_id)
+    )
+    with Session(engine) as session:
+        result = session.execute(stmt).fetchall()
+    unified_list = []
+    for row in result:
+        unified_entry = {
+            "brand_id": row.id,
+            "brand_name": row.name,
+            "platform": AdvertisementChannel(row.platform_id).name,
+        }
+        for column in date_columns:
+            value = row._mapping[column.name]
+            unified_entry[column.name] = value.strftime("%Y-%m-%d") if value else "NULL"
+        unified_list.append(unified_entry)
+    return unified_list
+
+
+def legacy_get_all_account_details(engine, channel):
+    with Session(engine) as session:
+        platform_ids = sqlalchemy.select(Platforms.id).where(
+            Platforms.name == channel.name.lower()
+        )
+        active_brands = sqlalchemy.select(Brands.id).where(Brands.is_active == True)
+        stmt = (
+            sqlalchemy.select(PlatformInfo)
+            .where(PlatformInfo.deleted_at.is_(None))
+            .where(PlatformInfo.platform_id.in_(platform_ids.subquery()))
+            .where(PlatformInfo.brand_id.in_(active_brands.subquery()))
+        )
+        return [
+            LegacyAccountDetails(
+                account_id=row[0].account_id,
+                brand_id=row[0].brand_id,
+                channel=channel,
+                account_name=row[0].account_name,
+                token1=row[0].token1,
+                token2=row[0].token2,
+                target_words=row[0].target_words,
+            )
+            for row in session.execute(stmt).fetchall()
+        ]
+
+
+def measure(func):
+    """
+    (seconds, peak bytes while running, bytes still held by the result)
+    """
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, retained, len(result)
+
+
+def report(name, elapsed, peak, retained, rows):
+    scale = 100_000 / rows
+    print(
+        f"  {name:<36} {elapsed * scale * 1000:8.1f} ms  "
+        f"peak {peak * scale / 2**20:7.1f} MiB  "
+        f"retained {retained * scale / 2**20:7.1f} MiB  ({rows} rows)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Two platform infos per brand; ~15% of them are inactive or deleted.
+    n_brands = int(args.rows / 2 / 0.85)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_fixture_engine(f"sqlite:///{tmp_dir}/fixture.sqlite")
+        seed_fixture(
+            engine,
+            n_brands=n_brands,
+            insight_rows_per_platform_info=0,
+            entities_per_platform_info=0,
+        )
+        bulk_insert_insights(engine, args.rows * 8)
+        sql_engine._engine = engine
+
+        print("insights stats, per 100k rows:")
+        report(
+            "per-row dicts + strftime",
+            *measure(lambda: legacy_get_insights_stats(engine)),
+        )
+        report(
+            "InsightsStats (datetime64 columns)",
+            *measure(sql_manager.get_insights_stats_columns.__wrapped__),
+        )
+
+        channel = AdvertisementChannel.FACEBOOK
+        print("account details, per 100k rows:")
+        report(
+            "ORM PlatformInfo + dict objects",
+            *measure(lambda: legacy_get_all_account_details(engine, channel)),
+        )
+        report(
+            "Core select + slotted objects",
+            *measure(lambda: get_all_account_details_from_db(channel)),
+        )
+
+
+if __name__ == "__main__":
+    main()
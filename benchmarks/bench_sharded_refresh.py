@@ -0,0 +1,66 @@
+"""
+Scaling of the sharded dashboard rebuild (src.refresh) from 1 to N worker
+processes on a seeded SQLite fixture. Times include spawning the pool.
+
+    python -m benchmarks.bench_sharded_refresh --brands 2000 --max-shards 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+os.environ.setdefault("RESULT_CACHE_PATH", "")
+
+from src.refresh import run_refresh
+from src.sql import engine as sql_engine
+from src.sql.fixture import create_fixture_engine, seed_fixture
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    shard_counts = [1]
+    while shard_counts[-1] * 2 <= args.max_shards:
+        shard_counts.append(shard_counts[-1] * 2)
+    if shard_counts[-1] != args.max_shards:
+        shard_counts.append(args.max_shards)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = f"sqlite:///{tmp_dir}/fixture.sqlite"
+        engine = create_fixture_engine(url)
+        seed_fixture(
+            engine, n_brands=args.brands, insight_rows_per_platform_info=args.rows
+        )
+        engine.dispose()
+        sql_engine.use_database_url(url)
+
+        print(f"brands: {args.brands}, cpus: {os.cpu_count()}")
+        baseline = None
+        expected = None
+        for shards in shard_counts:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                report = run_refresh(shards=shards)
+                timings.append(time.perf_counter() - start)
+            if expected is None:
+                expected = report
+            assert report.equals(expected), f"{shards} shards differ from 1 shard"
+            best = min(timings)
+            baseline = baseline or best
+            print(
+                f"  {shards:>3} shards  {best * 1000:10.1f} ms  "
+                f"speedup {baseline / best:5.2f}x"
+            )
+        sql_engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
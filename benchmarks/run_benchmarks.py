@@ -0,0 +1,215 @@
+"""
+Benchmark the sql_manager freshness queries at several data scales and write
+a JSON report that later runs can be compared against.
+
+Each scale builds the schema from src.sql.tables in a fresh SQLite file (or
+in the database at --db-url, e.g. a local MySQL container started with
+`docker run -e MYSQL_ROOT_PASSWORD=pw -e MYSQL_DATABASE=bench -p 3306:3306 mysql:8`),
+seeds brands and platform infos, and bulk-generates insight rows with
+skewed dates.
+
+    python -m benchmarks.run_benchmarks --scales 100:100000,1000:1000000,5000:10000000
+    python -m benchmarks.run_benchmarks --output new.json --compare baseline.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+
+import sqlalchemy
+
+from src.model import AdvertisementChannel
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.fixture import bulk_insert_insights, create_fixture_engine, seed_fixture
+from src.sql.index_advisor import RECOMMENDED_INDEXES, index_ddl
+from src.sql.tables import Base, PlatformInfo
+
+DEFAULT_SCALES = "100:100000,1000:1000000"
+# Per-call functions are timed on this many sampled platform infos/brands.
+SAMPLE_SIZE = 50
+
+
+def _parse_scales(value: str):
+    scales = []
+    for scale in value.split(","):
+        brands, rows = scale.split(":")
+        scales.append((int(brands), int(float(rows))))
+    return scales
+
+
+def _time(func, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "repeat": repeat,
+    }
+
+
+def build_database(url: str, n_brands: int, n_rows: int, indexes: bool) -> dict:
+    engine = create_fixture_engine(url)
+    start = time.perf_counter()
+    seed_fixture(engine, n_brands=n_brands, insight_rows_per_platform_info=0)
+    bulk_insert_insights(engine, n_rows)
+    with engine.begin() as conn:
+        if indexes:
+            for table_name, columns in RECOMMENDED_INDEXES.items():
+                conn.exec_driver_sql(index_ddl(table_name, columns))
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+        else:
+            for table_name in RECOMMENDED_INDEXES:
+                conn.exec_driver_sql(f"ANALYZE TABLE {table_name}")
+    seed_seconds = time.perf_counter() - start
+    engine.dispose()
+    return {"seed_seconds": seed_seconds}
+
+
+def run_scale(url: str, n_brands: int, n_rows: int, repeat: int, indexes: bool):
+    build = build_database(url, n_brands, n_rows, indexes)
+    sql_engine.use_database_url(url)
+    engine = sql_engine.get_engine()
+    with engine.connect() as conn:
+        platform_infos = conn.execute(
+            sqlalchemy.select(
+                PlatformInfo.id, PlatformInfo.brand_id, PlatformInfo.platform_id
+            ).order_by(PlatformInfo.id)
+        ).fetchall()
+    step = max(1, len(platform_infos) // SAMPLE_SIZE)
+    sample = platform_infos[::step][:SAMPLE_SIZE]
+    today = datetime.date.today()
+
+    results = {
+        "get_insights_stats": _time(
+            lambda: sql_manager.get_insights_stats_columns.__wrapped__().to_records(),
+            repeat,
+        ),
+        "get_last_import_stats": _time(
+            lambda: [
+                sql_manager.get_last_import_stats.__wrapped__(row.id) for row in sample
+            ],
+            repeat,
+        ),
+        "get_last_import_stats_bulk": _time(
+            lambda: sql_manager.get_last_import_stats_bulk(
+                [row.id for row in platform_infos]
+            ),
+            repeat,
+        ),
+        "get_import_stats": _time(
+            lambda: [
+                sql_manager.get_import_stats(
+                    row.brand_id, AdvertisementChannel(row.platform_id), today
+                )
+                for row in sample
+            ],
+            repeat,
+        ),
+    }
+    results["get_last_import_stats"]["calls"] = len(sample)
+    results["get_import_stats"]["calls"] = len(sample)
+    sql_engine.shutdown()
+    return {
+        "brands": n_brands,
+        "platform_infos": len(platform_infos),
+        "insight_rows": n_rows,
+        **build,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> bool:
+    """
+    Print median ratios against `baseline`; False if any exceeds `threshold`.
+    """
+    ok = True
+    old_scales = {
+        (s["brands"], s["insight_rows"]): s["results"] for s in baseline["scales"]
+    }
+    for scale in report["scales"]:
+        old = old_scales.get((scale["brands"], scale["insight_rows"]))
+        if old is None:
+            continue
+        for name, timing in scale["results"].items():
+            if name not in old:
+                continue
+            ratio = timing["median_ms"] / max(old[name]["median_ms"], 1e-6)
+            flag = "  REGRESSION" if ratio > threshold else ""
+            ok = ok and not flag
+            print(
+                f"{scale['brands']:>6} brands {name:<28} "
+                f"{old[name]['median_ms']:>10.1f} -> {timing['median_ms']:>10.1f} ms "
+                f"({ratio:.2f}x){flag}"
+            )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--scales",
+        default=DEFAULT_SCALES,
+        help="comma-separated brands:insight_rows pairs",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--db-url",
+        help="benchmark in this (empty, disposable) database instead of SQLite",
+    )
+    parser.add_argument(
+        "--indexes",
+        action="store_true",
+        help="create the index_advisor recommended indexes first",
+    )
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    report = {
+        "generated_at": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "indexes": args.indexes,
+        "scales": [],
+    }
+    for n_brands, n_rows in _parse_scales(args.scales):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url = args.db_url or f"sqlite:///{tmp_dir}/bench.sqlite"
+            if args.db_url:
+                Base.metadata.drop_all(sqlalchemy.create_engine(url))
+            scale = run_scale(url, n_brands, n_rows, args.repeat, args.indexes)
+        report["dialect"] = sqlalchemy.make_url(url).get_backend_name()
+        report["scales"].append(scale)
+        print(
+            f"{n_brands} brands, {n_rows} insight rows "
+            f"(seeded in {scale['seed_seconds']:.1f} s):"
+        )
+        for name, timing in scale["results"].items():
+            print(f"  {name:<28} median {timing['median_ms']:10.1f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
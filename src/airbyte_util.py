@@ -1,29 +1,234 @@
 import base64
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 
+from src.logging import get_logger
 from src.model import AdvertisementChannel
 from src.secrets_manager import get_secret
 
+logger = get_logger(__name__)
+
+AIRBYTE_TIMEOUT = float(os.environ.get("AIRBYTE_TIMEOUT", "30"))
+# How long one /connections/list payload per workspace is reused; a dashboard
+# refresh checks every brand within this window.
+AIRBYTE_CONNECTIONS_TTL = float(os.environ.get("AIRBYTE_CONNECTIONS_TTL", "300"))
+AIRBYTE_POOL_SIZE = 16
+
+ConnectionIndex = Dict[int, List[dict]]
+
+
+class _RequestTimings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, failed: bool = False):
+        with self._lock:
+            self.count += 1
+            self.errors += int(failed)
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "total_seconds": self.total,
+                "max_seconds": self.max,
+            }
+
+
+class AirbyteClient:
+    """
+    Airbyte API client with a keep-alive session per endpoint.
+
+    /connections/list is fetched once per workspace per refresh window and
+    indexed by the brand id embedded in each connection name, so checking N
+    brands costs one HTTP call per channel.
+    """
+
+    def __init__(
+        self,
+        timeout: float = AIRBYTE_TIMEOUT,
+        connections_ttl: float = AIRBYTE_CONNECTIONS_TTL,
+    ):
+        self.timeout = timeout
+        self.connections_ttl = connections_ttl
+        self._sessions: Dict[str, requests.Session] = {}
+        self._auth_header: Optional[str] = None
+        self._indexes: Dict[AdvertisementChannel, Tuple[float, ConnectionIndex]] = {}
+        self._timings: Dict[str, _RequestTimings] = {}
+        self._lock = threading.Lock()
+        self._channel_locks: Dict[AdvertisementChannel, threading.Lock] = {}
+
+    def _get_session(self, endpoint: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(endpoint)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=AIRBYTE_POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Authorization"] = self._get_auth_header()
+                self._sessions[endpoint] = session
+            return session
+
+    def _get_auth_header(self) -> str:
+        if self._auth_header is None:
+            self._auth_header = _get_headers()
+        return self._auth_header
+
+    def _get_timings(self, endpoint: str) -> _RequestTimings:
+        with self._lock:
+            return self._timings.setdefault(endpoint, _RequestTimings())
+
+    def list_connections(self, channel: AdvertisementChannel) -> List[dict]:
+        endpoint = _get_endpoint_for_channel(channel)
+        url = f"{endpoint}/api/v1/connections/list"
+        request_body = {
+            "workspaceId": _get_workspace_id_for_channel(channel),
+        }
+        timings = self._get_timings(endpoint)
+        start = time.perf_counter()
+        try:
+            response = self._get_session(endpoint).post(
+                url, json=request_body, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except Exception:
+            timings.record(time.perf_counter() - start, failed=True)
+            raise
+        timings.record(time.perf_counter() - start)
+        return response.json()["connections"]
+
+    async def list_connections_async(
+        self,
+        channel: AdvertisementChannel,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> List[dict]:
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.list_connections_async(channel, session)
+
+        endpoint = _get_endpoint_for_channel(channel)
+        url = f"{endpoint}/api/v1/connections/list"
+        request_body = {
+            "workspaceId": _get_workspace_id_for_channel(channel),
+        }
+        headers = {"Authorization": self._get_auth_header()}
+        timings = self._get_timings(endpoint)
+        start = time.perf_counter()
+        try:
+            async with session.post(
+                url,
+                json=request_body,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json(content_type=None)
+        except Exception:
+            timings.record(time.perf_counter() - start, failed=True)
+            raise
+        timings.record(time.perf_counter() - start)
+        return payload["connections"]
+
+    def _cached_index(self, channel: AdvertisementChannel) -> Optional[ConnectionIndex]:
+        cached = self._indexes.get(channel)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        return None
+
+    def _store_index(
+        self, channel: AdvertisementChannel, connections: List[dict]
+    ) -> ConnectionIndex:
+        index = _index_connections_by_brand(connections)
+        self._indexes[channel] = (time.monotonic() + self.connections_ttl, index)
+        return index
+
+    def get_connections_by_brand(
+        self, channel: AdvertisementChannel
+    ) -> ConnectionIndex:
+        index = self._cached_index(channel)
+        if index is not None:
+            return index
+        with self._lock:
+            channel_lock = self._channel_locks.setdefault(channel, threading.Lock())
+        # Threads checking brands of the same channel share one list call.
+        with channel_lock:
+            index = self._cached_index(channel)
+            if index is None:
+                index = self._store_index(channel, self.list_connections(channel))
+            return index
+
+    async def get_connections_by_brand_async(
+        self,
+        channel: AdvertisementChannel,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> ConnectionIndex:
+        index = self._cached_index(channel)
+        if index is None:
+            connections = await self.list_connections_async(channel, session)
+            index = self._store_index(channel, connections)
+        return index
+
+    def get_sync_status(
+        self, brand_id: int, channel: AdvertisementChannel
+    ) -> List[dict]:
+        return self.get_connections_by_brand(channel).get(brand_id, [])
+
+    def refresh(self):
+        self._indexes = {}
+
+    def get_metrics(self) -> Dict[str, dict]:
+        with self._lock:
+            timings = dict(self._timings)
+        return {endpoint: t.as_dict() for endpoint, t in timings.items()}
+
+
+_client: Optional[AirbyteClient] = None
+_client_lock = threading.Lock()
+
+
+def get_airbyte_client() -> AirbyteClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AirbyteClient()
+        return _client
+
 
 def get_airbyte_sync_status(brand_id: int, channel: AdvertisementChannel):
-    endpoint = _get_endpoint_for_channel(channel)
-    url = f"{endpoint}/api/v1/connections/list"
-    headers = {"Authorization": _get_headers()}
-    request_body = {
-        "workspaceId": _get_workspace_id_for_channel(channel),
-    }
-    response = requests.post(url, headers=headers, json=request_body)
-    response = response.json()
-    for conn in response["connections"]:
+    return get_airbyte_client().get_sync_status(brand_id, channel)
+
+
+def _index_connections_by_brand(connections: List[dict]) -> ConnectionIndex:
+    index: ConnectionIndex = {}
+    for conn in connections:
         conn_name = conn["name"]
-        brand_id_from_conn_name = int(conn_name.split("_")[1])
-        if brand_id_from_conn_name == brand_id:
-            pass
+        try:
+            brand_id_from_conn_name = int(conn_name.split("_")[1])
+        except (IndexError, ValueError):
+            logger.warning(f"Cannot parse brand id from connection {conn_name}")
+            continue
+        index.setdefault(brand_id_from_conn_name, []).append(conn)
+    return index
 
 
 def _get_endpoint_for_channel(channel: AdvertisementChannel):
-    if channel == AdvertisementChannel.GOOGLE_ADS:
+    if channel == AdvertisementChannel.GOOGLE:
         return get_secret("GOOGLE_ADS_AIRBYTE_ENDPOINT")
     elif channel == AdvertisementChannel.FACEBOOK:
         return get_secret("FACEBOOK_AIRBYTE_ENDPOINT")
@@ -32,7 +237,7 @@ def _get_endpoint_for_channel(channel: AdvertisementChannel):
 
 
 def _get_workspace_id_for_channel(channel: AdvertisementChannel):
-    if channel == AdvertisementChannel.GOOGLE_ADS:
+    if channel == AdvertisementChannel.GOOGLE:
         return get_secret("GOOGLE_ADS_WORKSPACE_ID")
     elif channel == AdvertisementChannel.FACEBOOK:
         return get_secret("FACEBOOK_WORKSPACE_ID")
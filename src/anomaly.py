@@ -0,0 +1,216 @@
+"""
+Volume anomalies in daily import counts.
+
+Each series is one (brand, platform, insight table). A day's row count is
+scored against the median of the ANOMALY_WINDOW_DAYS days before it, scaled
+by their median absolute deviation, and mapped onto Status. A partial
+import then shows up even when MAX(date) looks fresh. Every series is
+scored in one NumPy pass over a (series x days) matrix.
+"""
+
+import datetime
+import os
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.model import AdvertisementChannel, Status
+from src.sql import sql_manager
+
+ANOMALY_WINDOW_DAYS = int(os.environ.get("ANOMALY_WINDOW_DAYS", "28"))
+ANOMALY_WARNING_SCORE = float(os.environ.get("ANOMALY_WARNING_SCORE", "3.5"))
+ANOMALY_FAILED_SCORE = float(os.environ.get("ANOMALY_FAILED_SCORE", "6"))
+# Series with a baseline median below this many rows a day are too small to
+# judge and left UNKNOWN; freshness still covers them.
+ANOMALY_MIN_MEDIAN = float(os.environ.get("ANOMALY_MIN_MEDIAN", "10"))
+# Lower bound of the scale as a fraction of the median, so a series whose
+# MAD is 0 does not flag every +-1 row.
+ANOMALY_MIN_RELATIVE_SCALE = 0.1
+# Series scored per block; keeps the sorted copy of the windows in cache.
+ANOMALY_CHUNK_ROWS = 1024
+MAD_TO_SIGMA = 1.4826
+
+
+def _sorted_median_x2(values: np.ndarray) -> np.ndarray:
+    """
+    Twice the median of sorted integer rows, which is still an integer.
+    """
+    middle = values.shape[-1] // 2
+    if values.shape[-1] % 2:
+        return 2 * values[..., middle]
+    return values[..., middle - 1] + values[..., middle]
+
+
+def robust_scores(
+    counts: np.ndarray, window: int = ANOMALY_WINDOW_DAYS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (medians, scores) for every day of `counts` (series x days of row
+    counts) against the `window` days before it. Scores are NaN for the
+    first `window` days and where the median is below ANOMALY_MIN_MEDIAN.
+    """
+    counts = np.asarray(counts)
+    medians = np.full(counts.shape, np.nan)
+    scores = np.full(counts.shape, np.nan)
+    if counts.shape[1] <= window:
+        return medians, scores
+
+    # Row counts are integers: sorting int32 is much faster than float64,
+    # and with everything doubled the deviations stay exact integers.
+    dtype = np.int32 if counts.size == 0 or counts.max() < 2**29 else np.int64
+    for start in range(0, len(counts), ANOMALY_CHUNK_ROWS):
+        block = counts[start : start + ANOMALY_CHUNK_ROWS]
+        windows = np.sort(
+            sliding_window_view(block[:, :-1].astype(dtype), window, axis=1)
+        )
+        median_x2 = _sorted_median_x2(windows)
+        # |2 * value - 2 * median|, in place over the sorted copy.
+        np.multiply(windows, 2, out=windows)
+        np.subtract(windows, median_x2[..., None], out=windows)
+        np.abs(windows, out=windows)
+        windows.sort()
+        median = median_x2 / 2
+        mad = _sorted_median_x2(windows) / 4
+        # Counts are at least Poisson-noisy, so never scale below sqrt(median).
+        scale = np.maximum.reduce(
+            [
+                MAD_TO_SIGMA * mad,
+                ANOMALY_MIN_RELATIVE_SCALE * median,
+                np.sqrt(median),
+                np.ones_like(median),
+            ]
+        )
+        score = (block[:, window:] - median) / scale
+        rows = slice(start, start + len(block))
+        medians[rows, window:] = median
+        scores[rows, window:] = np.where(median >= ANOMALY_MIN_MEDIAN, score, np.nan)
+    return medians, scores
+
+
+def classify_scores(scores: np.ndarray) -> pd.Categorical:
+    """
+    Drops past ANOMALY_FAILED_SCORE are FAILED, anything else past
+    ANOMALY_WARNING_SCORE (spikes included) WARNING, unscored days UNKNOWN.
+    """
+    names = [status.name for status in Status]
+    codes = np.select(
+        [
+            np.isnan(scores),
+            scores <= -ANOMALY_FAILED_SCORE,
+            np.abs(scores) >= ANOMALY_WARNING_SCORE,
+        ],
+        [
+            names.index(Status.UNKNOWN.name),
+            names.index(Status.FAILED.name),
+            names.index(Status.WARNING.name),
+        ],
+        default=names.index(Status.OK.name),
+    )
+    return pd.Categorical.from_codes(codes.ravel(), categories=names)
+
+
+def to_matrix(
+    daily_counts: pd.DataFrame, start: datetime.date, end: datetime.date
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Pivot get_daily_insight_counts rows into (series keys, series x days
+    counts). Days without rows count as 0.
+    """
+    days = (end - start).days + 1
+    day = (
+        daily_counts["date"].to_numpy("datetime64[D]") - np.datetime64(start, "D")
+    ).astype(np.int64)
+    in_range = (day >= 0) & (day < days)
+    daily_counts = daily_counts[in_range]
+
+    # Factorising each key column and combining the codes is much faster
+    # than factorising a MultiIndex of (int, int, str) tuples.
+    key_columns = ["brand_id", "platform_id", "table_name"]
+    combined = np.zeros(len(daily_counts), dtype=np.int64)
+    uniques = []
+    for column in key_columns:
+        codes, values = pd.factorize(daily_counts[column])
+        combined = combined * len(values) + codes
+        uniques.append(values)
+    # Dense renumbering of the combined codes; they are bounded by the product
+    # of the key cardinalities, so this is linear where np.unique would sort.
+    present = np.zeros(np.prod([len(values) for values in uniques]), dtype=bool)
+    present[combined] = True
+    series_keys = np.flatnonzero(present)
+    series = (np.cumsum(present) - 1)[combined]
+
+    keys = {}
+    for column, values in reversed(list(zip(key_columns, uniques))):
+        keys[column] = np.asarray(values)[series_keys % len(values)]
+        series_keys = series_keys // len(values)
+    counts = np.bincount(
+        series * days + day[in_range],
+        weights=daily_counts["count"].to_numpy(),
+        minlength=len(keys["brand_id"]) * days,
+    ).reshape(-1, days)
+    return pd.DataFrame({column: keys[column] for column in key_columns}), counts
+
+
+def detect_anomalies(
+    daily_counts: pd.DataFrame,
+    end: datetime.date,
+    window: int = ANOMALY_WINDOW_DAYS,
+) -> pd.DataFrame:
+    """
+    Count, baseline median, score and status of every series on `end`.
+    """
+    start = end - datetime.timedelta(days=window)
+    keys, counts = to_matrix(daily_counts, start, end)
+    medians, scores = robust_scores(counts, window)
+    keys["channel"] = [AdvertisementChannel(p).name for p in keys["platform_id"]]
+    keys["count"] = counts[:, -1].astype(np.int64)
+    keys["median"] = medians[:, -1]
+    keys["score"] = scores[:, -1]
+    keys["status"] = classify_scores(scores[:, -1])
+    return keys
+
+
+def get_volume_statuses(
+    brand_ids: Iterable[int],
+    end: Optional[datetime.date] = None,
+    window: int = ANOMALY_WINDOW_DAYS,
+) -> pd.DataFrame:
+    """
+    Worst volume status per (brand_id, channel) on `end` (default yesterday,
+    the last complete import day), with the table and score behind it.
+    """
+    end = end or datetime.date.today() - datetime.timedelta(days=1)
+    daily_counts = sql_manager.get_daily_insight_counts(
+        brand_ids, end - datetime.timedelta(days=window), end
+    )
+    anomalies = detect_anomalies(daily_counts, end, window)
+    anomalies["severity"] = (
+        anomalies["status"].map({status.name: status.value for status in Status})
+    ).astype(np.int64)
+    anomalies["deviation"] = anomalies["score"].abs()
+    anomalies["table_order"] = anomalies["table_name"].map(
+        {table.__tablename__: i for i, table in enumerate(sql_manager.INSIGHT_TABLES)}
+    )
+    # Worst status, then largest deviation, then table order: the row kept
+    # per (brand, channel) must not depend on the order rows arrived in.
+    worst = anomalies.sort_values(
+        ["brand_id", "channel", "severity", "deviation", "table_order"],
+        ascending=[True, True, False, False, True],
+        na_position="last",
+        kind="stable",
+    ).drop_duplicates(["brand_id", "channel"])
+    # No table was scored, so none is to blame.
+    worst["table_name"] = worst["table_name"].where(
+        worst["status"] != Status.UNKNOWN.name
+    )
+    worst = worst.rename(
+        columns={
+            "status": "volume_status",
+            "table_name": "volume_table",
+            "score": "volume_score",
+        }
+    )[["brand_id", "channel", "volume_status", "volume_table", "volume_score"]]
+    # Keys keep their types when no series was found, so merges still line up.
+    return worst.astype({"brand_id": np.int64, "channel": str})
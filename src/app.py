@@ -1,31 +1,201 @@
-import pandas as pd
+import atexit
+import datetime
+
 import streamlit as st
-from tqdm import tqdm
 
-from src import s3
-from src.async_manager import AsyncAPIManager, CustomUnit
-from src.model import AdvertisementChannel
-from src.sql import engine, sql_manager
+from src import freshness_feed, history, s3, snapshot, stats_grid
+from src.model import Status
+from src.sql import engine, instrumentation, result_cache
+
+PAGE_SIZES = [25, 50, 100, 250]
+HISTORY_DAYS = [7, 30, 90]
+
+
+@st.cache_resource(max_entries=2, ttl=3600)
+def _load_snapshot_table(version: str):
+    # Keyed by version, so a new snapshot is picked up on the next rerun.
+    return snapshot.load_snapshot_table(snapshot.get_storage(), version)
+
+
+@st.cache_resource
+def _seen_snapshot():
+    # The snapshot version this process last rendered.
+    return {"version": None}
+
+
+def _track_snapshot(version: str):
+    seen = _seen_snapshot()
+    if seen["version"] is not None and seen["version"] != version:
+        # Query results cached before the new snapshot may be older than it.
+        result_cache.invalidate_all()
+    seen["version"] = version
+
+
+def _clear_caches():
+    result_cache.invalidate_all()
+    for loader in [
+        _load_snapshot_table,
+        _get_stats_table,
+        _load_history,
+        _load_failed_jobs,
+    ]:
+        loader.clear()
+
+
+@st.cache_resource
+def _own_engine():
+    # The engine, its pool and the SSH tunnel live as long as the server
+    # process: sessions and the feed's reconciler share them across reruns.
+    atexit.register(engine.shutdown)
+
+
+@st.cache_resource
+def _get_freshness_feed():
+    # One ingest endpoint per dashboard process, shared by all sessions.
+    return freshness_feed.FreshnessFeed().start()
+
+
+@st.cache_resource(max_entries=4, ttl=3600)
+def _get_stats_table(version: str, today: datetime.date, feed_generation: int):
+    # Statuses only move when the day rolls over or feed events advance the
+    # dates, so they are derived once per (snapshot, day, feed state) and
+    # reruns that filter or page reuse the table.
+    table = _load_snapshot_table(version)
+    if freshness_feed.FRESHNESS_FEED_ENABLED:
+        table = freshness_feed.overlay_snapshot(table, _get_freshness_feed().index)
+    return stats_grid.with_status(table, now=_utc_now())
+
+
+def _utc_now() -> datetime.datetime:
+    # Snapshot and history dates are UTC days.
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _feed_generation() -> int:
+    if not freshness_feed.FRESHNESS_FEED_ENABLED:
+        return 0
+    return _get_freshness_feed().index.generation
+
+
+def render_stats_grid(table):
+    with st.sidebar:
+        statuses = st.multiselect("Status", [s.name for s in Status])
+        platforms = st.multiselect("Platform", stats_grid.platform_names(table))
+        brand_name = st.text_input("Brand name")
+        sort_by = st.selectbox("Sort by", [None] + table.column_names)
+        descending = st.checkbox("Descending")
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+    filtered = stats_grid.filter_table(
+        table, statuses=statuses, platforms=platforms, brand_name=brand_name
+    )
+    pages = max(1, -(-filtered.num_rows // page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1) - 1
+    rows, total = stats_grid.get_page(
+        filtered,
+        page=page,
+        page_size=page_size,
+        sort_by=sort_by,
+        descending=descending,
+    )
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+    first = page * page_size
+    st.caption(f"Rows {min(first + 1, total)}-{first + len(rows)} of {total}")
+
+
+@st.cache_resource(max_entries=4, ttl=600)
+def _load_history(start: datetime.date, end: datetime.date):
+    return history.load_history(snapshot.get_storage(), start, end)
+
+
+def render_history():
+    with st.expander("History"):
+        days = st.selectbox("Days", HISTORY_DAYS, index=1)
+        end = _utc_now().date()
+        table = _load_history(end - datetime.timedelta(days=days), end)
+        if table.num_rows == 0:
+            st.caption("No history recorded yet")
+            return
+        st.caption("Brand/platform pairs by daily insights status")
+        st.line_chart(history.status_trend(table))
+
+        brand_id = st.number_input("Brand id", min_value=0, step=1)
+        if brand_id:
+            trend = history.brand_trend(table, int(brand_id))
+            st.caption("Rows imported per day")
+            st.line_chart(
+                trend.pivot(index="day", columns="series", values="row_count")
+            )
+            st.caption("Days behind")
+            st.line_chart(
+                trend.pivot(index="day", columns="series", values="days_behind")
+            )
+
+
+@st.cache_resource(max_entries=2, ttl=3600)
+def _load_failed_jobs(version: str):
+    return snapshot.load_failed_jobs(snapshot.get_storage(), version)
+
+
+def render_failed_jobs(report):
+    with st.expander("Failed jobs"):
+        if report is None:
+            st.caption("No failed jobs report in this snapshot")
+            return
+        st.caption("Overdue retries")
+        st.dataframe(report["overdue_retries"], hide_index=True)
+        st.caption("Retry storms")
+        st.dataframe(report["retry_storms"], hide_index=True)
+
+
+def render_debug_panel(failed_jobs_report):
+    with st.sidebar.expander("Debug"):
+        st.caption("Query time by caller")
+        st.dataframe(instrumentation.get_caller_summary(), hide_index=True)
+        st.caption("Statements")
+        st.dataframe(instrumentation.get_query_stats(), hide_index=True)
+        st.caption("Connection pool")
+        st.json(engine.get_pool_metrics())
+        st.caption("Result cache")
+        st.json(result_cache.get_result_cache().stats())
+        if st.button("Clear cached results"):
+            _clear_caches()
+            st.rerun()
+        if failed_jobs_report is not None:
+            st.caption("Failed jobs")
+            st.json(failed_jobs_report["stats"])
+        if freshness_feed.FRESHNESS_FEED_ENABLED:
+            st.caption("Freshness feed")
+            st.json(_get_freshness_feed().stats())
 
 
 def main():
-    try:
-        st.title("Brand Data Import Status Dashboard")
-        # statistics = sql_manager.get_insights_stats()
-        # df = pd.DataFrame(statistics)
-        # st.table(data=df)
-
-        # results = async_manager.run()
-        # rows = []
-        # for result in results:
-        #     rows.extend(result)
-        # st.table(data=rows)
-
-        html = s3.read_html_from_s3("omneky-airbyte-sync", "insights_stats.html")
+    _own_engine()
+    st.title("Brand Data Import Status Dashboard")
+    # statistics = sql_manager.get_insights_stats()
+    # df = pd.DataFrame(statistics)
+    # st.table(data=df)
+
+    # results = async_manager.run()
+    # rows = []
+    # for result in results:
+    #     rows.extend(result)
+    # st.table(data=rows)
+
+    version = snapshot.get_latest_version(snapshot.get_storage())
+    failed_jobs_report = _load_failed_jobs(version) if version else None
+    if version:
+        _track_snapshot(version)
+        st.caption(f"Snapshot {version}")
+        render_stats_grid(
+            _get_stats_table(version, _utc_now().date(), _feed_generation())
+        )
+        render_history()
+    else:
+        html = s3.read_html_from_s3(snapshot.SNAPSHOT_BUCKET, snapshot.LEGACY_HTML_KEY)
         st.markdown(html, unsafe_allow_html=True)
-    finally:
-        if engine.tunnel_forwarder:
-            engine.tunnel_forwarder.stop()
+    render_failed_jobs(failed_jobs_report)
+    render_debug_panel(failed_jobs_report)
 
 
 if __name__ == "__main__":
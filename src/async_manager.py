@@ -1,16 +1,175 @@
-from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, wait
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, List, Optional
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import requests
 
 from src.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+# Connection failures and timeouts (builtin, socket and requests' own).
+# requests.HTTPError is deliberately absent: it is retried by status only.
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    requests.ConnectionError,
+    requests.Timeout,
+)
+# Throttling and server-side errors; any other 4xx will fail the same way again.
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_on: Tuple[type, ...] = TRANSIENT_ERRORS
+    retry_status_codes: Tuple[int, ...] = TRANSIENT_STATUS_CODES
+
+    def get_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter.
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    def should_retry(self, error: BaseException) -> bool:
+        if isinstance(error, requests.HTTPError):
+            response = error.response
+            return (
+                response is not None and response.status_code in self.retry_status_codes
+            )
+        return isinstance(error, self.retry_on)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+@dataclass
+class WorkOutcome:
+    index: int
+    value: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _Attempt:
+    def __init__(self, timeout: Optional[float] = None):
+        # The deadline runs from submission, so a unit stuck behind hung
+        # workers still times out.
+        self.submitted_at = time.monotonic()
+        self.deadline = None if timeout is None else self.submitted_at + timeout
+        self.started_at: Optional[float] = None
+        self.attempts = 0
+        self.abandoned = False
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def abandon(self) -> bool:
+        """
+        Give up on the unit; True if a worker thread is still stuck in it.
+        """
+        with self.lock:
+            self.abandoned = True
+            return self.started_at is not None and not self.finished
+
+    def finish(self) -> bool:
+        """
+        Mark the unit done; True if it was abandoned while running, i.e. its
+        worker has been replaced.
+        """
+        with self.lock:
+            self.finished = True
+            return self.abandoned and self.started_at is not None
+
+
+class _WorkerPool:
+    """
+    Daemon worker threads over a shared queue.
+
+    A worker stuck in an abandoned unit is replaced straight away and exits
+    once the call returns, so hung calls never hold the pool. Daemon threads
+    are not joined at interpreter exit, unlike ThreadPoolExecutor's.
+    """
+
+    def __init__(self, nthreads: int):
+        self._queue = queue.SimpleQueue()
+        self._nthreads = 0
+        self._lock = threading.Lock()
+        for _ in range(nthreads):
+            self.add_worker()
+
+    def add_worker(self):
+        with self._lock:
+            self._nthreads += 1
+            name = f"AsyncAPIManager-{self._nthreads}"
+        threading.Thread(target=self._work, name=name, daemon=True).start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, attempt = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(attempt)
+            except BaseException as e:
+                retire = attempt.finish()
+                future.set_exception(e)
+            else:
+                retire = attempt.finish()
+                future.set_result(result)
+            if retire:
+                # A replacement took this thread's place when it was abandoned.
+                return
+
+    def submit(self, func, attempt: _Attempt) -> Future:
+        future = Future()
+        self._queue.put((future, func, attempt))
+        return future
+
+    def shutdown(self):
+        # Idle workers exit on the sentinels; stuck ones are left to die with
+        # the process.
+        with self._lock:
+            nthreads = self._nthreads
+        for _ in range(nthreads):
+            self._queue.put(None)
+
+
 class AsyncWorkUnit:
+    timeout: Optional[float] = None
+    retry_policy: Optional[RetryPolicy] = None
+
     def run(self):
         raise NotImplementedError
 
+    def with_policy(
+        self,
+        timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        return self
+
     def __len__(self):
         return -1
 
@@ -26,8 +185,29 @@ class CustomUnit(AsyncWorkUnit):
         return self.func(*self.args, **self.kwargs)
 
 
+class AsyncioWorkUnit:
+    # Units sharing a host are throttled together by AsyncioWorkManager.
+    host: Optional[str] = None
+
+    async def run(self):
+        raise NotImplementedError
+
+
+class CoroutineUnit(AsyncioWorkUnit):
+    def __init__(self, func, *args, host: Optional[str] = None, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.host = host
+
+    async def run(self):
+        return await self.func(*self.args, **self.kwargs)
+
+
 class AsyncAPIManager:
     MAX_NUM_THREADS = 16
+    PROGRESS_LOG_INTERVAL = 5
 
     def __init__(self, max_num_threads: int = MAX_NUM_THREADS):
         self.work_units: List[AsyncWorkUnit] = []
@@ -39,60 +219,284 @@ class AsyncAPIManager:
     def reset(self):
         self.work_units = []
 
+    @staticmethod
+    def _run_unit(work_unit: AsyncWorkUnit, attempt: _Attempt):
+        """
+        Runs in a worker thread and never raises: retries transient errors
+        with backoff until the unit's policy or deadline runs out.
+        """
+        policy = work_unit.retry_policy or NO_RETRY
+        with attempt.lock:
+            if attempt.abandoned:
+                return None, None
+            attempt.started_at = time.monotonic()
+
+        while True:
+            attempt.attempts += 1
+            try:
+                return work_unit.run(), None
+            except Exception as e:
+                error = e
+            if (
+                attempt.abandoned
+                or attempt.attempts >= policy.max_attempts
+                or not policy.should_retry(error)
+            ):
+                return None, error
+            delay = policy.get_delay(attempt.attempts)
+            if attempt.deadline is not None and time.monotonic() + delay >= (
+                attempt.deadline
+            ):
+                return None, error
+            logger.warning(
+                f"Attempt {attempt.attempts} failed with {error!r}, "
+                f"retrying in {delay:.2f}s"
+            )
+            time.sleep(delay)
+
+    def stream_outcomes(
+        self,
+        work_queue: Optional[Iterable[AsyncWorkUnit]] = None,
+        nthreads: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> Iterator[WorkOutcome]:
+        """
+        Yield a WorkOutcome per unit in completion order.
+
+        At most `max_pending` units are submitted ahead of the workers, so
+        memory stays flat however long `work_queue` is; it may be a lazy
+        iterable. A unit's timeout runs from submission: one not finished by
+        then, queued or running, is reported as a TimeoutError and
+        abandoned, and a worker stuck in it is replaced.
+        """
+        if not work_queue:
+            work_queue = self.work_units
+        nthreads = nthreads or self.max_nthreads
+        max_pending = max_pending or 2 * nthreads
+        n_total = len(work_queue) if hasattr(work_queue, "__len__") else None
+
+        work_iter = enumerate(work_queue)
+        pending: Dict[Future, Tuple[int, AsyncWorkUnit, _Attempt]] = {}
+        n_completed = 0
+        n_error = 0
+        n_abandoned = 0
+        time_start = datetime.now()
+        last_log = time_start
+
+        pool = _WorkerPool(nthreads)
+
+        def fill_window():
+            while len(pending) < max_pending:
+                next_unit = next(work_iter, None)
+                if next_unit is None:
+                    return
+                index, work_unit = next_unit
+                attempt = _Attempt(work_unit.timeout)
+                future = pool.submit(partial(self._run_unit, work_unit), attempt)
+                pending[future] = (index, work_unit, attempt)
+
+        def next_deadline() -> Optional[float]:
+            deadlines = [
+                attempt.deadline
+                for _, _, attempt in pending.values()
+                if attempt.deadline is not None
+            ]
+            return min(deadlines) if deadlines else None
+
+        def latency(attempt: _Attempt, now: float) -> float:
+            return now - (attempt.started_at or attempt.submitted_at)
+
+        try:
+            fill_window()
+            while pending:
+                deadline = next_deadline()
+                timeout = None
+                if deadline is not None:
+                    timeout = max(deadline - time.monotonic(), 0)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                outcomes = []
+                now = time.monotonic()
+                for future in done:
+                    index, work_unit, attempt = pending.pop(future)
+                    value, error = future.result()
+                    outcomes.append(
+                        WorkOutcome(
+                            index=index,
+                            value=value,
+                            error=error,
+                            attempts=attempt.attempts,
+                            latency=latency(attempt, now),
+                        )
+                    )
+
+                for future, (index, work_unit, attempt) in list(pending.items()):
+                    if attempt.deadline is None or now < attempt.deadline:
+                        continue
+                    if attempt.finished:
+                        # Its result is being handed over; collect it next pass.
+                        continue
+                    del pending[future]
+                    future.cancel()
+                    if attempt.abandon():
+                        pool.add_worker()
+                    n_abandoned += 1
+                    outcomes.append(
+                        WorkOutcome(
+                            index=index,
+                            error=TimeoutError(
+                                f"Work unit timed out after {work_unit.timeout}s"
+                            ),
+                            attempts=attempt.attempts,
+                            latency=latency(attempt, now),
+                        )
+                    )
+
+                for outcome in outcomes:
+                    n_completed += 1
+                    if outcome.error is not None:
+                        n_error += 1
+                        logger.error(
+                            f"Work unit {outcome.index} failed after "
+                            f"{outcome.attempts} attempt(s): {outcome.error!r}"
+                        )
+                    yield outcome
+                fill_window()
+
+                log_time = datetime.now()
+                if (log_time - last_log).total_seconds() >= self.PROGRESS_LOG_INTERVAL:
+                    last_log = log_time
+                    logger.info(
+                        f"Completed: {n_completed}, Error: {n_error}, "
+                        f"Pending: {len(pending)}, "
+                        f"Total: {n_total if n_total is not None else '?'}, "
+                        f"Time elapsed: {log_time - time_start}"
+                    )
+        finally:
+            # The caller stopped early or a unit raised: queued units never
+            # start and running ones stop retrying.
+            for future, (_, _, attempt) in pending.items():
+                future.cancel()
+                attempt.abandon()
+            pool.shutdown()
+
+        logger.info(
+            f"All futures completed: {n_completed}, Error: {n_error}, "
+            f"Timed out: {n_abandoned}, Time elapsed: {datetime.now() - time_start}"
+        )
+
+    def stream(
+        self,
+        work_queue: Optional[Iterable[AsyncWorkUnit]] = None,
+        nthreads: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (index, result) pairs in completion order, raising the first
+        error a unit ends with.
+        """
+        for outcome in self.stream_outcomes(work_queue, nthreads, max_pending):
+            if outcome.error is not None:
+                raise outcome.error
+            yield outcome.index, outcome.value
+
     def run(
         self,
         work_queue: Optional[Iterable[AsyncWorkUnit]] = None,
         nthreads: Optional[int] = None,
     ) -> Iterable:
+        results = {}
+        for index, result in self.stream(work_queue, nthreads):
+            results[index] = result
+        return [results[index] for index in range(len(results))]
+
+    def run_outcomes(
+        self,
+        work_queue: Optional[Iterable[AsyncWorkUnit]] = None,
+        nthreads: Optional[int] = None,
+    ) -> List[WorkOutcome]:
+        """
+        Like run, but one failed or timed out unit does not discard the
+        others: every unit gets a WorkOutcome, in submission order.
+        """
+        outcomes = {}
+        for outcome in self.stream_outcomes(work_queue, nthreads):
+            outcomes[outcome.index] = outcome
+        return [outcomes[index] for index in range(len(outcomes))]
+
+
+class AsyncioWorkManager:
+    """
+    Event-loop counterpart of AsyncAPIManager.
+
+    Coroutine units run on the loop; plain AsyncWorkUnits are pushed to a
+    thread executor so both kinds can be mixed in one run. Concurrency is
+    capped overall and per `host` attribute of the unit.
+    """
+
+    MAX_CONCURRENCY = 64
+    MAX_PER_HOST = 16
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_per_host: int = MAX_PER_HOST,
+        max_num_threads: int = AsyncAPIManager.MAX_NUM_THREADS,
+    ):
+        self.work_units: List[Union[AsyncWorkUnit, AsyncioWorkUnit]] = []
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.max_nthreads = max_num_threads
+
+    def add_work_unit(self, work_unit: Union[AsyncWorkUnit, AsyncioWorkUnit]):
+        self.work_units.append(work_unit)
+
+    def reset(self):
+        self.work_units = []
+
+    async def run_async(
+        self,
+        work_queue: Optional[Iterable[Union[AsyncWorkUnit, AsyncioWorkUnit]]] = None,
+    ) -> List:
         if not work_queue:
             work_queue = self.work_units
-        futures: List[Future] = []
 
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
         time_start = datetime.now()
-        with ThreadPoolExecutor(max_workers=nthreads) as executor:
-            for work_unit in work_queue:
-                future = executor.submit(work_unit.run)
-                futures.append(future)
-
-        # Wait for all the futures to complete
-        n_futures = len(futures)
-
-        completed = []
-        error = []
-        pending = []
-
-        while len(completed) + len(error) < n_futures:
-            completed = []
-            error = []
-            pending = []
-
-            for future in futures:
-                if future.done():
-                    completed.append(future)
-                elif future.running():
-                    pending.append(future)
-                else:
-                    error.append(future)
-
-            logger.info(
-                f"Completed: {len(completed)}, Pending: {len(pending)}, Error: {len(error)}, Total: {n_futures},"
-                f"Time elapsed: {datetime.now() - time_start}"
-            )
-            wait(pending, return_when="FIRST_COMPLETED")
 
-        logger.info("All futures completed")
-        logger.info(f"Completed: {len(completed)}, Error: {len(error)}")
+        with ThreadPoolExecutor(max_workers=self.max_nthreads) as executor:
+
+            async def run_unit(work_unit):
+                if isinstance(work_unit, AsyncioWorkUnit):
+                    return await work_unit.run()
+                return await loop.run_in_executor(executor, work_unit.run)
+
+            async def run_limited(work_unit):
+                host = getattr(work_unit, "host", None)
+                async with limit:
+                    if host is None:
+                        return await run_unit(work_unit)
+                    async with host_limits[host]:
+                        return await run_unit(work_unit)
 
-        # Get the results
-        results = []
-        for future in futures:
             try:
-                result = future.result()
-            except CancelledError:
-                logger.error("Future was unexpectedly cancelled")
-                result = None
+                results = await asyncio.gather(
+                    *(run_limited(work_unit) for work_unit in work_queue)
+                )
             except Exception as e:
                 logger.error(f"Exception occurred: {e}", exc_info=True)
                 raise e
-            results.append(result)
+
+        logger.info(
+            f"All work units completed: {len(results)}, "
+            f"Time elapsed: {datetime.now() - time_start}"
+        )
         return results
+
+    def run(
+        self,
+        work_queue: Optional[Iterable[Union[AsyncWorkUnit, AsyncioWorkUnit]]] = None,
+    ) -> List:
+        return asyncio.run(self.run_async(work_queue))
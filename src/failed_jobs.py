@@ -0,0 +1,319 @@
+"""
+Monitor of the FailedJobs retry queue.
+
+FailedJobs rows are loaded incrementally with a (time_of_failure, job_id)
+keyset cursor. Each refresh re-scans FAILED_JOBS_LOOKBACK behind the cursor,
+so rows committed late with an earlier time_of_failure are still picked up.
+Jobs still pending are re-read by primary key on each refresh to pick up
+retries and resolutions, and dropped when their row is gone.
+
+Pending jobs are indexed by (platform_id, account_id) and, through
+PlatformInfo.account_id, by brand, so status evaluation asks "is there a
+pending failed job?" with a dict lookup instead of a query per brand.
+"""
+
+import datetime
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.logging import get_logger
+from src.model import AdvertisementChannel
+from src.sql import sql_manager
+
+logger = get_logger(__name__)
+
+FAILED_JOBS_BATCH_SIZE = int(os.environ.get("FAILED_JOBS_BATCH_SIZE", "5000"))
+FAILED_JOBS_REFRESH_SECONDS = float(os.environ.get("FAILED_JOBS_REFRESH_SECONDS", "60"))
+# How far behind the cursor each refresh re-scans; should exceed the longest
+# gap between a job's time_of_failure and the commit of its row.
+FAILED_JOBS_LOOKBACK = datetime.timedelta(
+    minutes=float(os.environ.get("FAILED_JOBS_LOOKBACK_MINUTES", "15"))
+)
+# Statuses (case-insensitive) of jobs that no longer need attention.
+FAILED_JOBS_RESOLVED_STATUSES = {
+    status.strip().lower()
+    for status in os.environ.get(
+        "FAILED_JOBS_RESOLVED_STATUSES", "resolved,success,succeeded,completed,done"
+    ).split(",")
+}
+# A pending job whose next retry is this far in the past is overdue.
+FAILED_JOBS_OVERDUE_AFTER = datetime.timedelta(
+    minutes=float(os.environ.get("FAILED_JOBS_OVERDUE_MINUTES", "30"))
+)
+# An account is in a retry storm with this many failures inside the window,
+# or with a pending job retried this many times.
+FAILED_JOBS_STORM_WINDOW = datetime.timedelta(hours=1)
+FAILED_JOBS_STORM_FAILURES = int(os.environ.get("FAILED_JOBS_STORM_FAILURES", "5"))
+FAILED_JOBS_STORM_RETRIES = int(os.environ.get("FAILED_JOBS_STORM_RETRIES", "10"))
+
+AccountKey = Tuple[int, str]
+
+
+class FailedJob:
+    __slots__ = (
+        "job_id",
+        "platform_id",
+        "account_id",
+        "status",
+        "run_status",
+        "retry_count",
+        "time_of_failure",
+        "time_of_next_retry",
+    )
+
+    def __init__(self, row):
+        self.job_id = row.job_id
+        self.platform_id = row.platform_id
+        self.account_id = row.account_id
+        self.status = row.status
+        self.run_status = row.run_status
+        self.retry_count = row.retry_count or 0
+        self.time_of_failure = row.time_of_failure
+        self.time_of_next_retry = row.time_of_next_retry
+
+    @property
+    def account(self) -> AccountKey:
+        return (self.platform_id, self.account_id)
+
+    @property
+    def pending(self) -> bool:
+        return (self.status or "").lower() not in FAILED_JOBS_RESOLVED_STATUSES
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class FailedJobsMonitor:
+    def __init__(self, batch_size: int = FAILED_JOBS_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # Serialises refreshes; readers only take _lock.
+        self._refresh_lock = threading.Lock()
+        self._cursor: Optional[Tuple[datetime.datetime, int]] = None
+        # Pending jobs, plus resolved ones still inside the storm window.
+        self._jobs: Dict[int, FailedJob] = {}
+        self._pending_by_account: Dict[AccountKey, Set[int]] = defaultdict(set)
+        self._brands_by_account: Dict[AccountKey, Set[int]] = defaultdict(set)
+        self._pending_by_brand: Counter = Counter()
+        self._pending_by_brand_channel: Counter = Counter()
+        self.refreshed_at: Optional[datetime.datetime] = None
+
+    def _track(self, job: FailedJob):
+        self._jobs[job.job_id] = job
+        pending = self._pending_by_account[job.account]
+        if job.pending:
+            pending.add(job.job_id)
+        else:
+            pending.discard(job.job_id)
+            if not pending:
+                del self._pending_by_account[job.account]
+
+    def _untrack(self, job_id: int):
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        pending = self._pending_by_account.get(job.account)
+        if pending is not None:
+            pending.discard(job_id)
+            if not pending:
+                del self._pending_by_account[job.account]
+
+    def _rebuild_brand_index(self):
+        by_brand = Counter()
+        by_brand_channel = Counter()
+        for (platform_id, account_id), job_ids in self._pending_by_account.items():
+            for brand_id in self._brands_by_account.get((platform_id, account_id), ()):
+                by_brand[brand_id] += len(job_ids)
+                by_brand_channel[(brand_id, platform_id)] += len(job_ids)
+        self._pending_by_brand = by_brand
+        self._pending_by_brand_channel = by_brand_channel
+
+    def refresh(self, now: Optional[datetime.datetime] = None) -> dict:
+        """
+        Load failures past the cursor, re-read pending jobs and rebuild the
+        brand index. Returns counts of what changed.
+        """
+        with self._refresh_lock:
+            return self._refresh(now)
+
+    def _refresh(self, now: Optional[datetime.datetime] = None) -> dict:
+        now = now or datetime.datetime.now()
+        start_time = datetime.datetime.now()
+        brands_by_account = defaultdict(set)
+        for platform_id, account_id, brand_id in sql_manager.get_live_accounts():
+            brands_by_account[(platform_id, account_id)].add(brand_id)
+
+        new_rows = []
+        cursor = self._cursor
+        if cursor is not None:
+            # Job ids are positive, so -1 takes every row at that time.
+            cursor = (cursor[0] - FAILED_JOBS_LOOKBACK, -1)
+        while True:
+            batch = sql_manager.get_failed_jobs_after(cursor, self.batch_size)
+            new_rows.extend(batch)
+            if batch:
+                cursor = (batch[-1].time_of_failure, batch[-1].job_id)
+            if len(batch) < self.batch_size:
+                break
+        # The lookback may end before the previous high-water mark.
+        if self._cursor is not None and (cursor is None or cursor < self._cursor):
+            cursor = self._cursor
+
+        with self._lock:
+            pending_ids = {
+                job_id for ids in self._pending_by_account.values() for job_id in ids
+            }
+        updated_rows = sql_manager.get_failed_jobs_by_ids(pending_ids)
+        # Pending jobs the re-read did not return were deleted.
+        deleted_ids = pending_ids - {row.job_id for row in updated_rows}
+
+        with self._lock:
+            new_ids = {row.job_id for row in new_rows} - self._jobs.keys()
+            for row in new_rows + updated_rows:
+                self._track(FailedJob(row))
+            for job_id in deleted_ids:
+                self._untrack(job_id)
+            # Resolved jobs are only kept while they count towards a storm.
+            horizon = now - FAILED_JOBS_STORM_WINDOW
+            for job_id in [
+                job_id
+                for job_id, job in self._jobs.items()
+                if not job.pending and job.time_of_failure < horizon
+            ]:
+                del self._jobs[job_id]
+            self._brands_by_account = brands_by_account
+            self._rebuild_brand_index()
+            self._cursor = cursor
+            self.refreshed_at = now
+
+        changes = {
+            "new": len(new_ids),
+            "rechecked": len(updated_rows),
+            "deleted": len(deleted_ids),
+        }
+        logger.info(
+            f"Failed jobs refresh: {changes['new']} new, {changes['rechecked']} "
+            f"rechecked, {changes['deleted']} deleted, "
+            f"{self.pending_count()} pending, in "
+            f"{datetime.datetime.now() - start_time}"
+        )
+        return changes
+
+    def is_stale(self, max_age: float = FAILED_JOBS_REFRESH_SECONDS) -> bool:
+        age = self.refreshed_at and datetime.datetime.now() - self.refreshed_at
+        return age is None or age.total_seconds() > max_age
+
+    def refresh_if_stale(self, max_age: float = FAILED_JOBS_REFRESH_SECONDS):
+        if self.is_stale(max_age):
+            with self._refresh_lock:
+                # Callers that waited on the lock reuse the refresh they
+                # waited for.
+                if self.is_stale(max_age):
+                    self._refresh()
+        return self
+
+    def has_pending(
+        self, brand_id: int, channel: Optional[AdvertisementChannel] = None
+    ) -> bool:
+        return self.pending_for(brand_id, channel) > 0
+
+    def pending_for(
+        self, brand_id: int, channel: Optional[AdvertisementChannel] = None
+    ) -> int:
+        if channel is None:
+            return self._pending_by_brand.get(brand_id, 0)
+        return self._pending_by_brand_channel.get((brand_id, channel.value), 0)
+
+    def pending_count(self) -> int:
+        return sum(len(ids) for ids in self._pending_by_account.values())
+
+    def _pending_jobs(self) -> List[FailedJob]:
+        with self._lock:
+            return [
+                self._jobs[job_id]
+                for ids in self._pending_by_account.values()
+                for job_id in ids
+            ]
+
+    def _with_brands(self, rows: List[dict]) -> pd.DataFrame:
+        for row in rows:
+            brands = self._brands_by_account.get(
+                (row["platform_id"], row["account_id"]), ()
+            )
+            row["brand_ids"] = sorted(brands)
+            row["channel"] = AdvertisementChannel(row["platform_id"]).name
+        return pd.DataFrame(rows)
+
+    def overdue_retries(self, now: Optional[datetime.datetime] = None) -> pd.DataFrame:
+        """
+        Pending jobs whose next retry should have run FAILED_JOBS_OVERDUE_AFTER
+        ago, most overdue first.
+        """
+        now = now or datetime.datetime.now()
+        rows = [
+            {**job.to_dict(), "overdue_by": now - job.time_of_next_retry}
+            for job in self._pending_jobs()
+            if job.time_of_next_retry is not None
+            and now - job.time_of_next_retry > FAILED_JOBS_OVERDUE_AFTER
+        ]
+        rows.sort(key=lambda row: row["overdue_by"], reverse=True)
+        return self._with_brands(rows)
+
+    def retry_storms(self, now: Optional[datetime.datetime] = None) -> pd.DataFrame:
+        """
+        Accounts with FAILED_JOBS_STORM_FAILURES failures in the last
+        FAILED_JOBS_STORM_WINDOW, or a pending job retried
+        FAILED_JOBS_STORM_RETRIES times.
+        """
+        now = now or datetime.datetime.now()
+        horizon = now - FAILED_JOBS_STORM_WINDOW
+        failures = Counter()
+        retries = Counter()
+        with self._lock:
+            for job in self._jobs.values():
+                if job.time_of_failure >= horizon:
+                    failures[job.account] += 1
+                if job.pending:
+                    retries[job.account] = max(retries[job.account], job.retry_count)
+        rows = [
+            {
+                "platform_id": account[0],
+                "account_id": account[1],
+                "recent_failures": failures[account],
+                "max_retry_count": retries[account],
+            }
+            for account in set(failures) | set(retries)
+            if failures[account] >= FAILED_JOBS_STORM_FAILURES
+            or retries[account] >= FAILED_JOBS_STORM_RETRIES
+        ]
+        rows.sort(key=lambda row: row["recent_failures"], reverse=True)
+        return self._with_brands(rows)
+
+    def stats(self) -> dict:
+        return {
+            "tracked_jobs": len(self._jobs),
+            "pending_jobs": self.pending_count(),
+            "brands_with_pending": len(self._pending_by_brand),
+            "cursor": self._cursor and [self._cursor[0].isoformat(), self._cursor[1]],
+            "refreshed_at": self.refreshed_at and self.refreshed_at.isoformat(),
+        }
+
+
+_monitor: Optional[FailedJobsMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor() -> FailedJobsMonitor:
+    """
+    The process-wide monitor, refreshed when older than
+    FAILED_JOBS_REFRESH_SECONDS.
+    """
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = FailedJobsMonitor()
+    return _monitor.refresh_if_stale()
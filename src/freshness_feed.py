@@ -0,0 +1,519 @@
+"""
+Push-based freshness updates.
+
+Importers (Airbyte/OTL jobs) POST a FreshnessEvent after each load:
+
+    POST /events
+    {"platform_info_id": 12, "table": "daily_insights",
+     "max_date": "2026-10-17", "row_count": 840}
+
+The events advance an in-memory FreshnessIndex that the dashboard reads
+in O(1), instead of waiting for the hourly re-aggregation of the insight
+tables. A reconciliation pass runs every FRESHNESS_RECONCILE_SECONDS. It
+advances the incremental watermarks (src.sql.watermark) and folds them in,
+so events lost in transit are still picked up. Only one process binds the
+port; any other (a second dashboard worker) logs a warning and only
+reconciles.
+
+    python -m src.freshness_feed serve --db-url sqlite:///fixture.sqlite
+    python -m src.freshness_feed emit 12 daily_insights 2026-10-17 --rows 840
+"""
+
+import argparse
+import asyncio
+import datetime
+import errno
+import ipaddress
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import requests
+from aiohttp import web
+
+from src.logging import get_logger
+from src.model import AdvertisementChannel
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.watermark import ASSET_TABLES, PLATFORM_INFO_TABLES, refresh_watermarks
+
+logger = get_logger(__name__)
+
+# Run the ingest endpoint inside the dashboard process.
+FRESHNESS_FEED_ENABLED = os.environ.get("FRESHNESS_FEED") == "1"
+# Set to 0 in processes that should only reconcile, e.g. extra dashboard
+# workers next to the one (or the `serve` service) that owns the port.
+FRESHNESS_FEED_LISTEN = os.environ.get("FRESHNESS_FEED_LISTEN", "1") == "1"
+# Listening beyond loopback requires FRESHNESS_FEED_TOKEN.
+FRESHNESS_FEED_HOST = os.environ.get("FRESHNESS_FEED_HOST", "127.0.0.1")
+FRESHNESS_FEED_PORT = int(os.environ.get("FRESHNESS_FEED_PORT", "8765"))
+# Shared secret importers send as "Authorization: Bearer <token>"; unset
+# accepts any caller, which is only allowed on a loopback host.
+FRESHNESS_FEED_TOKEN = os.environ.get("FRESHNESS_FEED_TOKEN")
+FRESHNESS_RECONCILE_SECONDS = float(
+    os.environ.get("FRESHNESS_RECONCILE_SECONDS", str(15 * 60))
+)
+FRESHNESS_FEED_URL = os.environ.get(
+    "FRESHNESS_FEED_URL", f"http://localhost:{FRESHNESS_FEED_PORT}"
+)
+
+# Events name tables by their database name; the watermark store by class.
+FEED_TABLES = {
+    table.__tablename__: table.__name__
+    for table in list(PLATFORM_INFO_TABLES) + ASSET_TABLES
+}
+_TABLE_NAMES_BY_CLASS = {name: table for table, name in FEED_TABLES.items()}
+
+FreshnessKey = Tuple[int, str]
+
+# Importers may run a timezone ahead of UTC; anything later is a bad event.
+MAX_DAYS_AHEAD = datetime.timedelta(days=1)
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+@dataclass
+class FreshnessEvent:
+    platform_info_id: int
+    table: str
+    max_date: datetime.date
+    row_count: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FreshnessEvent":
+        table = data.get("table")
+        if table not in FEED_TABLES:
+            raise Exception(f"Unknown table in freshness event: {table}")
+        max_date = data.get("max_date")
+        if isinstance(max_date, datetime.datetime):
+            max_date = max_date.date()
+        elif not isinstance(max_date, datetime.date):
+            max_date = datetime.date.fromisoformat(str(max_date)[:10])
+        latest = datetime.datetime.now(datetime.timezone.utc).date() + MAX_DAYS_AHEAD
+        if max_date > latest:
+            raise Exception(f"max_date {max_date} in freshness event is in the future")
+        return cls(
+            platform_info_id=int(data["platform_info_id"]),
+            table=table,
+            max_date=max_date,
+            row_count=int(data.get("row_count") or 0),
+        )
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["max_date"] = self.max_date.isoformat()
+        return data
+
+
+class FreshnessIndex:
+    """
+    Latest date per (platform_info_id, table), with a rollup per
+    (brand_id, channel name, table) for the dashboard. Events only move
+    marks forward; an event older than the current mark is ignored.
+    Reconciliation moves a mark back to SQL when it is ahead of it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._marks: Dict[FreshnessKey, datetime.date] = {}
+        self._rows_loaded: Dict[FreshnessKey, int] = {}
+        self._event_at: Dict[FreshnessKey, datetime.datetime] = {}
+        self._owners: Dict[int, Tuple[int, str]] = {}
+        self._by_brand: Dict[str, Dict[Tuple[int, str], datetime.date]] = {}
+        # Bumped whenever a mark or the rollup changes, so readers can cache
+        # anything derived from the index until it moves.
+        self.generation = 0
+        self.events_applied = 0
+        self.events_ignored = 0
+        self.reconcile_corrections = 0
+        self.reconcile_resets = 0
+        self.last_event_at: Optional[datetime.datetime] = None
+        self.last_reconciled_at: Optional[datetime.datetime] = None
+
+    def _advance(self, key: FreshnessKey, max_date: datetime.date) -> bool:
+        current = self._marks.get(key)
+        if current is not None and current >= max_date:
+            return False
+        self._marks[key] = max_date
+        self.generation += 1
+        owner = self._owners.get(key[0])
+        if owner is not None:
+            rollup = self._by_brand.setdefault(key[1], {})
+            if rollup.get(owner, max_date) <= max_date:
+                rollup[owner] = max_date
+        return True
+
+    def apply(self, event: FreshnessEvent) -> bool:
+        key = (event.platform_info_id, event.table)
+        with self._lock:
+            self._rows_loaded[key] = self._rows_loaded.get(key, 0) + event.row_count
+            self.last_event_at = datetime.datetime.now()
+            if self._advance(key, event.max_date):
+                self._event_at[key] = self.last_event_at
+                self.events_applied += 1
+                return True
+            self.events_ignored += 1
+            return False
+
+    def set_owners(self, platform_infos: Iterable[Tuple[int, int, int]]):
+        """
+        (platform_info_id, brand_id, platform_id) of the live platform infos;
+        rebuilds the per-brand rollup.
+        """
+        owners = {
+            int(platform_info_id): (
+                int(brand_id),
+                AdvertisementChannel(platform_id).name,
+            )
+            for platform_info_id, brand_id, platform_id in platform_infos
+        }
+        with self._lock:
+            self._owners = owners
+            self._rebuild_rollup()
+
+    def _rebuild_rollup(self):
+        by_brand: Dict[str, Dict[Tuple[int, str], datetime.date]] = {}
+        for (platform_info_id, table), max_date in self._marks.items():
+            owner = self._owners.get(platform_info_id)
+            if owner is None:
+                continue
+            rollup = by_brand.setdefault(table, {})
+            if rollup.get(owner, max_date) <= max_date:
+                rollup[owner] = max_date
+        self._by_brand = by_brand
+        self.generation += 1
+
+    def reconcile(
+        self,
+        marks: Dict[FreshnessKey, datetime.date],
+        as_of: Optional[datetime.datetime] = None,
+    ) -> int:
+        """
+        Fold in marks read from SQL; returns how many were ahead of the
+        index, i.e. loads whose event never arrived.
+
+        A mark ahead of SQL came from a bad event and is moved back, unless
+        an event set it after `as_of` (when the SQL read started) and the
+        read may simply have missed that load.
+        """
+        corrections = 0
+        resets = 0
+        with self._lock:
+            for key, max_date in marks.items():
+                if max_date is None:
+                    continue
+                if self._advance(key, max_date):
+                    corrections += 1
+                elif self._marks[key] > max_date and (
+                    as_of is None
+                    or self._event_at.get(key, datetime.datetime.min) < as_of
+                ):
+                    self._marks[key] = max_date
+                    resets += 1
+            if resets:
+                self._rebuild_rollup()
+            self.reconcile_corrections += corrections
+            self.reconcile_resets += resets
+            self.last_reconciled_at = datetime.datetime.now()
+        if resets:
+            logger.warning(
+                f"Freshness reconciliation reset {resets} marks ahead of SQL"
+            )
+        return corrections
+
+    def get(self, platform_info_id: int, table: str) -> Optional[datetime.date]:
+        return self._marks.get((platform_info_id, table))
+
+    def get_for_brand(
+        self, brand_id: int, channel: AdvertisementChannel, table: str
+    ) -> Optional[datetime.date]:
+        return self._by_brand.get(table, {}).get((brand_id, channel.name))
+
+    def for_platform_info(self, platform_info_id: int) -> Dict[str, datetime.date]:
+        with self._lock:
+            return {
+                table: self._marks[(platform_info_id, table)]
+                for table in FEED_TABLES
+                if (platform_info_id, table) in self._marks
+            }
+
+    def brand_marks(self, table: str) -> Dict[Tuple[int, str], datetime.date]:
+        with self._lock:
+            return dict(self._by_brand.get(table, {}))
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "marks": len(self._marks),
+            "platform_infos": len(self._owners),
+            "rows_loaded": sum(self._rows_loaded.values()),
+            "events_applied": self.events_applied,
+            "events_ignored": self.events_ignored,
+            "reconcile_corrections": self.reconcile_corrections,
+            "reconcile_resets": self.reconcile_resets,
+            "last_event_at": self.last_event_at and self.last_event_at.isoformat(),
+            "last_reconciled_at": self.last_reconciled_at
+            and self.last_reconciled_at.isoformat(),
+        }
+
+
+def reconcile(index: FreshnessIndex) -> int:
+    """
+    Reload platform info owners and advance the index from the watermark
+    store, which only range-scans the last few days of each table.
+    """
+    start_time = datetime.datetime.now()
+    index.set_owners(
+        sql_manager.get_platform_infos_for_brands(sql_manager.get_all_brand_ids())
+    )
+    watermarks = refresh_watermarks()
+    corrections = index.reconcile(
+        {
+            (platform_info_id, _TABLE_NAMES_BY_CLASS[table_name]): watermark
+            for (platform_info_id, table_name), watermark in watermarks.items()
+            if table_name in _TABLE_NAMES_BY_CLASS
+        },
+        as_of=start_time,
+    )
+    logger.info(
+        f"Freshness reconciliation corrected {corrections} marks "
+        f"in {datetime.datetime.now() - start_time}"
+    )
+    return corrections
+
+
+def overlay_snapshot(table: pa.Table, index: FreshnessIndex) -> pa.Table:
+    """
+    Advance the latest_*_date columns of an insights_stats snapshot table to
+    the dates the feed has seen since it was produced.
+    """
+    keys = pd.MultiIndex.from_arrays(
+        [
+            table["brand_id"].to_numpy(),
+            table["platform"].cast(pa.string()).to_numpy(zero_copy_only=False),
+        ]
+    )
+    for position, column in enumerate(table.column_names):
+        name = column[len("latest_") : -len("_date")]
+        if not (column.startswith("latest_") and name in FEED_TABLES):
+            continue
+        marks = index.brand_marks(name)
+        if not marks:
+            continue
+        fed = pd.Series(list(marks.values()), index=pd.MultiIndex.from_tuples(marks))
+        fed = fed.astype("datetime64[s]").reindex(keys).to_numpy("datetime64[D]")
+        current = table[column].to_numpy().astype("datetime64[D]")
+        table = table.set_column(
+            position,
+            column,
+            pa.array(np.fmax(current, fed), type=table.schema.field(column).type),
+        )
+    return table
+
+
+class FreshnessFeed:
+    """
+    The ingest endpoint and the reconciliation loop, on an event loop in a
+    background thread of the dashboard process.
+    """
+
+    def __init__(
+        self,
+        index: Optional[FreshnessIndex] = None,
+        host: str = FRESHNESS_FEED_HOST,
+        port: int = FRESHNESS_FEED_PORT,
+        token: Optional[str] = FRESHNESS_FEED_TOKEN,
+        reconcile_seconds: float = FRESHNESS_RECONCILE_SECONDS,
+        listen: bool = FRESHNESS_FEED_LISTEN,
+    ):
+        self.index = index or FreshnessIndex()
+        self.host = host
+        self.port = port
+        self.listen = listen
+        self.listening = False
+        self.token = token
+        self.reconcile_seconds = reconcile_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._runner: Optional[web.AppRunner] = None
+        self._reconciler: Optional[asyncio.Task] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/events", self._post_events)
+        app.router.add_get("/freshness/{platform_info_id}", self._get_freshness)
+        app.router.add_get("/health", self._get_health)
+        return app
+
+    def _authorized(self, request: web.Request) -> bool:
+        if not self.token:
+            return True
+        return request.headers.get("Authorization") == f"Bearer {self.token}"
+
+    async def _post_events(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        try:
+            payload = await request.json()
+            if isinstance(payload, dict):
+                payload = [payload]
+            events = [FreshnessEvent.from_dict(item) for item in payload]
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status=400)
+        applied = sum(self.index.apply(event) for event in events)
+        return web.json_response({"applied": applied, "ignored": len(events) - applied})
+
+    async def _get_freshness(self, request: web.Request) -> web.Response:
+        try:
+            platform_info_id = int(request.match_info["platform_info_id"])
+        except ValueError:
+            return web.json_response({"error": "invalid platform_info_id"}, status=400)
+        marks = self.index.for_platform_info(platform_info_id)
+        return web.json_response({k: v.isoformat() for k, v in marks.items()})
+
+    async def _get_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def _reconcile_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, reconcile, self.index)
+            except Exception as e:
+                logger.error(f"Freshness reconciliation failed: {e}")
+            await asyncio.sleep(self.reconcile_seconds)
+
+    async def _serve(self):
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        if self.listen:
+            try:
+                await web.TCPSite(self._runner, self.host, self.port).start()
+                self.listening = True
+                logger.info(f"Freshness feed listening on {self.host}:{self.port}")
+            except OSError as e:
+                if e.errno != errno.EADDRINUSE:
+                    raise
+                # Another process owns the endpoint; this one still
+                # reconciles, so its dates lag by at most one interval.
+                logger.warning(
+                    f"Freshness feed port {self.port} is in use, "
+                    f"reconciling only: {e}"
+                )
+        if self.reconcile_seconds > 0:
+            self._reconciler = asyncio.create_task(self._reconcile_forever())
+        self._started.set()
+
+    async def _shutdown(self):
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+        await self._runner.cleanup()
+
+    def start(self) -> "FreshnessFeed":
+        if self.listen and not self.token and not _is_loopback(self.host):
+            raise Exception(
+                f"Refusing to serve the freshness feed on {self.host} without "
+                "FRESHNESS_FEED_TOKEN"
+            )
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._serve())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="freshness-feed", daemon=True)
+        self._thread.start()
+        if not self._started.wait(timeout=10):
+            raise Exception("Freshness feed did not start")
+        return self
+
+    def stats(self) -> dict:
+        return {"listening": self.listening, **self.index.stats()}
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+
+class LocalProducer:
+    """
+    Stand-in for an importer: posts FreshnessEvents to a running feed.
+    """
+
+    def __init__(
+        self, url: str = FRESHNESS_FEED_URL, token: Optional[str] = FRESHNESS_FEED_TOKEN
+    ):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def emit(self, events: List[FreshnessEvent]) -> dict:
+        response = self.session.post(
+            f"{self.url}/events", json=[event.to_dict() for event in events], timeout=10
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the ingest endpoint")
+    serve.add_argument("--db-url", help="reconcile against this database")
+    serve.add_argument("--port", type=int, default=FRESHNESS_FEED_PORT)
+    serve.add_argument(
+        "--reconcile-seconds", type=float, default=FRESHNESS_RECONCILE_SECONDS
+    )
+
+    emit = commands.add_parser("emit", help="send one event, as an importer would")
+    emit.add_argument("platform_info_id", type=int)
+    emit.add_argument("table", choices=sorted(FEED_TABLES))
+    emit.add_argument("max_date")
+    emit.add_argument("--rows", type=int, default=0)
+    emit.add_argument("--url", default=FRESHNESS_FEED_URL)
+    args = parser.parse_args()
+
+    if args.command == "emit":
+        event = FreshnessEvent.from_dict(
+            {
+                "platform_info_id": args.platform_info_id,
+                "table": args.table,
+                "max_date": args.max_date,
+                "row_count": args.rows,
+            }
+        )
+        print(LocalProducer(args.url).emit([event]))
+        return
+
+    if args.db_url:
+        sql_engine.use_database_url(args.db_url)
+    feed = FreshnessFeed(port=args.port, reconcile_seconds=args.reconcile_seconds)
+    try:
+        feed.start()._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.stop()
+        sql_engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Append-only history of import health.
+
+Every snapshot run appends one Parquet file with the latest date and the
+daily row count for each (brand, platform, insight table), partitioned by
+day:
+
+    history/day=2026-10-17/20261017T010000Z.parquet
+    history/day=2026-10-16/day.parquet          <- after compaction
+
+Range queries only read the partitions in range, from the same storage the
+snapshots live in, so the dashboard charts trends without touching MySQL.
+Compaction merges each finished day into a single file and drops days older
+than HISTORY_RETENTION_DAYS.
+
+    python -m src.history compact --output-dir snapshots
+    python -m src.history query --output-dir snapshots --brand-id 12 --days 30
+"""
+
+import argparse
+import datetime
+import io
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.logging import get_logger
+from src.model import InsightsStats
+from src.s3 import LocalStorage, S3Storage
+from src.sql import sql_manager
+from src.sql.sql_manager import INSIGHT_TABLES
+from src.util import classify_last_insight_dates
+
+logger = get_logger(__name__)
+
+HISTORY_PREFIX = "history"
+HISTORY_RETENTION_DAYS = int(os.environ.get("HISTORY_RETENTION_DAYS", "400"))
+COMPACTED_FILENAME = "day.parquet"
+
+Storage = Union[S3Storage, LocalStorage]
+
+HISTORY_SCHEMA = pa.schema(
+    [
+        ("snapshot_at", pa.timestamp("ms", tz="UTC")),
+        ("brand_id", pa.int64()),
+        ("platform", pa.dictionary(pa.int8(), pa.string())),
+        ("table", pa.dictionary(pa.int8(), pa.string())),
+        ("latest_date", pa.date32()),
+        # Rows dated the day before the snapshot, the last complete import day.
+        ("row_count", pa.int64()),
+    ]
+)
+
+
+def _day_key(day: datetime.date, filename: str) -> str:
+    return f"{HISTORY_PREFIX}/day={day.isoformat()}/{filename}"
+
+
+def _day_of(key: str) -> Optional[datetime.date]:
+    for part in key.split("/"):
+        if part.startswith("day="):
+            return datetime.date.fromisoformat(part[len("day=") :])
+    return None
+
+
+def _keys_by_day(storage: Storage) -> Dict[datetime.date, List[str]]:
+    days = defaultdict(list)
+    for key in storage.list(f"{HISTORY_PREFIX}/"):
+        day = _day_of(key)
+        if day is not None and key.endswith(".parquet"):
+            days[day].append(key)
+    return days
+
+
+def _daily_counts(statistics: InsightsStats, day: datetime.date) -> dict:
+    rows = sql_manager.get_daily_insight_counts(
+        np.unique(statistics.brand_id).tolist(), day, day
+    )
+    counts = {table: {} for table in INSIGHT_TABLES}
+    tables = {table.__tablename__: table for table in INSIGHT_TABLES}
+    for brand_id, platform_id, table_name, count in zip(
+        rows["brand_id"], rows["platform_id"], rows["table_name"], rows["count"]
+    ):
+        counts[tables[table_name]][(int(brand_id), int(platform_id))] = int(count)
+    return counts
+
+
+def build_history_table(
+    statistics: InsightsStats, now: datetime.datetime, counts: Optional[dict] = None
+) -> pa.Table:
+    """
+    One row per (brand, platform, insight table) of `statistics`. `counts`
+    maps table -> {(brand_id, platform_id): rows}, as _daily_counts returns.
+    """
+    n = len(statistics)
+    snapshot_at = now.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    platforms = pa.array(statistics.platform_names()).dictionary_encode()
+    pairs = list(zip(statistics.brand_id.tolist(), statistics.platform_id.tolist()))
+
+    chunks = []
+    for table in INSIGHT_TABLES:
+        column = f"latest_{table.__tablename__}_date"
+        table_counts = (counts or {}).get(table)
+        row_count = (
+            pa.array([table_counts.get(pair, 0) for pair in pairs], type=pa.int64())
+            if table_counts is not None
+            else pa.nulls(n, type=pa.int64())
+        )
+        chunks.append(
+            pa.table(
+                {
+                    "snapshot_at": pa.array(
+                        np.full(n, np.datetime64(snapshot_at, "ms")),
+                        type=pa.timestamp("ms", tz="UTC"),
+                    ),
+                    "brand_id": pa.array(statistics.brand_id),
+                    "platform": platforms,
+                    "table": pa.DictionaryArray.from_arrays(
+                        pa.array(np.zeros(n, dtype=np.int8)),
+                        pa.array([table.__tablename__]),
+                    ),
+                    "latest_date": pa.array(statistics.dates[column], type=pa.date32()),
+                    "row_count": row_count,
+                }
+            ).cast(HISTORY_SCHEMA)
+        )
+    return pa.concat_tables(chunks).unify_dictionaries().combine_chunks()
+
+
+def append(storage: Storage, table: pa.Table, now: datetime.datetime) -> str:
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet, compression="zstd")
+    key = _day_key(now.date(), f"{now.strftime('%Y%m%dT%H%M%SZ')}.parquet")
+    storage.put(key, parquet.getvalue(), content_type="application/vnd.apache.parquet")
+    logger.info(
+        f"Appended {table.num_rows} history rows to {key} "
+        f"({len(parquet.getvalue())} bytes)"
+    )
+    return key
+
+
+def record_snapshot(
+    storage: Storage, statistics: InsightsStats, now: datetime.datetime
+) -> str:
+    counts = _daily_counts(statistics, now.date() - datetime.timedelta(days=1))
+    return append(storage, build_history_table(statistics, now, counts), now)
+
+
+def load_history(
+    storage: Storage,
+    start: datetime.date,
+    end: datetime.date,
+    brand_ids: Optional[Iterable[int]] = None,
+    tables: Optional[Iterable[str]] = None,
+) -> pa.Table:
+    """
+    History rows recorded on days start..end (inclusive). Only the partitions
+    in range are read.
+    """
+    parts = []
+    for day, keys in sorted(_keys_by_day(storage).items()):
+        if not start <= day <= end:
+            continue
+        for key in keys:
+            data = storage.get(key)
+            if data is not None:
+                parts.append(pq.read_table(io.BytesIO(data)))
+    if not parts:
+        return HISTORY_SCHEMA.empty_table()
+
+    history = pa.concat_tables(parts).unify_dictionaries()
+    mask = None
+    if brand_ids is not None:
+        mask = pc.is_in(history["brand_id"], pa.array(list(brand_ids), pa.int64()))
+    if tables is not None:
+        condition = pc.is_in(history["table"].cast(pa.string()), pa.array(list(tables)))
+        mask = condition if mask is None else pc.and_(mask, condition)
+    return history if mask is None else history.filter(mask)
+
+
+def compact(
+    storage: Storage,
+    today: Optional[datetime.date] = None,
+    retention_days: int = HISTORY_RETENTION_DAYS,
+) -> dict:
+    """
+    Merge every finished day into one sorted file and delete days past
+    retention. Today's partition is left alone while snapshots still land in
+    it.
+    """
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    cutoff = today - datetime.timedelta(days=retention_days)
+    merged = dropped = 0
+    for day, keys in sorted(_keys_by_day(storage).items()):
+        if day < cutoff:
+            for key in keys:
+                storage.delete(key)
+            dropped += 1
+            continue
+        if day >= today or keys == [_day_key(day, COMPACTED_FILENAME)]:
+            continue
+
+        parts = [pq.read_table(io.BytesIO(storage.get(key))) for key in keys]
+        table = (
+            pa.concat_tables(parts)
+            .unify_dictionaries()
+            .sort_by([("snapshot_at", "ascending"), ("brand_id", "ascending")])
+            .combine_chunks()
+        )
+        parquet = io.BytesIO()
+        pq.write_table(table, parquet, compression="zstd")
+        compacted = _day_key(day, COMPACTED_FILENAME)
+        # The merged file is written before the parts go, so a reader in
+        # between sees rows twice rather than not at all.
+        storage.put(compacted, parquet.getvalue())
+        for key in keys:
+            if key != compacted:
+                storage.delete(key)
+        merged += 1
+    logger.info(f"History compaction merged {merged} days, dropped {dropped} days")
+    return {"merged": merged, "dropped": dropped}
+
+
+def _last_per_day(history: pa.Table) -> pd.DataFrame:
+    df = history.to_pandas()
+    df["snapshot_at"] = df["snapshot_at"].dt.tz_localize(None)
+    df["day"] = df["snapshot_at"].dt.normalize()
+    last = df.groupby("day")["snapshot_at"].transform("max")
+    return df[df["snapshot_at"] == last]
+
+
+def status_trend(history: pa.Table, table: str = "daily_insights") -> pd.DataFrame:
+    """
+    Brand/platform pairs per status at the last snapshot of each day, one
+    column per Status, indexed by day.
+    """
+    df = _last_per_day(history)
+    df = df[df["table"] == table].sort_values("snapshot_at", kind="stable")
+    if df.empty:
+        return pd.DataFrame()
+    df["status"] = np.concatenate(
+        [
+            classify_last_insight_dates(
+                group["latest_date"].astype("datetime64[ns]"),
+                now=snapshot_at.to_pydatetime(),
+            ).astype(str)
+            for snapshot_at, group in df.groupby("snapshot_at")
+        ]
+    )
+    return df.groupby(["day", "status"]).size().unstack(fill_value=0)
+
+
+def brand_trend(history: pa.Table, brand_id: int) -> pd.DataFrame:
+    """
+    Daily row counts and days behind the snapshot per platform and table of
+    one brand, at the last snapshot of each day.
+    """
+    df = _last_per_day(history)
+    df = df[df["brand_id"] == brand_id].copy()
+    df["days_behind"] = (df["day"] - df["latest_date"].astype("datetime64[ns]")).dt.days
+    df["series"] = df["platform"].astype(str) + " " + df["table"].astype(str)
+    return df[["day", "series", "row_count", "days_behind"]]
+
+
+def main():
+    from src.snapshot import get_storage
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact_parser = commands.add_parser("compact")
+    compact_parser.add_argument(
+        "--retention-days", type=int, default=HISTORY_RETENTION_DAYS
+    )
+    query_parser = commands.add_parser("query")
+    query_parser.add_argument("--brand-id", type=int)
+    query_parser.add_argument("--days", type=int, default=30)
+    for command in (compact_parser, query_parser):
+        command.add_argument(
+            "--output-dir", help="use this directory instead of the snapshot bucket"
+        )
+    args = parser.parse_args()
+
+    storage = LocalStorage(args.output_dir) if args.output_dir else get_storage()
+    if args.command == "compact":
+        print(compact(storage, retention_days=args.retention_days))
+        return
+
+    end = datetime.datetime.now(datetime.timezone.utc).date()
+    history = load_history(storage, end - datetime.timedelta(days=args.days), end)
+    if args.brand_id is not None:
+        print(brand_trend(history, args.brand_id).to_string(index=False))
+    else:
+        print(status_trend(history).to_string())
+
+
+if __name__ == "__main__":
+    main()
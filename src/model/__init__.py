@@ -1,3 +1,4 @@
 from .advertisement_channel import AdvertisementChannel
 from .account_details import AccountDetails
 from .status import Status
+from .insights_stats import InsightsStats
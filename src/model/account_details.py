@@ -3,6 +3,17 @@ from src.model.advertisement_channel import AdvertisementChannel
 
 
 class AccountDetails:
+    __slots__ = (
+        "brand_id",
+        "account_id",
+        "account_name",
+        "channel",
+        "token1",
+        "token2",
+        "target_words",
+        "description",
+    )
+
     def __init__(
         self,
         account_id: str,
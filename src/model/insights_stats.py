@@ -0,0 +1,50 @@
+from typing import Dict, List
+
+import numpy as np
+
+from src.model.advertisement_channel import AdvertisementChannel
+
+
+class InsightsStats:
+    """
+    Columnar get_insights_stats result: one NumPy array per column, with the
+    latest insight dates as datetime64[D] (NaT when a table has no rows).
+    Dates are only formatted as strings at render time, by to_records().
+    """
+
+    __slots__ = ("brand_id", "brand_name", "platform_id", "dates")
+
+    def __init__(
+        self,
+        brand_id: np.ndarray,
+        brand_name: np.ndarray,
+        platform_id: np.ndarray,
+        dates: Dict[str, np.ndarray],
+    ):
+        self.brand_id = brand_id
+        self.brand_name = brand_name
+        self.platform_id = platform_id
+        self.dates = dates
+
+    def __len__(self):
+        return len(self.brand_id)
+
+    def platform_names(self) -> np.ndarray:
+        names = {channel.value: channel.name for channel in AdvertisementChannel}
+        codes, inverse = np.unique(self.platform_id, return_inverse=True)
+        return np.array([names[code] for code in codes.tolist()], dtype=object)[inverse]
+
+    def to_records(self) -> List[dict]:
+        """
+        The row-per-dict shape get_insights_stats has always returned, with
+        dates as YYYY-MM-DD strings and "NULL" for missing ones.
+        """
+        columns = {
+            "brand_id": self.brand_id.tolist(),
+            "brand_name": self.brand_name.tolist(),
+            "platform": self.platform_names().tolist(),
+        }
+        for name, dates in self.dates.items():
+            formatted = np.datetime_as_string(dates, unit="D")
+            columns[name] = np.where(np.isnat(dates), "NULL", formatted).tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
@@ -0,0 +1,216 @@
+"""
+Full dashboard rebuild sharded across a process pool.
+
+Active brand ids are split into contiguous shards. Each worker process
+builds its own engine, connection pool (and SSH tunnel when LOCAL_TO_PROD=1)
+and computes OTL status (escalated by volume anomalies, see src.anomaly),
+last-import watermarks and, optionally, Airbyte connection status for its
+shard; the partial reports are merged into one DataFrame with a row per
+(brand_id, channel). A pending failed job raises the status to WARNING.
+
+    python -m src.refresh --shards 4 --output refresh.html
+"""
+
+import argparse
+import datetime
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src import anomaly, failed_jobs, util
+from src.airbyte_util import get_airbyte_client
+from src.logging import get_logger
+from src.model import AdvertisementChannel, Status
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+
+logger = get_logger(__name__)
+
+REFRESH_SHARDS = int(os.environ.get("REFRESH_SHARDS", str(os.cpu_count() or 1)))
+# Channels with an Airbyte workspace; see airbyte_util._get_endpoint_for_channel.
+AIRBYTE_CHANNELS = [AdvertisementChannel.GOOGLE, AdvertisementChannel.FACEBOOK]
+
+
+def shard_brand_ids(brand_ids: Iterable[int], shards: int) -> List[List[int]]:
+    """
+    Contiguous, near-equal shards of the sorted ids, so each worker's IN
+    lists hit neighbouring index ranges.
+    """
+    ordered = np.sort(np.fromiter(brand_ids, dtype=np.int64))
+    return [
+        shard.tolist()
+        for shard in np.array_split(ordered, max(1, shards))
+        if len(shard)
+    ]
+
+
+def _init_worker(db_url: Optional[str]):
+    # Spawned workers start with fresh module state; only the database
+    # override has to be carried over from the parent.
+    if db_url:
+        sql_engine.use_database_url(db_url)
+
+
+def _airbyte_columns(report: pd.DataFrame) -> pd.DataFrame:
+    client = get_airbyte_client()
+    counts = np.full(len(report), np.nan)
+    states = np.full(len(report), None, dtype=object)
+    for channel in AIRBYTE_CHANNELS:
+        rows = np.flatnonzero((report["channel"] == channel.name).to_numpy())
+        if not len(rows):
+            continue
+        try:
+            index = client.get_connections_by_brand(channel)
+        except Exception as e:
+            logger.warning(f"Airbyte status for {channel.name} unavailable: {e}")
+            continue
+        for row, brand_id in zip(rows, report["brand_id"].to_numpy()[rows]):
+            connections = index.get(int(brand_id), [])
+            counts[row] = len(connections)
+            states[row] = ",".join(
+                sorted({str(c.get("status", "unknown")) for c in connections})
+            )
+    report["airbyte_connections"] = counts
+    report["airbyte_status"] = states
+    return report
+
+
+def refresh_shard(
+    brand_ids: List[int],
+    now: Optional[datetime.datetime] = None,
+    include_airbyte: bool = False,
+) -> pd.DataFrame:
+    now = now or datetime.datetime.now()
+    statuses = util.get_all_brand_statuses(brand_ids=brand_ids, now=now)
+    if statuses.empty:
+        # None of these brands has a live platform info.
+        return statuses
+    statuses["channel"] = statuses["channel"].astype(str)
+    volume = anomaly.get_volume_statuses(
+        brand_ids, end=now.date() - datetime.timedelta(days=1)
+    )
+    statuses = statuses.merge(volume, on=["brand_id", "channel"], how="left")
+    statuses["volume_status"] = statuses["volume_status"].fillna(Status.UNKNOWN.name)
+    statuses["status"] = util.escalate_statuses(
+        statuses["status"], statuses["volume_status"]
+    ).astype(str)
+
+    platform_infos = pd.DataFrame(
+        sql_manager.get_platform_infos_for_brands(brand_ids),
+        columns=["platform_info_id", "brand_id", "platform_id"],
+    )
+    last_import = sql_manager.get_last_import_stats_bulk(
+        platform_infos["platform_info_id"]
+    )
+    last_import = last_import.apply(pd.to_datetime).add_prefix("last_")
+    last_import = platform_infos.join(last_import, on="platform_info_id")
+    last_import["channel"] = [
+        AdvertisementChannel(p).name for p in last_import["platform_id"]
+    ]
+    # A brand can have several platform infos on one channel; keep the newest.
+    last_import = (
+        last_import.drop(columns=["platform_info_id", "platform_id"])
+        .groupby(["brand_id", "channel"], as_index=False)
+        .max()
+    )
+
+    report = statuses.merge(last_import, on=["brand_id", "channel"], how="left")
+    if include_airbyte:
+        report = _airbyte_columns(report)
+
+    for column in report.columns:
+        if column == "last_insight_date" or column.startswith("last_"):
+            report[column] = report[column].dt.strftime("%Y-%m-%d").fillna("NULL")
+    return report
+
+
+def run_refresh(
+    shards: int = REFRESH_SHARDS,
+    brand_ids: Optional[Iterable[int]] = None,
+    include_airbyte: bool = False,
+    now: Optional[datetime.datetime] = None,
+) -> pd.DataFrame:
+    if brand_ids is None:
+        brand_ids = sql_manager.get_all_brand_ids()
+    now = now or datetime.datetime.now()
+    parts = shard_brand_ids(brand_ids, shards)
+
+    start = time.perf_counter()
+    if len(parts) <= 1:
+        frames = [refresh_shard(part, now, include_airbyte) for part in parts]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=len(parts),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(sql_engine.DB_URL,),
+        ) as pool:
+            frames = list(
+                pool.map(refresh_shard, parts, repeat(now), repeat(include_airbyte))
+            )
+    logger.info(
+        f"Refreshed {sum(len(p) for p in parts)} brands in {len(parts)} shards "
+        f"in {time.perf_counter() - start:.2f} s"
+    )
+
+    if not frames:
+        return pd.DataFrame()
+    report = (
+        pd.concat(frames, ignore_index=True)
+        .sort_values(["brand_id", "channel"])
+        .reset_index(drop=True)
+    )
+
+    # One monitor in the parent; every row is then a dict lookup.
+    monitor = failed_jobs.get_monitor()
+    report["pending_failed_jobs"] = [
+        monitor.pending_for(brand_id, AdvertisementChannel[channel])
+        for brand_id, channel in zip(report["brand_id"], report["channel"])
+    ]
+    report["status"] = util.escalate_statuses(
+        report["status"],
+        pd.Series(
+            np.where(
+                report["pending_failed_jobs"] > 0,
+                Status.WARNING.name,
+                Status.OK.name,
+            )
+        ),
+    ).astype(str)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shards", type=int, default=REFRESH_SHARDS)
+    parser.add_argument(
+        "--db-url", help="SQLAlchemy URL to read from instead of production MySQL"
+    )
+    parser.add_argument("--airbyte", action="store_true", help="include Airbyte status")
+    parser.add_argument("--output", help="write the report as .html or .parquet")
+    args = parser.parse_args()
+
+    if args.db_url:
+        sql_engine.use_database_url(args.db_url)
+    try:
+        report = run_refresh(shards=args.shards, include_airbyte=args.airbyte)
+    finally:
+        sql_engine.shutdown()
+
+    if args.output and args.output.endswith(".parquet"):
+        report.to_parquet(args.output, index=False)
+    elif args.output:
+        with open(args.output, "w") as f:
+            f.write(report.to_html(index=False))
+    else:
+        print(report.to_string(index=False, max_rows=50))
+
+
+if __name__ == "__main__":
+    main()
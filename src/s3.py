@@ -1,11 +1,252 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
 import boto3
+from botocore.exceptions import ClientError
+
+from src.logging import get_logger
+
+logger = get_logger(__name__)
+
+# e.g. http://127.0.0.1:5000 for a local moto server.
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")
+S3_CACHE_DIR = os.environ.get("S3_CACHE_DIR", ".s3_cache")
+S3_CACHE_MAX_BYTES = int(os.environ.get("S3_CACHE_MAX_BYTES", str(256 * 1024**2)))
+# A cached object checked this recently is served without asking S3 again, so
+# Streamlit reruns within the window cost no round trip at all.
+S3_REVALIDATE_AFTER = float(os.environ.get("S3_REVALIDATE_AFTER", "30"))
+# HTML/text bodies larger than this are uploaded gzip-compressed.
+S3_GZIP_MIN_BYTES = int(os.environ.get("S3_GZIP_MIN_BYTES", str(64 * 1024)))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL)
+        return _client
+
+
+class CachedS3Reader:
+    """
+    Reads S3 objects through a size-bounded local disk cache.
+
+    Cached objects are revalidated with a conditional GET (If-None-Match on
+    the stored ETag), so an unchanged report costs a 304 instead of a full
+    download. Least recently read objects are evicted once the cache grows
+    past `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        cache_dir: str = S3_CACHE_DIR,
+        max_bytes: int = S3_CACHE_MAX_BYTES,
+        revalidate_after: float = S3_REVALIDATE_AFTER,
+    ):
+        self.client = client or get_client()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self._checked_at = {}
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.not_modified = 0
+        self.downloads = 0
+        self.bytes_downloaded = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, bucket_name: str, key: str):
+        name = hashlib.sha256(f"{bucket_name}/{key}".encode()).hexdigest()
+        base = os.path.join(self.cache_dir, name)
+        return f"{base}.body", f"{base}.json"
+
+    def _load(self, bucket_name: str, key: str):
+        body_path, meta_path = self._paths(bucket_name, key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        # mtime doubles as the last-read time for LRU eviction.
+        os.utime(body_path)
+        return meta, body
+
+    def _store(self, bucket_name: str, key: str, etag: Optional[str], body: bytes):
+        body_path, meta_path = self._paths(bucket_name, key)
+        for path, data in (
+            (body_path, body),
+            (meta_path, json.dumps({"etag": etag, "size": len(body)}).encode()),
+        ):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".body"):
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+                entries.append((stat.st_mtime, stat.st_size, filename))
+        total = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            base = os.path.join(self.cache_dir, filename[: -len(".body")])
+            for path in (f"{base}.body", f"{base}.json"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def read(self, bucket_name: str, key: str) -> bytes:
+        meta, body = self._load(bucket_name, key)
+        cache_key = (bucket_name, key)
+        if body is not None:
+            with self._lock:
+                checked_at = self._checked_at.get(cache_key, 0.0)
+                if time.monotonic() - checked_at < self.revalidate_after:
+                    self.fresh_hits += 1
+                    return body
+
+        kwargs = {"Bucket": bucket_name, "Key": key}
+        if meta and meta.get("etag"):
+            kwargs["IfNoneMatch"] = meta["etag"]
+        try:
+            response = self.client.get_object(**kwargs)
+        except ClientError as e:
+            if body is None or e.response["Error"]["Code"] not in (
+                "304",
+                "NotModified",
+            ):
+                raise
+            with self._lock:
+                self.not_modified += 1
+                self._checked_at[cache_key] = time.monotonic()
+            return body
+
+        data = response["Body"].read()
+        with self._lock:
+            self.downloads += 1
+            self.bytes_downloaded += len(data)
+        if response.get("ContentEncoding") == "gzip":
+            data = gzip.decompress(data)
+        self._store(bucket_name, key, response.get("ETag"), data)
+        with self._lock:
+            self._checked_at[cache_key] = time.monotonic()
+        return data
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "fresh_hits": self.fresh_hits,
+                "not_modified": self.not_modified,
+                "downloads": self.downloads,
+                "bytes_downloaded": self.bytes_downloaded,
+            }
+
+
+_reader: Optional[CachedS3Reader] = None
+_reader_lock = threading.Lock()
+
+
+def get_cached_reader() -> CachedS3Reader:
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = CachedS3Reader()
+        return _reader
 
 
 def read_html_from_s3(bucket_name: str, key: str) -> str:
     """
-    Get a file from S3 and return the file path.
+    Get a file from S3 and return its contents, served from the local cache
+    while the object's ETag is unchanged.
+    """
+    return get_cached_reader().read(bucket_name, key).decode("utf-8")
+
+
+class S3Storage:
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+
+    def put(self, key: str, data: bytes, content_type: Optional[str] = None):
+        extra = {"ContentType": content_type} if content_type else {}
+        if (
+            content_type
+            and content_type.startswith("text/")
+            and len(data) >= S3_GZIP_MIN_BYTES
+        ):
+            data = gzip.compress(data)
+            extra["ContentEncoding"] = "gzip"
+        get_client().put_object(Bucket=self.bucket_name, Key=key, Body=data, **extra)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return get_cached_reader().read(self.bucket_name, key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+
+    def list(self, prefix: str) -> List[str]:
+        paginator = get_client().get_paginator("list_objects_v2")
+        keys = []
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
+    def delete(self, key: str):
+        get_client().delete_object(Bucket=self.bucket_name, Key=key)
+
+
+class LocalStorage:
+    """
+    Filesystem stand-in for S3Storage, keys map to paths under `root`.
     """
-    s3 = boto3.resource("s3")
-    bucket = s3.Bucket(bucket_name)
-    obj = bucket.Object(key)
-    return obj.get()["Body"].read().decode("utf-8")
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, key: str, data: bytes, content_type: Optional[str] = None):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = os.path.join(self.root, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def list(self, prefix: str) -> List[str]:
+        keys = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                key = os.path.relpath(os.path.join(dirpath, filename), self.root)
+                key = key.replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def delete(self, key: str):
+        path = os.path.join(self.root, key)
+        if os.path.exists(path):
+            os.remove(path)
@@ -5,7 +5,10 @@
 
 import json
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
 
 import boto3
 from botocore.exceptions import ClientError
@@ -20,33 +23,153 @@ if USE_SECRET_MANAGER:
 else:
     logger.info("Using environment variables")
 
+SECRET_CACHE_TTL = int(os.environ.get("SECRET_CACHE_TTL", "300"))
+# Entries read within this many seconds of expiring are refreshed in the
+# background so callers on the hot path never wait on Secrets Manager.
+SECRET_REFRESH_AHEAD = int(os.environ.get("SECRET_REFRESH_AHEAD", "60"))
+
+_secret_cache = None
+_secret_cache_lock = threading.Lock()
+
 
 def _get_value_from_env(key: str, default_val: Optional[str] = None):
     val = os.environ.get(key, default_val)
     return val
 
 
+def _get_client(region_name: str):
+    # Create a Secrets Manager client
+    session = boto3.session.Session()
+    return session.client(service_name="secretsmanager", region_name=region_name)
+
+
+class SecretCache:
+    """
+    In-process cache of secret blobs keyed by SecretId.
+
+    Concurrent misses for the same SecretId share a single fetch, and hits
+    close to expiry trigger one background refresh. `client` is anything with
+    a boto3-style get_secret_value(SecretId=...), so a local fake works too.
+    """
+
+    def __init__(
+        self,
+        client,
+        ttl: float = SECRET_CACHE_TTL,
+        refresh_ahead: float = SECRET_REFRESH_AHEAD,
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._entries: Dict[str, Tuple[dict, float]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _fetch(self, secret_id: str) -> dict:
+        try:
+            get_secret_value_response = self.client.get_secret_value(SecretId=secret_id)
+        except ClientError as e:
+            # For a list of exceptions thrown, see
+            # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
+            raise e
+
+        # Decrypts secret using the associated KMS key.
+        secret = get_secret_value_response["SecretString"]
+
+        secret = json.loads(secret)
+        with self._lock:
+            self._entries[secret_id] = (secret, time.monotonic() + self.ttl)
+        return secret
+
+    def _refresh(self, secret_id: str):
+        try:
+            self._fetch(secret_id)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            # Keep serving the cached value until it actually expires.
+            logger.warning(f"Background refresh of {secret_id} failed: {e}")
+            with self._lock:
+                self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(secret_id)
+
+    def get(self, secret_id: str) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(secret_id)
+            if entry and now < entry[1]:
+                self.hits += 1
+                if (
+                    now >= entry[1] - self.refresh_ahead
+                    and secret_id not in self._refreshing
+                ):
+                    self._refreshing.add(secret_id)
+                    threading.Thread(
+                        target=self._refresh, args=(secret_id,), daemon=True
+                    ).start()
+                return entry[0]
+
+            self.misses += 1
+            future = self._inflight.get(secret_id)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[secret_id] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            secret = self._fetch(secret_id)
+            future.set_result(secret)
+            return secret
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(secret_id, None)
+
+    def invalidate(self, secret_id: Optional[str] = None):
+        with self._lock:
+            if secret_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(secret_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "entries": len(self._entries),
+            }
+
+
+def get_secret_cache(region_name: str) -> SecretCache:
+    global _secret_cache
+    with _secret_cache_lock:
+        if _secret_cache is None:
+            _secret_cache = SecretCache(_get_client(region_name))
+        return _secret_cache
+
+
 def _get_value_from_secrets(key: str, default_val: Optional[str] = None):
     secret_name = os.environ.get("SECRET_NAME")
     secret_region = os.environ.get("SECRET_REGION")
     if None in [secret_name, secret_region]:
         raise Exception("Missing required environment variables for Secrets Manager")
 
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=secret_region)
-
-    try:
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-    except ClientError as e:
-        # For a list of exceptions thrown, see
-        # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-        raise e
-
-    # Decrypts secret using the associated KMS key.
-    secret = get_secret_value_response["SecretString"]
-
-    secret = json.loads(secret)
+    secret = get_secret_cache(secret_region).get(secret_name)
     return secret.get(key, default_val)
 
 
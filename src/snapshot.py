@@ -0,0 +1,233 @@
+"""
+Batch producer for the insights_stats snapshot the dashboard renders.
+
+Each run writes a Parquet table and the rendered HTML under a timestamped
+version, then moves the LATEST pointer to it:
+
+    insights_stats/20260101T000000Z/insights_stats.parquet
+    insights_stats/20260101T000000Z/insights_stats.html
+    insights_stats/20260101T000000Z/failed_jobs_overdue_retries.parquet
+    insights_stats/20260101T000000Z/failed_jobs_retry_storms.parquet
+    insights_stats/20260101T000000Z/failed_jobs_stats.json
+    insights_stats/LATEST
+
+The failed jobs report is computed here too, so the dashboard only ever
+reads storage and never queries MySQL.
+
+Run against production, or locally against a SQLite fixture and a directory
+standing in for the bucket:
+
+    python -m src.sql.fixture sqlite:///fixture.sqlite
+    python -m src.snapshot --db-url sqlite:///fixture.sqlite --output-dir snapshots
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+from typing import Dict, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src import failed_jobs, history
+from src.logging import get_logger
+from src.model import InsightsStats
+from src.s3 import LocalStorage, S3Storage
+from src.sql import engine, sql_manager
+from src.sql.sql_manager import INSIGHT_TABLES
+
+logger = get_logger(__name__)
+
+SNAPSHOT_BUCKET = os.environ.get("SNAPSHOT_BUCKET", "omneky-airbyte-sync")
+# Read snapshots from this directory instead of S3, e.g. one written by a
+# local producer run.
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR")
+SNAPSHOT_PREFIX = "insights_stats"
+LEGACY_HTML_KEY = "insights_stats.html"
+FAILED_JOBS_REPORTS = ["overdue_retries", "retry_storms"]
+
+Storage = Union[S3Storage, LocalStorage]
+
+DATE_COLUMNS = [f"latest_{table.__tablename__}_date" for table in INSIGHT_TABLES]
+
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("brand_id", pa.int64()),
+        ("brand_name", pa.string()),
+        ("platform", pa.dictionary(pa.int8(), pa.string())),
+    ]
+    + [(column, pa.date32()) for column in DATE_COLUMNS]
+)
+
+
+def get_storage() -> Storage:
+    if SNAPSHOT_DIR:
+        return LocalStorage(SNAPSHOT_DIR)
+    return S3Storage(SNAPSHOT_BUCKET)
+
+
+def _version_key(version: str, filename: str) -> str:
+    return f"{SNAPSHOT_PREFIX}/{version}/{filename}"
+
+
+def build_snapshot_table(statistics: InsightsStats) -> pa.Table:
+    columns = {
+        "brand_id": pa.array(statistics.brand_id),
+        "brand_name": pa.array(statistics.brand_name, type=pa.string()),
+        "platform": pa.array(statistics.platform_names()).dictionary_encode(),
+    }
+    for column in DATE_COLUMNS:
+        columns[column] = pa.array(statistics.dates[column], type=pa.date32())
+    return pa.table(columns).cast(SNAPSHOT_SCHEMA)
+
+
+def render_html(df: pd.DataFrame) -> str:
+    return df.to_html(index=False, na_rep="NULL")
+
+
+def publish_failed_jobs(storage: Storage, version: str):
+    monitor = failed_jobs.get_monitor()
+    reports = {
+        "overdue_retries": monitor.overdue_retries(),
+        "retry_storms": monitor.retry_storms(),
+    }
+    for name in FAILED_JOBS_REPORTS:
+        parquet = io.BytesIO()
+        pq.write_table(
+            pa.Table.from_pandas(reports[name], preserve_index=False), parquet
+        )
+        storage.put(
+            _version_key(version, f"failed_jobs_{name}.parquet"),
+            parquet.getvalue(),
+            content_type="application/vnd.apache.parquet",
+        )
+    storage.put(
+        _version_key(version, "failed_jobs_stats.json"),
+        json.dumps(monitor.stats()).encode("utf-8"),
+        content_type="application/json",
+    )
+
+
+def produce_snapshot(storage: Storage, now: Optional[datetime.datetime] = None) -> str:
+    """
+    Compute insights_stats from the database and publish it as a new
+    snapshot version. Returns the version.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    version = now.strftime("%Y%m%dT%H%M%SZ")
+
+    # A snapshot must reflect the database now, not a cached result.
+    sql_manager.get_insights_stats_columns.invalidate()
+    statistics = sql_manager.get_insights_stats_columns()
+    table = build_snapshot_table(statistics)
+    table = table.replace_schema_metadata(
+        {"version": version, "generated_at": now.isoformat()}
+    )
+
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet, compression="zstd")
+    html = render_html(table.to_pandas()).encode("utf-8")
+
+    storage.put(
+        _version_key(version, "insights_stats.parquet"),
+        parquet.getvalue(),
+        content_type="application/vnd.apache.parquet",
+    )
+    storage.put(
+        _version_key(version, "insights_stats.html"), html, content_type="text/html"
+    )
+    # Old dashboard deploys still read the unversioned HTML.
+    storage.put(LEGACY_HTML_KEY, html, content_type="text/html")
+    # Secondary too: without it the dashboard still shows the snapshot.
+    try:
+        publish_failed_jobs(storage, version)
+    except Exception as e:
+        logger.error(f"Failed to publish failed jobs for snapshot {version}: {e}")
+    # Written last, so readers never see a version with missing files.
+    storage.put(f"{SNAPSHOT_PREFIX}/LATEST", version.encode("utf-8"))
+
+    logger.info(
+        f"Published insights_stats snapshot {version}: {table.num_rows} rows, "
+        f"{len(parquet.getvalue())} bytes of Parquet"
+    )
+
+    # History is secondary to the snapshot the dashboard is waiting for.
+    try:
+        history.record_snapshot(storage, statistics, now)
+    except Exception as e:
+        logger.error(f"Failed to append snapshot {version} to history: {e}")
+    return version
+
+
+def get_latest_version(storage: Storage) -> Optional[str]:
+    latest = storage.get(f"{SNAPSHOT_PREFIX}/LATEST")
+    if latest:
+        return latest.decode("utf-8").strip()
+
+    # No pointer yet, fall back to the newest complete version on disk/S3.
+    versions = sorted(
+        key.split("/")[1]
+        for key in storage.list(f"{SNAPSHOT_PREFIX}/")
+        if key.endswith("/insights_stats.parquet")
+    )
+    return versions[-1] if versions else None
+
+
+def load_snapshot_table(storage: Storage, version: str) -> pa.Table:
+    data = storage.get(_version_key(version, "insights_stats.parquet"))
+    if data is None:
+        raise Exception(f"Snapshot {version} not found")
+    return pq.read_table(io.BytesIO(data))
+
+
+def load_snapshot(storage: Storage, version: str) -> pd.DataFrame:
+    return load_snapshot_table(storage, version).to_pandas()
+
+
+def load_failed_jobs(storage: Storage, version: str) -> Optional[Dict[str, object]]:
+    """
+    The failed jobs report published with `version`: a DataFrame per name in
+    FAILED_JOBS_REPORTS plus "stats", or None if the version has none.
+    """
+    stats = storage.get(_version_key(version, "failed_jobs_stats.json"))
+    if stats is None:
+        return None
+    report = {"stats": json.loads(stats)}
+    for name in FAILED_JOBS_REPORTS:
+        data = storage.get(_version_key(version, f"failed_jobs_{name}.parquet"))
+        report[name] = pq.read_table(io.BytesIO(data)).to_pandas()
+    return report
+
+
+def load_latest_snapshot(storage: Storage) -> Optional[pd.DataFrame]:
+    version = get_latest_version(storage)
+    if version is None:
+        return None
+    return load_snapshot(storage, version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--db-url", help="SQLAlchemy URL to read from instead of production MySQL"
+    )
+    parser.add_argument(
+        "--output-dir",
+        help=f"write to this directory instead of s3://{SNAPSHOT_BUCKET}",
+    )
+    args = parser.parse_args()
+
+    if args.db_url:
+        engine.use_database_url(args.db_url)
+    storage = LocalStorage(args.output_dir) if args.output_dir else get_storage()
+    try:
+        print(produce_snapshot(storage))
+    finally:
+        engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import datetime
+import random
+from typing import Optional
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy import MetaData
+
+from src.model import AdvertisementChannel
+from src.sql.sql_manager import ENTITY_TABLES, INSIGHT_TABLES
+from src.sql.tables import Ads, Base, Brands, FailedJobs, PlatformInfo, Platforms
+from src.sql.watermark import ASSET_TABLES
+
+
+def create_fixture_engine(url: str = "sqlite://") -> sqlalchemy.engine.Engine:
+    """
+    Create an engine with the schema from src.sql.tables.
+
+    Production columns such as deleted_at are nullable even though the mapped
+    annotations are not Optional, so every non-key column is relaxed here.
+    """
+    engine = sqlalchemy.create_engine(url)
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        fixture_table = table.to_metadata(metadata)
+        for column in fixture_table.columns:
+            if not column.primary_key:
+                column.nullable = True
+    metadata.create_all(engine)
+    return engine
+
+
+def seed_fixture(
+    engine: sqlalchemy.engine.Engine,
+    n_brands: int = 100,
+    platform_infos_per_brand: int = 2,
+    insight_rows_per_platform_info: int = 100,
+    entities_per_platform_info: int = 10,
+    days: int = 90,
+    today: Optional[datetime.date] = None,
+    seed: int = 0,
+):
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    channels = [
+        channel
+        for channel in AdvertisementChannel
+        if channel not in (AdvertisementChannel.UNKNOWN,)
+    ]
+
+    platforms = [{"id": c.value, "name": c.name.lower()} for c in channels]
+    brands = []
+    platform_infos = []
+    for brand_id in range(1, n_brands + 1):
+        brands.append(
+            {
+                "id": brand_id,
+                "company_id": 1,
+                "name": f"brand_{brand_id}",
+                "is_active": rng.random() > 0.1,
+            }
+        )
+        for channel in rng.sample(channels, platform_infos_per_brand):
+            platform_infos.append(
+                {
+                    "id": len(platform_infos) + 1,
+                    "platform_id": channel.value,
+                    "brand_id": brand_id,
+                    "account_id": f"act_{brand_id}_{channel.value}",
+                    "account_name": f"account {brand_id} {channel.name}",
+                    "deleted_at": today if rng.random() < 0.05 else None,
+                }
+            )
+
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.insert(Platforms.__table__), platforms)
+        conn.execute(sqlalchemy.insert(Brands.__table__), brands)
+        conn.execute(sqlalchemy.insert(PlatformInfo.__table__), platform_infos)
+
+        for table in INSIGHT_TABLES:
+            rows = []
+            for platform_info in platform_infos:
+                # Some accounts stopped importing a while ago, some never did.
+                roll = rng.random()
+                if roll < 0.05:
+                    continue
+                lag = rng.randint(3, days) if roll < 0.15 else rng.randint(0, 2)
+                for _ in range(insight_rows_per_platform_info):
+                    age = lag + int(rng.expovariate(1 / 7))
+                    rows.append(
+                        {
+                            "platform_info_id": platform_info["id"],
+                            "platform_ad_id": str(rng.randint(1, 10_000)),
+                            "date": today - datetime.timedelta(days=min(age, days)),
+                        }
+                    )
+            if rows:
+                conn.execute(sqlalchemy.insert(table.__table__), rows)
+
+        entity_rows = {table: [] for table in ENTITY_TABLES}
+        for platform_info in platform_infos:
+            for _ in range(entities_per_platform_info):
+                created_at = today - datetime.timedelta(days=rng.randint(0, days))
+                updated_at = min(
+                    today, created_at + datetime.timedelta(days=rng.randint(0, days))
+                )
+                for table, rows in entity_rows.items():
+                    rows.append(
+                        {
+                            "id": len(rows) + 1,
+                            "platform_info_id": platform_info["id"],
+                            "created_at": created_at,
+                            "updated_at": updated_at,
+                        }
+                    )
+        for table, rows in entity_rows.items():
+            if rows:
+                conn.execute(sqlalchemy.insert(table.__table__), rows)
+
+        for table in ASSET_TABLES:
+            rows = [
+                {
+                    "ad_id": ad["id"],
+                    "created_at": ad["created_at"],
+                    "updated_at": ad["updated_at"],
+                }
+                for ad in entity_rows[Ads]
+            ]
+            if rows:
+                conn.execute(sqlalchemy.insert(table.__table__), rows)
+
+
+def seed_failed_jobs(
+    engine: sqlalchemy.engine.Engine,
+    n_jobs: int,
+    now: Optional[datetime.datetime] = None,
+    seed: int = 0,
+):
+    """
+    FailedJobs rows for accounts of the platform infos already in `engine`:
+    most resolved, some pending with a retry due or overdue, and a few
+    accounts failing over and over.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.datetime.now()
+    with engine.connect() as conn:
+        accounts = conn.execute(
+            sqlalchemy.select(PlatformInfo.platform_id, PlatformInfo.account_id)
+        ).fetchall()
+    storming = rng.sample(accounts, max(1, len(accounts) // 50))
+
+    rows = []
+    for job_id in range(1, n_jobs + 1):
+        platform_id, account_id = rng.choice(
+            storming if rng.random() < 0.1 else accounts
+        )
+        time_of_failure = now - datetime.timedelta(minutes=rng.randint(0, 14 * 24 * 60))
+        pending = rng.random() < 0.2
+        retry_count = rng.randint(0, 15 if pending else 3)
+        rows.append(
+            {
+                "job_id": job_id,
+                "platform_id": platform_id,
+                "account_id": account_id,
+                "status": "pending" if pending else "resolved",
+                "run_status": "failed" if pending else "success",
+                "retry_count": retry_count,
+                "time_of_failure": time_of_failure,
+                "time_of_last_run": time_of_failure,
+                "time_of_next_retry": (
+                    now + datetime.timedelta(minutes=rng.randint(-180, 60))
+                    if pending
+                    else None
+                ),
+            }
+        )
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.insert(FailedJobs.__table__), rows)
+
+
+def bulk_insert_insights(
+    engine: sqlalchemy.engine.Engine,
+    n_rows: int,
+    days: int = 90,
+    today: Optional[datetime.date] = None,
+    seed: int = 0,
+    chunk_size: int = 200_000,
+):
+    """
+    Spread `n_rows` insight rows over the insight tables and the platform
+    infos already in `engine`, generated with numpy and inserted in chunks so
+    10^7+ rows fit in memory.
+
+    Dates have the same skew as seed_fixture: most accounts are 0-2 days
+    behind, some stopped importing weeks ago and some never did.
+    """
+    rng = np.random.default_rng(seed)
+    today = np.datetime64(today or datetime.date.today(), "D")
+    with engine.connect() as conn:
+        platform_info_ids = np.array(
+            conn.scalars(sqlalchemy.select(PlatformInfo.id)).all(), dtype=np.int64
+        )
+    if not len(platform_info_ids) or not n_rows:
+        return
+
+    roll = rng.random(len(platform_info_ids))
+    importing = platform_info_ids[roll >= 0.05]
+    lags = np.where(
+        roll < 0.15,
+        rng.integers(3, days + 1, len(platform_info_ids)),
+        rng.integers(0, 3, len(platform_info_ids)),
+    )[roll >= 0.05]
+
+    placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    rows_per_table = n_rows // len(INSIGHT_TABLES)
+    for table in INSIGHT_TABLES:
+        stmt = (
+            f"INSERT INTO {table.__tablename__} "
+            f"(platform_info_id, platform_ad_id, date) "
+            f"VALUES ({placeholder}, {placeholder}, {placeholder})"
+        )
+        for start in range(0, rows_per_table, chunk_size):
+            size = min(chunk_size, rows_per_table - start)
+            owner = rng.integers(0, len(importing), size)
+            age = np.minimum(lags[owner] + rng.exponential(7, size).astype(int), days)
+            dates = (today - age).astype(str)
+            ad_ids = rng.integers(1, 10_000, size).astype(str)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    stmt,
+                    list(
+                        zip(importing[owner].tolist(), ad_ids.tolist(), dates.tolist())
+                    ),
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a seeded SQLite fixture.")
+    parser.add_argument("url", help="e.g. sqlite:///fixture.sqlite")
+    parser.add_argument("--brands", type=int, default=100)
+    parser.add_argument("--failed-jobs", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_fixture_engine(args.url)
+    seed_fixture(engine, n_brands=args.brands, seed=args.seed)
+    if args.failed_jobs:
+        seed_failed_jobs(engine, args.failed_jobs, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+EXPLAIN every statement the freshness queries in sql_manager generate, flag
+full scans and filesorts/temp B-trees, and recommend composite indexes.
+
+Recommendations come from a fixed list of candidates, RECOMMENDED_INDEXES,
+one per table, written for the access patterns of those queries. The plans
+decide which of them are needed: a candidate is recommended only for a table
+that a statement's plan scans, sorts or reads without a covering index, and
+only when the statement filters or groups on the candidate's leading column.
+Tables flagged in a plan that have no candidate are listed separately.
+
+Recommended indexes are then created on the target, the statistics
+refreshed and every statement re-explained and re-timed, so the report
+shows the plan, estimated rows examined and latency before and after.
+Without --db-url it runs against a seeded SQLite fixture built from
+src/sql/tables.py; against any other database indexes are only created with
+--apply.
+
+    python -m src.sql.index_advisor --brands 500
+    python -m src.sql.index_advisor --db-url mysql+pymysql://... --apply
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy import event
+
+from src.model import AdvertisementChannel
+from src.sql import engine as sql_engine
+from src.sql import instrumentation, sql_manager
+from src.sql.fixture import create_fixture_engine, seed_fixture
+from src.sql.tables import (
+    AdGroups,
+    Ads,
+    Campaigns,
+    DailyInsights,
+    FailedJobs,
+    ImageAsset,
+    ImageAssetInsights,
+    PlatformInfo,
+    TextAsset,
+    TextAssetInsights,
+    VideoAsset,
+    VideoAssetInsights,
+)
+from src.sql.watermark import WatermarkStore, refresh_watermarks
+
+# Candidate indexes checked against the plans. Column order puts the
+# equality/grouping column first and the range or aggregated column next, so
+# every freshness query can be answered from the index alone.
+RECOMMENDED_INDEXES = {
+    table.__tablename__: columns
+    for table, columns in [
+        (DailyInsights, ("platform_info_id", "date")),
+        (TextAssetInsights, ("platform_info_id", "date")),
+        (VideoAssetInsights, ("platform_info_id", "date")),
+        (ImageAssetInsights, ("platform_info_id", "date")),
+        (Ads, ("platform_info_id", "updated_at", "created_at")),
+        (AdGroups, ("platform_info_id", "updated_at", "created_at")),
+        (Campaigns, ("platform_info_id", "updated_at", "created_at")),
+        (ImageAsset, ("ad_id", "updated_at", "created_at")),
+        (VideoAsset, ("ad_id", "updated_at", "created_at")),
+        (TextAsset, ("ad_id", "updated_at", "created_at")),
+        (PlatformInfo, ("brand_id", "platform_id", "deleted_at")),
+        # Keyset cursor of the failed jobs monitor.
+        (FailedJobs, ("time_of_failure", "job_id")),
+    ]
+}
+
+_SQLITE_PLAN = re.compile(
+    r"^(?P<op>SCAN|SEARCH) (?P<table>\w+)"
+    r"(?: AS \w+)?"
+    r"(?: USING (?P<automatic>AUTOMATIC )?(?:PARTIAL )?(?P<covering>COVERING )?"
+    r"(?:INDEX(?: (?P<index>\w+))?|(?P<pk>INTEGER PRIMARY KEY))"
+    r"(?: \((?P<terms>[^)]*)\))?)?"
+)
+
+
+def index_name(table_name: str, columns: Tuple[str, ...]) -> str:
+    return f"ix_{table_name}_{'_'.join(columns)}"
+
+
+def index_ddl(table_name: str, columns: Tuple[str, ...]) -> str:
+    return (
+        f"CREATE INDEX {index_name(table_name, columns)} "
+        f"ON {table_name} ({', '.join(columns)})"
+    )
+
+
+def capture_workload(engine: sqlalchemy.engine.Engine) -> List[dict]:
+    """
+    Run the sql_manager freshness queries once, bypassing the result cache,
+    and return every distinct statement with its parameters and caller.
+    """
+    statements: Dict[str, dict] = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.setdefault(
+                statement,
+                {
+                    "caller": instrumentation.find_caller(ignore=(__name__,)),
+                    "statement": statement,
+                    "parameters": parameters,
+                },
+            )
+
+    with engine.connect() as conn:
+        platform_info_id, brand_id = conn.execute(
+            sqlalchemy.select(PlatformInfo.id, PlatformInfo.brand_id).limit(1)
+        ).one()
+    today = datetime.date.today()
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        sql_manager.get_insights_stats_columns.__wrapped__()
+        sql_manager.get_latest_insight_dates()
+        sql_manager.get_platform_infos_for_brand.__wrapped__(brand_id)
+        sql_manager.get_last_import_stats.__wrapped__(platform_info_id)
+        sql_manager.get_import_stats_bulk(
+            [brand_id],
+            [AdvertisementChannel.GOOGLE, AdvertisementChannel.FACEBOOK],
+            [today - datetime.timedelta(days=1), today],
+        )
+        # Both the full rebuild and the incremental range scan.
+        store = WatermarkStore(sqlalchemy.create_engine("sqlite://"))
+        refresh_watermarks(store=store, full_rebuild=True)
+        refresh_watermarks(store=store)
+        sql_manager.get_failed_jobs_after(
+            (datetime.datetime.now() - datetime.timedelta(days=1), 0), 1000
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return list(statements.values())
+
+
+def _table_rows(
+    conn, table_name: str, cache: Dict[str, Optional[int]]
+) -> Optional[int]:
+    """
+    Row count of a base table, None for derived tables and subqueries (which
+    are not in `cache`).
+    """
+    if table_name not in cache:
+        return None
+    if cache[table_name] is None:
+        cache[table_name] = conn.exec_driver_sql(
+            f"SELECT COUNT(*) FROM {table_name}"
+        ).scalar()
+    return cache[table_name]
+
+
+def _sqlite_index_stats(conn) -> Dict[str, List[int]]:
+    try:
+        rows = conn.exec_driver_sql("SELECT idx, stat FROM sqlite_stat1").fetchall()
+    except sqlalchemy.exc.OperationalError:
+        return {}
+    return {idx: [int(n) for n in stat.split()[:8]] for idx, stat in rows if idx}
+
+
+def _explain_sqlite(conn, statement, parameters, row_counts) -> List[dict]:
+    index_stats = _sqlite_index_stats(conn)
+    plan = []
+    for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+        detail = row[-1]
+        step = {"detail": detail, "table": None, "issue": None, "rows": None}
+        match = _SQLITE_PLAN.match(detail)
+        if "TEMP B-TREE" in detail:
+            step["issue"] = "temp b-tree (filesort)"
+        elif match:
+            table_name = match["table"]
+            total = _table_rows(conn, table_name, row_counts)
+            if total is None:
+                plan.append(step)
+                continue
+            step["table"] = table_name
+            step["index_only"] = bool(match["covering"])
+            if match["automatic"]:
+                step["rows"] = total
+                step["issue"] = "automatic index built per query"
+            elif match["op"] == "SCAN" or not (match["index"] or match["pk"]):
+                step["rows"] = total
+                if not match["covering"]:
+                    step["issue"] = "full table scan"
+            elif match["pk"]:
+                step["rows"] = 1
+            else:
+                # sqlite_stat1 gives the average rows per distinct value of
+                # each index prefix; SQLite itself assumes a range keeps 1/4.
+                terms = [t for t in (match["terms"] or "").split(" AND ") if t]
+                ranges = sum(1 for t in terms if "<" in t or ">" in t)
+                equalities = len(terms) - ranges
+                stats = index_stats.get(match["index"], [])
+                estimate = stats[equalities] if equalities < len(stats) else total
+                step["rows"] = max(1, estimate // (4**ranges))
+        plan.append(step)
+    return plan
+
+
+def _explain_mysql(conn, statement, parameters, row_counts) -> List[dict]:
+    plan = []
+    for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings():
+        extra = row.get("Extra") or ""
+        step = {
+            "detail": f"{row['table']}: type={row['type']} key={row['key']} {extra}",
+            "table": row["table"],
+            "index_only": "Using index" in extra,
+            "issue": None,
+            "rows": int((row["rows"] or 0) * float(row.get("filtered") or 100) / 100),
+        }
+        if row["table"].startswith("<"):
+            # <derivedN>/<unionN> are scans of materialised subqueries.
+            step["table"] = None
+        elif row["type"] == "ALL":
+            step["issue"] = "full table scan"
+        elif "Using filesort" in extra or "Using temporary" in extra:
+            step["issue"] = "filesort/temporary"
+        plan.append(step)
+    return plan
+
+
+def explain(conn, statement: str, parameters, row_counts: Dict[str, int]) -> List[dict]:
+    if conn.dialect.name == "sqlite":
+        return _explain_sqlite(conn, statement, parameters, row_counts)
+    if conn.dialect.name == "mysql":
+        return _explain_mysql(conn, statement, parameters, row_counts)
+    raise Exception(f"Unsupported dialect: {conn.dialect.name}")
+
+
+def _time_statement(conn, statement: str, parameters, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.exec_driver_sql(statement, parameters).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def workload_tables(workload: List[dict], table_names) -> List[str]:
+    return sorted(
+        name
+        for name in table_names
+        if any(_reads_table(item["statement"], name) for item in workload)
+    )
+
+
+def _reads_table(statement: str, table_name: str) -> bool:
+    return bool(re.search(rf"\b(?:FROM|JOIN) {table_name}\b", statement, re.I))
+
+
+def _analyze(conn, tables: List[str]):
+    if conn.dialect.name == "mysql":
+        if tables:
+            conn.exec_driver_sql(f"ANALYZE TABLE {', '.join(tables)}").fetchall()
+    else:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def flagged_tables(plan: List[dict], statement: str) -> List[str]:
+    """
+    Tables the plan reads badly: scanned, sorted, or without a covering
+    index.
+    """
+    tables = {step["table"] for step in plan if step["table"]}
+    # Filesorts/temp B-trees are not tied to a table in SQLite's plan, so
+    # they flag every table the statement reads.
+    if any(step["issue"] and not step["table"] for step in plan):
+        tables |= {
+            name for name in RECOMMENDED_INDEXES if _reads_table(statement, name)
+        }
+    return sorted(
+        table_name
+        for table_name in tables
+        if any(step["issue"] for step in plan if step["table"] == table_name)
+        or not any(
+            step.get("index_only") for step in plan if step["table"] == table_name
+        )
+    )
+
+
+def recommend(plan: List[dict], statement: str) -> List[Tuple[str, Tuple[str, ...]]]:
+    return [
+        (table_name, RECOMMENDED_INDEXES[table_name])
+        for table_name in flagged_tables(plan, statement)
+        if table_name in RECOMMENDED_INDEXES
+        and re.search(rf"\b{RECOMMENDED_INDEXES[table_name][0]}\b", statement)
+    ]
+
+
+def advise(engine: sqlalchemy.engine.Engine, apply: bool) -> List[dict]:
+    workload = capture_workload(engine)
+    report = []
+    with engine.connect() as conn:
+        row_counts = dict.fromkeys(sqlalchemy.inspect(conn).get_table_names())
+        tables = workload_tables(workload, row_counts)
+        _analyze(conn, tables)
+        for item in workload:
+            plan = explain(conn, item["statement"], item["parameters"], row_counts)
+            report.append(
+                {
+                    "caller": item["caller"],
+                    "statement": " ".join(item["statement"].split()),
+                    "issues": [s["issue"] for s in plan if s["issue"]],
+                    "plan_before": plan,
+                    "rows_before": sum(s["rows"] or 0 for s in plan),
+                    "ms_before": _time_statement(
+                        conn, item["statement"], item["parameters"]
+                    ),
+                    "indexes": recommend(plan, item["statement"]),
+                    "unmatched": [
+                        table_name
+                        for table_name in flagged_tables(plan, item["statement"])
+                        if table_name not in RECOMMENDED_INDEXES
+                    ],
+                }
+            )
+
+        indexes = sorted({index for entry in report for index in entry["indexes"]})
+        if not apply:
+            return report
+
+        existing = {
+            index["name"]
+            for table_name in {t for t, _ in indexes}
+            for index in sqlalchemy.inspect(conn).get_indexes(table_name)
+        }
+        for table_name, columns in indexes:
+            if index_name(table_name, columns) not in existing:
+                conn.exec_driver_sql(index_ddl(table_name, columns))
+        _analyze(conn, tables)
+        conn.commit()
+
+        for entry, item in zip(report, workload):
+            plan = explain(conn, item["statement"], item["parameters"], row_counts)
+            entry["plan_after"] = plan
+            entry["rows_after"] = sum(s["rows"] or 0 for s in plan)
+            entry["ms_after"] = _time_statement(
+                conn, item["statement"], item["parameters"]
+            )
+    return report
+
+
+def print_report(report: List[dict]):
+    indexes = sorted({index for entry in report for index in entry["indexes"]})
+    for entry in report:
+        print(f"\n{entry['caller']}")
+        print(f"  {entry['statement'][:160]}...")
+        for step in entry["plan_before"]:
+            flag = f"  <-- {step['issue']}" if step["issue"] else ""
+            print(f"    {step['detail']}{flag}")
+        for table_name, columns in entry["indexes"]:
+            print(f"  recommend: {index_ddl(table_name, columns)}")
+        for table_name in entry["unmatched"]:
+            print(f"  no candidate index for {table_name}")
+        if "plan_after" in entry:
+            for step in entry["plan_after"]:
+                print(f"    after: {step['detail']}")
+            reduction = entry["rows_before"] / max(entry["rows_after"], 1)
+            print(
+                f"  est. rows examined: {entry['rows_before']} -> "
+                f"{entry['rows_after']} ({reduction:.1f}x), "
+                f"{entry['ms_before']:.1f} ms -> {entry['ms_after']:.1f} ms"
+            )
+
+    print("\nRecommended indexes:")
+    for table_name, columns in indexes:
+        print(f"  {index_ddl(table_name, columns)};")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db-url", help="analyse this database instead of a fixture")
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="create the recommended indexes on --db-url and re-explain",
+    )
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    url = args.db_url
+    if url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp_dir.name, 'fixture.sqlite')}"
+        seed_fixture(create_fixture_engine(url), n_brands=args.brands)
+
+    sql_engine.use_database_url(url)
+    try:
+        report = advise(
+            sql_engine.get_engine(), apply=args.apply or tmp_dir is not None
+        )
+    finally:
+        sql_engine.shutdown()
+        if tmp_dir:
+            tmp_dir.cleanup()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
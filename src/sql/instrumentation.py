@@ -0,0 +1,216 @@
+"""
+Per-statement timing attached through SQLAlchemy engine events.
+
+Every statement is attributed to the src.* function that issued it (usually
+a sql_manager function) and aggregated into a latency histogram with rows
+returned and pool wait. Only statements slower than SLOW_QUERY_MS are
+logged.
+"""
+
+import bisect
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy import event
+
+from src.logging import get_logger
+
+logger = get_logger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "500"))
+# Distinct statements tracked before the rest are pooled per caller, so a
+# long-lived process stays bounded whatever SQL it sees.
+MAX_TRACKED_STATEMENTS = int(os.environ.get("MAX_TRACKED_STATEMENTS", "500"))
+OTHER_STATEMENTS = "<other statements>"
+
+# Expanded IN lists: "IN (?, ?, ?)", "IN (%s, %s)" or "IN (%(id_1)s, ...)".
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)", re.I)
+
+# Upper bounds in milliseconds; the last bucket catches everything slower.
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_local = threading.local()
+
+
+class _StatementStats:
+    def __init__(self, caller: str, statement: str):
+        self.caller = caller
+        self.statement = " ".join(statement.split())[:200]
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        # None until the driver reports a rowcount; SQLite SELECTs never do.
+        self.rows: Optional[int] = None
+        self.pool_wait_ms = 0.0
+        self.slow = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def record(self, elapsed_ms: float, rows: int, pool_wait_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if rows >= 0:
+            self.rows = (self.rows or 0) + rows
+        self.pool_wait_ms += pool_wait_ms
+        self.slow += int(elapsed_ms >= SLOW_QUERY_MS)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+
+    def percentile_ms(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the histogram bucket holding the q-th percentile.
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.histogram):
+            seen += count
+            if seen >= target:
+                return float(bound)
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "caller": self.caller,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "avg_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile_ms(0.5),
+            "p95_ms": self.percentile_ms(0.95),
+            "max_ms": self.max_ms,
+            "rows": self.rows,
+            "pool_wait_ms": self.pool_wait_ms,
+            "slow": self.slow,
+        }
+
+
+_stats: Dict[Tuple[str, str], _StatementStats] = {}
+_stats_lock = threading.Lock()
+
+
+def note_pool_wait(seconds: float):
+    """
+    Called by the pool on checkout; the wait is charged to the next
+    statement this thread executes.
+    """
+    _local.pool_wait = getattr(_local, "pool_wait", 0.0) + seconds
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Collapse expanded IN lists, so chunked id lists of any length share one
+    entry.
+    """
+    return _IN_LIST.sub("IN (...)", statement)
+
+
+def find_caller(ignore: Tuple[str, ...] = ()) -> str:
+    """
+    Qualified name of the innermost src.* function on the stack, skipping
+    this module, the result cache and any `ignore` modules.
+    """
+    frame = sys._getframe(1)
+    ignored = (__name__, "src.sql.result_cache") + ignore
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("src.") and module not in ignored:
+            # co_qualname is Python 3.11+; co_name drops the class name.
+            code = frame.f_code
+            return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", {})[id(cursor)] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop(id(cursor))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    pool_wait_ms = getattr(_local, "pool_wait", 0.0) * 1000
+    _local.pool_wait = 0.0
+    caller = find_caller()
+    # DBAPI rowcount: rows returned for buffered MySQL SELECTs, -1 where the
+    # driver does not know (e.g. SQLite SELECTs).
+    rows = cursor.rowcount
+    statement = normalize_statement(statement)
+
+    with _stats_lock:
+        key = (caller, statement)
+        if key not in _stats and len(_stats) >= MAX_TRACKED_STATEMENTS:
+            key = (caller, OTHER_STATEMENTS)
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = _StatementStats(*key)
+        stats.record(elapsed_ms, rows, pool_wait_ms)
+
+    if elapsed_ms >= SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow query in {caller}: {elapsed_ms:.0f} ms, "
+            f"{rows if rows >= 0 else '?'} rows, "
+            f"{pool_wait_ms:.0f} ms pool wait: {stats.statement}"
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute never runs for a failed statement; drop its start
+    # time here so it does not linger on the pooled connection.
+    conn = exception_context.connection
+    context = exception_context.execution_context
+    if conn is not None and context is not None:
+        conn.info.get("query_start", {}).pop(id(context.cursor), None)
+
+
+def instrument(engine: sqlalchemy.engine.Engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def get_query_stats() -> List[dict]:
+    """
+    Per (caller, statement) stats, most expensive first.
+    """
+    with _stats_lock:
+        stats = [s.as_dict() for s in _stats.values()]
+    return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+
+def get_caller_summary() -> List[dict]:
+    """
+    Query time rolled up per calling function, most expensive first.
+    """
+    summary: Dict[str, dict] = {}
+    for stats in get_query_stats():
+        entry = summary.setdefault(
+            stats["caller"],
+            {
+                "caller": stats["caller"],
+                "statements": 0,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "pool_wait_ms": 0.0,
+                "slow": 0,
+            },
+        )
+        entry["statements"] += 1
+        entry["count"] += stats["count"]
+        entry["total_ms"] += stats["total_ms"]
+        entry["max_ms"] = max(entry["max_ms"], stats["max_ms"])
+        entry["pool_wait_ms"] += stats["pool_wait_ms"]
+        entry["slow"] += stats["slow"]
+    return sorted(summary.values(), key=lambda s: s["total_ms"], reverse=True)
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,279 @@
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+from cachetools import LRUCache
+
+from src.logging import get_logger
+from src.sql import engine as sql_engine
+
+logger = get_logger(__name__)
+
+# Shared on-disk tier, so every dashboard process reads one warm cache. Set to
+# an empty string to keep results in process memory only.
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH", "sql_result_cache.sqlite")
+RESULT_CACHE_MEMORY_SIZE = int(os.environ.get("RESULT_CACHE_MEMORY_SIZE", "256"))
+
+# (value, expires_at, stale_until) in wall-clock seconds, comparable across
+# processes.
+_Entry = Tuple[object, float, float]
+
+
+class _FunctionStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        # Misses that waited on another caller's fill instead of querying.
+        self.coalesced = 0
+        self.fills = 0
+        self.fill_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        lookups = (
+            self.memory_hits
+            + self.disk_hits
+            + self.stale_hits
+            + self.misses
+            + self.coalesced
+        )
+        hits = lookups - self.misses - self.coalesced
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else None,
+            "coalesced": self.coalesced,
+            "fills": self.fills,
+            "avg_fill_seconds": self.fill_seconds / self.fills if self.fills else None,
+        }
+
+
+class ResultCache:
+    """
+    Two-tier result cache: an in-process LRU in front of a SQLite file shared
+    by every dashboard process.
+
+    Entries past their TTL but within their stale window are still served
+    while one background thread recomputes them (stale-while-revalidate).
+    Concurrent misses on one key share a single fill.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = RESULT_CACHE_PATH,
+        memory_size: int = RESULT_CACHE_MEMORY_SIZE,
+    ):
+        self.path = path or None
+        self._memory: LRUCache = LRUCache(maxsize=memory_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._refreshing = set()
+        self._inflight: Dict[str, Future] = {}
+        self._stats: Dict[str, _FunctionStats] = {}
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS result_cache ("
+                    "key TEXT PRIMARY KEY, func TEXT, value BLOB, "
+                    "expires_at REAL, stale_until REAL)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _get_stats(self, func_name: str) -> _FunctionStats:
+        return self._stats.setdefault(func_name, _FunctionStats())
+
+    def _read(self, key: str) -> Tuple[Optional[_Entry], Optional[str]]:
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None and time.time() < entry[1]:
+            return entry, "memory"
+        if not self.path:
+            return entry, "memory"
+
+        # Another process may already have refilled an entry that expired here.
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value, expires_at, stale_until FROM result_cache "
+                "WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        if row is None or (entry is not None and row[1] <= entry[1]):
+            return entry, "memory"
+        entry = (pickle.loads(row[0]), row[1], row[2])
+        with self._lock:
+            self._memory[key] = entry
+        return entry, "disk"
+
+    def _fill(
+        self, func_name: str, key: str, fill: Callable, ttl: float, stale_ttl: float
+    ):
+        start = time.perf_counter()
+        value = fill()
+        elapsed = time.perf_counter() - start
+
+        now = time.time()
+        entry = (value, now + ttl, now + ttl + stale_ttl)
+        with self._lock:
+            self._memory[key] = entry
+            stats = self._get_stats(func_name)
+            stats.fills += 1
+            stats.fill_seconds += elapsed
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?, ?)",
+                    (key, func_name, pickle.dumps(value), entry[1], entry[2]),
+                )
+        return value
+
+    def _refresh(
+        self, func_name: str, key: str, fill: Callable, ttl: float, stale_ttl: float
+    ):
+        try:
+            self._fill(func_name, key, fill, ttl, stale_ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh of {func_name} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_fill(
+        self,
+        func_name: str,
+        key: str,
+        fill: Callable,
+        ttl: float,
+        stale_ttl: float = 0,
+    ):
+        entry, tier = self._read(key)
+        now = time.time()
+        future = None
+        start_refresh = False
+        with self._lock:
+            stats = self._get_stats(func_name)
+            if entry is not None and now < entry[1]:
+                if tier == "memory":
+                    stats.memory_hits += 1
+                else:
+                    stats.disk_hits += 1
+                return entry[0]
+
+            if entry is not None and now < entry[2]:
+                stats.stale_hits += 1
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            else:
+                # A fill may have finished since the read above.
+                filled = self._memory.get(key)
+                if filled is not None and now < filled[1]:
+                    stats.memory_hits += 1
+                    return filled[0]
+                future = self._inflight.get(key)
+                is_leader = future is None
+                if is_leader:
+                    stats.misses += 1
+                    future = self._inflight[key] = Future()
+                else:
+                    stats.coalesced += 1
+
+        if future is not None:
+            if not is_leader:
+                return future.result()
+            try:
+                value = self._fill(func_name, key, fill, ttl, stale_ttl)
+                future.set_result(value)
+                return value
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        if start_refresh:
+            threading.Thread(
+                target=self._refresh,
+                args=(func_name, key, fill, ttl, stale_ttl),
+                daemon=True,
+            ).start()
+        return entry[0]
+
+    def invalidate(self, func_name: Optional[str] = None):
+        with self._lock:
+            if func_name is None:
+                self._memory.clear()
+            else:
+                for key in [k for k in self._memory if k.startswith(f"{func_name}:")]:
+                    del self._memory[key]
+        if self.path:
+            with self._connect() as conn:
+                if func_name is None:
+                    conn.execute("DELETE FROM result_cache")
+                else:
+                    conn.execute(
+                        "DELETE FROM result_cache WHERE func = ?", (func_name,)
+                    )
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
+
+
+def cached_result(ttl: float, stale_ttl: float = 0):
+    """
+    Cache a sql_manager function's return value for `ttl` seconds, then keep
+    serving it for up to `stale_ttl` more while it is recomputed. Keys
+    include the database, so a fixture run never reads production results
+    from the shared tier or the other way round.
+    """
+
+    def decorator(func):
+        func_name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            database = sql_engine.get_engine().url.render_as_string(hide_password=True)
+            arguments = repr((database, args, sorted(kwargs.items()))).encode()
+            key = f"{func_name}:{hashlib.sha256(arguments).hexdigest()}"
+            return get_result_cache().get_or_fill(
+                func_name, key, lambda: func(*args, **kwargs), ttl, stale_ttl
+            )
+
+        wrapper.invalidate = lambda: get_result_cache().invalidate(func_name)
+        return wrapper
+
+    return decorator
+
+
+def invalidate_all():
+    get_result_cache().invalidate()
@@ -1,81 +1,134 @@
 import hashlib
 import json
 import os
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 import sqlalchemy
 from cachetools import LRUCache, TLRUCache, TTLCache, cached
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from src.logging import get_logger
-from src.model import AdvertisementChannel
+from src.model import AdvertisementChannel, InsightsStats
 from src.sql.engine import get_engine
+from src.sql.result_cache import cached_result
 from src.sql.tables import *
+from src.sql.watermark import ASSET_TABLES, PLATFORM_INFO_TABLES, refresh_watermarks
 
 logger = get_logger(__name__)
 
 
-@cached(cache=TTLCache(maxsize=100, ttl=60 * 60))
-def get_insights_stats():
-    insight_tables = [
-        DailyInsights,
-        TextAssetInsights,
-        VideoAssetInsights,
-        ImageAssetInsights,
+INSIGHT_TABLES = [
+    DailyInsights,
+    TextAssetInsights,
+    VideoAssetInsights,
+    ImageAssetInsights,
+]
+
+ENTITY_TABLES = [
+    Ads,
+    AdGroups,
+    Campaigns,
+]
+
+
+def _latest_insight_dates_subquery(insight_tables=INSIGHT_TABLES):
+    """
+    One aggregate per insight table, keyed by platform_info_id, stacked with
+    UNION ALL so every table is scanned once in a single round trip.
+    """
+    per_table = [
+        sqlalchemy.select(
+            table.platform_info_id.label("platform_info_id"),
+            sqlalchemy.literal(table.__tablename__).label("table_name"),
+            func.max(table.date).label("max_date"),
+        ).group_by(table.platform_info_id)
+        for table in insight_tables
     ]
+    return sqlalchemy.union_all(*per_table).subquery("latest_insight_dates")
 
-    engine = get_engine()
-    statistics = {}
-    with Session(engine) as session:
-        for table in insight_tables:
-            stmt = (
-                sqlalchemy.select(
-                    Brands.id,
-                    Brands.name,
-                    PlatformInfo.platform_id,
-                    func.max(table.date).label(f"latest_{table.__tablename__}_date"),
-                )
-                .join(PlatformInfo, Brands.id == PlatformInfo.brand_id)
-                .outerjoin(table, PlatformInfo.id == table.platform_info_id)
-                .where(Brands.is_active.is_(True))
-                .where(PlatformInfo.deleted_at.is_(None))
-                .group_by(Brands.id, PlatformInfo.platform_id)
-            )
-            logger.info("SQL: %s", str(stmt))
-            start_time = datetime.datetime.now()
-            result = session.execute(stmt).fetchall()
-            end_time = datetime.datetime.now()
-            logger.info(
-                f"Table {table.__tablename__}, Query took {end_time - start_time}"
+
+@cached_result(ttl=60 * 60, stale_ttl=60 * 60)
+def get_insights_stats_columns() -> InsightsStats:
+    """
+    Latest insight date per table for every active brand and platform, as
+    NumPy columns straight from a Core select; no per-row dicts or strftime.
+    """
+    latest = _latest_insight_dates_subquery()
+    date_columns = [
+        func.max(
+            sqlalchemy.case(
+                (latest.c.table_name == table.__tablename__, latest.c.max_date)
             )
+        ).label(f"latest_{table.__tablename__}_date")
+        for table in INSIGHT_TABLES
+    ]
+    stmt = (
+        sqlalchemy.select(
+            Brands.id,
+            Brands.name,
+            PlatformInfo.platform_id,
+            *date_columns,
+        )
+        .join(PlatformInfo, Brands.id == PlatformInfo.brand_id)
+        .outerjoin(latest, PlatformInfo.id == latest.c.platform_info_id)
+        .where(Brands.is_active.is_(True))
+        .where(PlatformInfo.deleted_at.is_(None))
+        .group_by(Brands.id, Brands.name, PlatformInfo.platform_id)
+    )
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(stmt).fetchall()
+
+    columns = list(zip(*rows)) or [()] * (3 + len(date_columns))
+    return InsightsStats(
+        brand_id=np.array(columns[0], dtype=np.int64),
+        brand_name=np.array(columns[1], dtype=object),
+        platform_id=np.array(columns[2], dtype=np.int16),
+        dates={
+            column.name: np.array(values, dtype="datetime64[D]")
+            for column, values in zip(date_columns, columns[3:])
+        },
+    )
+
+
+def get_insights_stats():
+    return get_insights_stats_columns().to_records()
 
-            processed_result = []
-            if result:
-                for row in result:
-                    row = row._asdict()
-                    row["platform"] = AdvertisementChannel(row["platform_id"]).name
-                    key = f'{row["id"]}|{row["platform_id"]}'
-                    processed_result.append(row)
-                    if key not in statistics:
-                        statistics[key] = []
-                    statistics[key].append(row)
-
-        unified_list = []
-        for key, val_list in statistics.items():
-            unified_entry = {
-                "brand_id": val_list[0]["id"],
-                "brand_name": val_list[0]["name"],
-                "platform": val_list[0]["platform"],
-            }
-            for val in val_list:
-                for k in val:
-                    if "date" in k:
-                        unified_entry[k] = (
-                            val[k].strftime("%Y-%m-%d") if val[k] else "NULL"
-                        )
-            unified_list.append(unified_entry)
-        return unified_list
+
+def get_latest_insight_dates(
+    brand_ids: Optional[Iterable[int]] = None,
+    channels: Optional[Iterable[AdvertisementChannel]] = None,
+):
+    """
+    (brand_id, brand_name, platform_id, last_insight_date) for every active
+    brand and platform, from one grouped query over DailyInsights.
+    """
+    latest = _latest_insight_dates_subquery([DailyInsights])
+    stmt = (
+        sqlalchemy.select(
+            Brands.id.label("brand_id"),
+            Brands.name.label("brand_name"),
+            PlatformInfo.platform_id,
+            func.max(latest.c.max_date).label("last_insight_date"),
+        )
+        .join(PlatformInfo, Brands.id == PlatformInfo.brand_id)
+        .outerjoin(latest, PlatformInfo.id == latest.c.platform_info_id)
+        .where(Brands.is_active.is_(True))
+        .where(PlatformInfo.deleted_at.is_(None))
+        .group_by(Brands.id, Brands.name, PlatformInfo.platform_id)
+    )
+    if brand_ids is not None:
+        stmt = stmt.where(Brands.id.in_([int(b) for b in brand_ids]))
+    if channels is not None:
+        stmt = stmt.where(PlatformInfo.platform_id.in_([c.value for c in channels]))
+
+    engine = get_engine()
+    with Session(engine) as session:
+        return session.execute(stmt).fetchall()
 
 
 def get_all_brand_ids():
@@ -86,6 +139,92 @@ def get_all_brand_ids():
         return result
 
 
+def get_platform_infos_for_brands(brand_ids: Iterable[int]):
+    """
+    (id, brand_id, platform_id) of every live platform info of `brand_ids`.
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        stmt = (
+            sqlalchemy.select(
+                PlatformInfo.id, PlatformInfo.brand_id, PlatformInfo.platform_id
+            )
+            .where(PlatformInfo.brand_id.in_([int(b) for b in brand_ids]))
+            .where(PlatformInfo.deleted_at.is_(None))
+        )
+        return session.execute(stmt).fetchall()
+
+
+def get_live_accounts():
+    """
+    (platform_id, account_id, brand_id) of every live platform info, to map
+    FailedJobs rows to brands.
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        stmt = sqlalchemy.select(
+            PlatformInfo.platform_id, PlatformInfo.account_id, PlatformInfo.brand_id
+        ).where(PlatformInfo.deleted_at.is_(None))
+        return conn.execute(stmt).fetchall()
+
+
+FAILED_JOB_COLUMNS = [
+    FailedJobs.job_id,
+    FailedJobs.platform_id,
+    FailedJobs.account_id,
+    FailedJobs.status,
+    FailedJobs.run_status,
+    FailedJobs.retry_count,
+    FailedJobs.time_of_failure,
+    FailedJobs.time_of_next_retry,
+]
+FAILED_JOBS_CHUNK_SIZE = 1000
+
+
+def get_failed_jobs_after(after: Optional[Tuple[datetime.datetime, int]], limit: int):
+    """
+    Up to `limit` FailedJobs rows past the (time_of_failure, job_id) keyset
+    cursor `after`, in cursor order; from the start when `after` is None.
+    """
+    stmt = (
+        sqlalchemy.select(*FAILED_JOB_COLUMNS)
+        .where(FailedJobs.time_of_failure.is_not(None))
+        .order_by(FailedJobs.time_of_failure, FailedJobs.job_id)
+        .limit(limit)
+    )
+    if after is not None:
+        time_of_failure, job_id = after
+        # Spelled out rather than as a row-value comparison, which older
+        # MySQL versions cannot serve from an index.
+        stmt = stmt.where(
+            sqlalchemy.or_(
+                FailedJobs.time_of_failure > time_of_failure,
+                sqlalchemy.and_(
+                    FailedJobs.time_of_failure == time_of_failure,
+                    FailedJobs.job_id > job_id,
+                ),
+            )
+        )
+    engine = get_engine()
+    with engine.connect() as conn:
+        return conn.execute(stmt).fetchall()
+
+
+def get_failed_jobs_by_ids(job_ids: Iterable[int]):
+    job_ids = list(job_ids)
+    rows = []
+    engine = get_engine()
+    with engine.connect() as conn:
+        for start in range(0, len(job_ids), FAILED_JOBS_CHUNK_SIZE):
+            chunk = job_ids[start : start + FAILED_JOBS_CHUNK_SIZE]
+            stmt = sqlalchemy.select(*FAILED_JOB_COLUMNS).where(
+                FailedJobs.job_id.in_(chunk)
+            )
+            rows.extend(conn.execute(stmt).fetchall())
+    return rows
+
+
+@cached_result(ttl=6 * 60 * 60, stale_ttl=24 * 60 * 60)
 def get_platform_infos_for_brand(brand_id: int):
     engine = get_engine()
     with Session(engine) as session:
@@ -96,118 +235,344 @@ def get_platform_infos_for_brand(brand_id: int):
         return result
 
 
-def get_last_import_stats(platform_info_id: int):
-    engine = get_engine()
-    with Session(engine) as session:
-        insight_tables = [
-            DailyInsights,
-            ImageAssetInsights,
-            VideoAssetInsights,
-            TextAssetInsights,
-        ]
-
-        entity_tables = [
-            Ads,
-            AdGroups,
-            Campaigns,
-        ]
-
-        asset_tables = [
-            ImageAsset,
-            VideoAsset,
-            TextAsset,
-        ]
-        subq = []
-        for table in insight_tables:
-            stmt = (
-                sqlalchemy.select(func.max(table.date))
-                .where(table.platform_info_id == platform_info_id)
-                .scalar_subquery()
-                .label(table.__name__)
-            )
-            subq.append(stmt)
+# Column order of get_last_import_stats; insight tables are tracked by their
+# latest date, entity and asset tables by their latest updated_at.
+LAST_IMPORT_STATS_TABLES = [
+    DailyInsights,
+    ImageAssetInsights,
+    VideoAssetInsights,
+    TextAssetInsights,
+    Ads,
+    AdGroups,
+    Campaigns,
+    ImageAsset,
+    VideoAsset,
+    TextAsset,
+]
+LAST_IMPORT_STATS_CHUNK_SIZE = 1000
 
-        for table in entity_tables:
-            stmt = (
-                sqlalchemy.select(func.max(table.updated_at))
-                .where(table.platform_info_id == platform_info_id)
-                .scalar_subquery()
-                .label(table.__name__)
-            )
-            subq.append(stmt)
 
-        for table in asset_tables:
-            ads_stmt = sqlalchemy.select(Ads.id).where(
-                Ads.platform_info_id == platform_info_id
+def _last_import_stats_stmt(platform_info_ids: List[int]):
+    per_table = []
+    for table in LAST_IMPORT_STATS_TABLES:
+        if table in ASSET_TABLES:
+            # asset JOIN ads GROUP BY platform_info_id, rather than one
+            # ad_id IN (SELECT ...) per platform info.
+            stmt = (
+                sqlalchemy.select(
+                    Ads.platform_info_id.label("platform_info_id"),
+                    sqlalchemy.literal(table.__name__).label("table_name"),
+                    func.max(table.updated_at).label("last_import"),
+                )
+                .join(Ads, table.ad_id == Ads.id)
+                .where(Ads.platform_info_id.in_(platform_info_ids))
+                .group_by(Ads.platform_info_id)
             )
+        else:
+            column = table.date if table in INSIGHT_TABLES else table.updated_at
             stmt = (
-                sqlalchemy.select(func.max(table.updated_at))
-                .where(table.ad_id.in_(ads_stmt))
-                .scalar_subquery()
-                .label(table.__name__)
+                sqlalchemy.select(
+                    table.platform_info_id.label("platform_info_id"),
+                    sqlalchemy.literal(table.__name__).label("table_name"),
+                    func.max(column).label("last_import"),
+                )
+                .where(table.platform_info_id.in_(platform_info_ids))
+                .group_by(table.platform_info_id)
             )
-            subq.append(stmt)
+        per_table.append(stmt)
+    return sqlalchemy.union_all(*per_table)
 
-        stmt = sqlalchemy.select(*subq)
-        result = session.execute(stmt).first()
 
-        return dict(result._mapping)
+def get_last_import_stats_bulk(platform_info_ids: Iterable[int]) -> pd.DataFrame:
+    """
+    Latest insight date / updated_at per table for many platform infos, from
+    one grouped UNION ALL query per chunk of ids.
 
+    Returns a DataFrame indexed by platform_info_id with one column per table
+    in LAST_IMPORT_STATS_TABLES; tables without rows are None.
+    """
+    platform_info_ids = [int(i) for i in platform_info_ids]
+    position = {
+        platform_info_id: i for i, platform_info_id in enumerate(platform_info_ids)
+    }
+    columns = {
+        table.__name__: [None] * len(platform_info_ids)
+        for table in LAST_IMPORT_STATS_TABLES
+    }
 
-def get_import_stats(
-    brand_id: int, channel: AdvertisementChannel, import_date: datetime.date
-):
     engine = get_engine()
+    with Session(engine) as session:
+        for start in range(0, len(platform_info_ids), LAST_IMPORT_STATS_CHUNK_SIZE):
+            chunk = platform_info_ids[start : start + LAST_IMPORT_STATS_CHUNK_SIZE]
+            for row in session.execute(_last_import_stats_stmt(chunk)):
+                columns[row.table_name][
+                    position[row.platform_info_id]
+                ] = row.last_import
 
+    return pd.DataFrame(
+        columns, index=pd.Index(platform_info_ids, name="platform_info_id")
+    )
+
+
+@cached_result(ttl=15 * 60, stale_ttl=60 * 60)
+def get_last_import_stats(platform_info_id: int):
+    return get_last_import_stats_bulk([platform_info_id]).iloc[0].to_dict()
+
+
+def get_insights_stats_from_watermarks(full_rebuild: bool = False):
+    """
+    Same shape as get_insights_stats, but served from the incremental
+    watermark store so a refresh only range-scans the last few days.
+    """
+    watermarks = refresh_watermarks(full_rebuild=full_rebuild)
+
+    engine = get_engine()
     with Session(engine) as session:
-        platform_info_id = get_platform_info_id(
-            brand_id=brand_id, platform_id=channel.value
+        stmt = (
+            sqlalchemy.select(
+                Brands.id,
+                Brands.name,
+                PlatformInfo.id.label("platform_info_id"),
+                PlatformInfo.platform_id,
+            )
+            .join(PlatformInfo, Brands.id == PlatformInfo.brand_id)
+            .where(Brands.is_active.is_(True))
+            .where(PlatformInfo.deleted_at.is_(None))
         )
+        result = session.execute(stmt).fetchall()
 
-        stats = {}
-        insight_tables = [
-            DailyInsights,
-            ImageAssetInsights,
-            VideoAssetInsights,
-            TextAssetInsights,
-        ]
-
-        entity_tables = [
-            Ads,
-            AdGroups,
-            Campaigns,
-            ImageAsset,
-            VideoAsset,
-            TextAsset,
-        ]
-
-        for table in insight_tables:
-            stmt = (
-                sqlalchemy.select(func.count())
-                .where(table.platform_info_id == platform_info_id)
-                .where(table.date == import_date)
+    statistics = {}
+    for row in result:
+        entry = statistics.get((row.id, row.platform_id))
+        if entry is None:
+            entry = {
+                "brand_id": row.id,
+                "brand_name": row.name,
+                "platform": AdvertisementChannel(row.platform_id).name,
+            }
+            for table in INSIGHT_TABLES:
+                entry[f"latest_{table.__tablename__}_date"] = None
+            statistics[(row.id, row.platform_id)] = entry
+        for table in INSIGHT_TABLES:
+            column = f"latest_{table.__tablename__}_date"
+            watermark = watermarks.get((row.platform_info_id, table.__name__))
+            if watermark and (entry[column] is None or watermark > entry[column]):
+                entry[column] = watermark
+
+    unified_list = []
+    for entry in statistics.values():
+        for table in INSIGHT_TABLES:
+            column = f"latest_{table.__tablename__}_date"
+            entry[column] = (
+                entry[column].strftime("%Y-%m-%d") if entry[column] else "NULL"
             )
-            result = session.scalar(stmt)
-            logger.info(f"{table.__name__} count: {result}")
-            stats[table.__name__] = result
+        unified_list.append(entry)
+    return unified_list
 
-        for table in entity_tables:
-            stmt = (
-                sqlalchemy.select(func.count())
-                .where(table.platform_info_id == platform_info_id)
-                .where(table.created_at == import_date)
+
+def get_last_import_stats_from_watermarks(
+    platform_info_id: int, full_rebuild: bool = False
+):
+    watermarks = refresh_watermarks(full_rebuild=full_rebuild)
+    table_names = [table.__name__ for table in PLATFORM_INFO_TABLES]
+    table_names += [table.__name__ for table in ASSET_TABLES]
+    return {
+        table_name: watermarks.get((platform_info_id, table_name))
+        for table_name in table_names
+    }
+
+
+def _import_stats_column_names():
+    columns = ["brand_id", "channel", "date"]
+    columns += [table.__name__ for table in INSIGHT_TABLES]
+    for table in ENTITY_TABLES + ASSET_TABLES:
+        columns += [f"{table.__name__}_created", f"{table.__name__}_updated"]
+    return columns
+
+
+def get_import_stats_bulk(
+    brand_ids: Iterable[int],
+    channels: Iterable[AdvertisementChannel],
+    dates: Iterable[datetime.date],
+) -> Dict[str, list]:
+    """
+    Created/updated/insight counts for every brand x channel x date, as a
+    columnar dict with one entry per (brand_id, channel, date).
+
+    Insight counts come from one grouped UNION ALL query and entity counts
+    from another, using SUM(CASE ...) per date so created_at and updated_at
+    are counted in the same scan.
+    """
+    brand_ids = list(brand_ids)
+    channels = list(channels)
+    dates = list(dates)
+
+    engine = get_engine()
+    with Session(engine) as session:
+        stmt = (
+            sqlalchemy.select(
+                PlatformInfo.id, PlatformInfo.brand_id, PlatformInfo.platform_id
             )
-            created = session.scalar(stmt)
-            stmt = (
-                sqlalchemy.select(func.count())
-                .where(table.platform_info_id == platform_info_id)
-                .where(table.updated_at == import_date)
+            .where(PlatformInfo.brand_id.in_(brand_ids))
+            .where(PlatformInfo.platform_id.in_([c.value for c in channels]))
+            .where(PlatformInfo.deleted_at.is_(None))
+        )
+        owners = {
+            row.id: (row.brand_id, row.platform_id)
+            for row in session.execute(stmt).fetchall()
+        }
+        platform_info_ids = list(owners)
+
+        counts = {}
+        if platform_info_ids:
+            stmt = sqlalchemy.union_all(
+                *[
+                    sqlalchemy.select(
+                        table.platform_info_id.label("platform_info_id"),
+                        sqlalchemy.literal(table.__name__).label("table_name"),
+                        table.date.label("date"),
+                        func.count().label("count"),
+                    )
+                    .where(table.platform_info_id.in_(platform_info_ids))
+                    .where(table.date.in_(dates))
+                    .group_by(table.platform_info_id, table.date)
+                    for table in INSIGHT_TABLES
+                ]
             )
-            updated = session.scalar(stmt) - created
-            logger.info(f"{table.__name__} count: {result}")
-            stats[table.__name__] = {
-                "created": created,
-                "updated": updated,
-            }
+            for row in session.execute(stmt).fetchall():
+                key = (*owners[row.platform_info_id], row.date, row.table_name)
+                counts[key] = counts.get(key, 0) + row.count
+
+            entity_stmts = []
+            for table in ENTITY_TABLES + ASSET_TABLES:
+                if table in ASSET_TABLES:
+                    platform_info_id = Ads.platform_info_id
+                else:
+                    platform_info_id = table.platform_info_id
+                per_date = []
+                for i, date in enumerate(dates):
+                    per_date += [
+                        func.sum(
+                            sqlalchemy.case((table.created_at == date, 1), else_=0)
+                        ).label(f"created_{i}"),
+                        func.sum(
+                            sqlalchemy.case((table.updated_at == date, 1), else_=0)
+                        ).label(f"updated_{i}"),
+                    ]
+                stmt = sqlalchemy.select(
+                    platform_info_id.label("platform_info_id"),
+                    sqlalchemy.literal(table.__name__).label("table_name"),
+                    *per_date,
+                )
+                if table in ASSET_TABLES:
+                    stmt = stmt.join(Ads, table.ad_id == Ads.id)
+                stmt = (
+                    stmt.where(platform_info_id.in_(platform_info_ids))
+                    .where(
+                        sqlalchemy.or_(
+                            table.created_at.in_(dates), table.updated_at.in_(dates)
+                        )
+                    )
+                    .group_by(platform_info_id)
+                )
+                entity_stmts.append(stmt)
+
+            for row in session.execute(sqlalchemy.union_all(*entity_stmts)):
+                owner = owners[row.platform_info_id]
+                for i, date in enumerate(dates):
+                    created = row._mapping[f"created_{i}"] or 0
+                    updated = row._mapping[f"updated_{i}"] or 0
+                    key = (*owner, date, f"{row.table_name}_created")
+                    counts[key] = counts.get(key, 0) + created
+                    key = (*owner, date, f"{row.table_name}_updated")
+                    counts[key] = counts.get(key, 0) + updated - created
+
+    column_names = _import_stats_column_names()
+    result = {column: [] for column in column_names}
+    for brand_id in brand_ids:
+        for channel in channels:
+            for date in dates:
+                result["brand_id"].append(brand_id)
+                result["channel"].append(channel)
+                result["date"].append(date)
+                for column in column_names[3:]:
+                    result[column].append(
+                        counts.get((brand_id, channel.value, date, column), 0)
+                    )
+    return result
+
+
+def get_daily_insight_counts(
+    brand_ids: Iterable[int], start: datetime.date, end: datetime.date
+) -> pd.DataFrame:
+    """
+    Rows per (brand_id, platform_id, insight table, date) for start..end, from
+    one grouped UNION ALL that range-scans each insight table's date index.
+    """
+    platform_info_ids = (
+        sqlalchemy.select(PlatformInfo.id)
+        .where(PlatformInfo.brand_id.in_([int(b) for b in brand_ids]))
+        .where(PlatformInfo.deleted_at.is_(None))
+    )
+    per_table = [
+        sqlalchemy.select(
+            table.platform_info_id.label("platform_info_id"),
+            sqlalchemy.literal(table.__tablename__).label("table_name"),
+            table.date.label("date"),
+            func.count().label("count"),
+        )
+        .where(table.platform_info_id.in_(platform_info_ids))
+        .where(table.date.between(start, end))
+        .group_by(table.platform_info_id, table.date)
+        for table in INSIGHT_TABLES
+    ]
+    counts = sqlalchemy.union_all(*per_table).subquery("daily_counts")
+    stmt = (
+        sqlalchemy.select(
+            PlatformInfo.brand_id,
+            PlatformInfo.platform_id,
+            counts.c.table_name,
+            counts.c.date,
+            func.sum(counts.c.count).label("count"),
+        )
+        .join(counts, PlatformInfo.id == counts.c.platform_info_id)
+        .group_by(
+            PlatformInfo.brand_id,
+            PlatformInfo.platform_id,
+            counts.c.table_name,
+            counts.c.date,
+        )
+    )
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(stmt).fetchall()
+    df = pd.DataFrame(
+        rows, columns=["brand_id", "platform_id", "table_name", "date", "count"]
+    )
+    df["table_name"] = pd.Categorical(
+        df["table_name"], categories=[table.__tablename__ for table in INSIGHT_TABLES]
+    )
+    df["date"] = pd.to_datetime(df["date"])
+    df["count"] = df["count"].astype(np.int64)
+    return df
+
+
+def get_import_stats(
+    brand_id: int, channel: AdvertisementChannel, import_date: datetime.date
+):
+    columns = get_import_stats_bulk([brand_id], [channel], [import_date])
+
+    stats = {}
+    for table in INSIGHT_TABLES:
+        stats[table.__name__] = columns[table.__name__][0]
+        logger.info(f"{table.__name__} count: {stats[table.__name__]}")
+
+    for table in ENTITY_TABLES + ASSET_TABLES:
+        stats[table.__name__] = {
+            "created": columns[f"{table.__name__}_created"][0],
+            "updated": columns[f"{table.__name__}_updated"][0],
+        }
+        logger.info(f"{table.__name__} count: {stats[table.__name__]}")
 
-        return stats
+    return stats
@@ -48,7 +48,9 @@ def account_details_from_db(
         return account_details
 
 
-def get_all_account_details_from_db(channel: AdvertisementChannel) -> AccountDetails:
+def get_all_account_details_from_db(
+    channel: AdvertisementChannel,
+) -> List[AccountDetails]:
     sql_engine = get_engine()
     with Session(sql_engine) as session:
         platform_id_stmt = select(Platforms.id).where(
@@ -57,29 +59,34 @@ def get_all_account_details_from_db(channel: AdvertisementChannel) -> AccountDet
         platform_id_subq = platform_id_stmt.subquery()
         active_brands_stmt = select(Brands.id).where(Brands.is_active == True)
         active_brands_subq = active_brands_stmt.subquery()
+        # Only the columns AccountDetails needs, as plain rows rather than
+        # full PlatformInfo ORM objects.
         account_details_stmt = (
-            select(PlatformInfo)
+            select(
+                PlatformInfo.account_id,
+                PlatformInfo.brand_id,
+                PlatformInfo.account_name,
+                PlatformInfo.token1,
+                PlatformInfo.token2,
+                PlatformInfo.target_words,
+            )
             .where(PlatformInfo.deleted_at.is_(None))
             .where(PlatformInfo.platform_id.in_(platform_id_subq))
             .where(PlatformInfo.brand_id.in_(active_brands_subq))
         )
 
-        account_details_rows = session.execute(account_details_stmt).fetchall()
-
-        all_account_details = []
-        for account_details_row in account_details_rows:
-            account_details = account_details_row[0]
-            all_account_details.append(
-                AccountDetails(
-                    account_id=account_details.account_id,
-                    brand_id=account_details.brand_id,
-                    channel=channel,
-                    account_name=account_details.account_name,
-                    token1=account_details.token1,
-                    token2=account_details.token2,
-                    target_words=account_details.target_words,
-                )
+        all_account_details = [
+            AccountDetails(
+                account_id=row.account_id,
+                brand_id=row.brand_id,
+                channel=channel,
+                account_name=row.account_name,
+                token1=row.token1,
+                token2=row.token2,
+                target_words=row.target_words,
             )
+            for row in session.execute(account_details_stmt)
+        ]
 
         return all_account_details
 
@@ -0,0 +1,209 @@
+import datetime
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, String, Table, func
+
+from src.logging import get_logger
+from src.sql.engine import get_engine
+from src.sql.tables import (
+    AdGroups,
+    Ads,
+    Campaigns,
+    DailyInsights,
+    ImageAsset,
+    ImageAssetInsights,
+    TextAsset,
+    TextAssetInsights,
+    VideoAsset,
+    VideoAssetInsights,
+)
+
+logger = get_logger(__name__)
+
+WATERMARK_DB_URL = os.environ.get(
+    "WATERMARK_DB_URL", "sqlite:///freshness_watermarks.sqlite"
+)
+DEFAULT_LOOKBACK = datetime.timedelta(days=2)
+
+# Tables keyed directly by platform_info_id, with the column that moves forward
+# on every import.
+PLATFORM_INFO_TABLES = {
+    DailyInsights: DailyInsights.date,
+    ImageAssetInsights: ImageAssetInsights.date,
+    VideoAssetInsights: VideoAssetInsights.date,
+    TextAssetInsights: TextAssetInsights.date,
+    Ads: Ads.updated_at,
+    AdGroups: AdGroups.updated_at,
+    Campaigns: Campaigns.updated_at,
+}
+
+# Asset tables only reach platform_info through Ads.
+ASSET_TABLES = [
+    ImageAsset,
+    VideoAsset,
+    TextAsset,
+]
+
+WatermarkKey = Tuple[int, str]
+
+metadata = MetaData()
+watermarks_table = Table(
+    "dashboard_freshness_watermarks",
+    metadata,
+    Column("platform_info_id", Integer, primary_key=True),
+    Column("table_name", String(64), primary_key=True),
+    Column("watermark", Date),
+    Column("refreshed_at", DateTime),
+)
+
+
+class WatermarkStore:
+    """
+    Per-(platform_info_id, table) high-water marks kept in a side store, either
+    a local SQLite file or a table owned by the dashboard.
+    """
+
+    def __init__(self, engine: Optional[sqlalchemy.engine.Engine] = None):
+        self.engine = engine or sqlalchemy.create_engine(WATERMARK_DB_URL)
+        metadata.create_all(self.engine)
+
+    def load(
+        self, table_names: Optional[Iterable[str]] = None
+    ) -> Dict[WatermarkKey, datetime.date]:
+        stmt = sqlalchemy.select(
+            watermarks_table.c.platform_info_id,
+            watermarks_table.c.table_name,
+            watermarks_table.c.watermark,
+        )
+        if table_names is not None:
+            stmt = stmt.where(watermarks_table.c.table_name.in_(list(table_names)))
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+        return {(row.platform_info_id, row.table_name): row.watermark for row in rows}
+
+    def save(self, watermarks: Dict[WatermarkKey, datetime.date]):
+        refreshed_at = datetime.datetime.now()
+        by_table: Dict[str, Dict[int, datetime.date]] = {}
+        for (platform_info_id, table_name), watermark in watermarks.items():
+            by_table.setdefault(table_name, {})[platform_info_id] = watermark
+
+        with self.engine.begin() as conn:
+            for table_name, marks in by_table.items():
+                conn.execute(
+                    sqlalchemy.delete(watermarks_table)
+                    .where(watermarks_table.c.table_name == table_name)
+                    .where(watermarks_table.c.platform_info_id.in_(list(marks)))
+                )
+                conn.execute(
+                    sqlalchemy.insert(watermarks_table),
+                    [
+                        {
+                            "platform_info_id": platform_info_id,
+                            "table_name": table_name,
+                            "watermark": watermark,
+                            "refreshed_at": refreshed_at,
+                        }
+                        for platform_info_id, watermark in marks.items()
+                    ],
+                )
+
+    def clear(self):
+        with self.engine.begin() as conn:
+            conn.execute(sqlalchemy.delete(watermarks_table))
+
+
+_store: Optional[WatermarkStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> WatermarkStore:
+    global _store
+
+    if _store:
+        return _store
+
+    with _store_lock:
+        if not _store:
+            _store = WatermarkStore()
+    return _store
+
+
+def _range_scan_stmt(table, cutoff: Optional[datetime.date]):
+    if table in PLATFORM_INFO_TABLES:
+        column = PLATFORM_INFO_TABLES[table]
+        stmt = sqlalchemy.select(
+            table.platform_info_id.label("platform_info_id"),
+            sqlalchemy.literal(table.__name__).label("table_name"),
+            func.max(column).label("watermark"),
+        ).group_by(table.platform_info_id)
+    else:
+        column = table.updated_at
+        stmt = (
+            sqlalchemy.select(
+                Ads.platform_info_id.label("platform_info_id"),
+                sqlalchemy.literal(table.__name__).label("table_name"),
+                func.max(column).label("watermark"),
+            )
+            .join(Ads, table.ad_id == Ads.id)
+            .group_by(Ads.platform_info_id)
+        )
+    if cutoff is not None:
+        stmt = stmt.where(column >= cutoff)
+    return stmt
+
+
+def refresh_watermarks(
+    store: Optional[WatermarkStore] = None,
+    lookback: datetime.timedelta = DEFAULT_LOOKBACK,
+    full_rebuild: bool = False,
+) -> Dict[WatermarkKey, datetime.date]:
+    """
+    Advance the stored watermarks and return all of them.
+
+    Each table is only scanned for rows with a date at or after its newest
+    stored watermark minus `lookback`. Accounts that stopped importing keep
+    their old mark; late backfills older than the lookback window are only
+    picked up by a full rebuild.
+    """
+    store = store or get_store()
+    if full_rebuild:
+        store.clear()
+    watermarks = store.load()
+
+    newest: Dict[str, datetime.date] = {}
+    for (_, table_name), watermark in watermarks.items():
+        if watermark and (table_name not in newest or watermark > newest[table_name]):
+            newest[table_name] = watermark
+
+    stmts = []
+    for table in list(PLATFORM_INFO_TABLES) + ASSET_TABLES:
+        newest_mark = newest.get(table.__name__)
+        cutoff = newest_mark - lookback if newest_mark else None
+        stmts.append(_range_scan_stmt(table, cutoff))
+
+    start_time = datetime.datetime.now()
+    with get_engine().connect() as conn:
+        rows = conn.execute(sqlalchemy.union_all(*stmts)).fetchall()
+    end_time = datetime.datetime.now()
+    logger.info(
+        f"Watermark refresh scanned {len(rows)} groups in {end_time - start_time}"
+    )
+
+    changed = {}
+    for row in rows:
+        if row.watermark is None:
+            continue
+        key = (row.platform_info_id, row.table_name)
+        watermark = row.watermark
+        if isinstance(watermark, datetime.datetime):
+            watermark = watermark.date()
+        if key not in watermarks or watermarks[key] < watermark:
+            changed[key] = watermark
+
+    if changed:
+        store.save(changed)
+        watermarks.update(changed)
+    return watermarks
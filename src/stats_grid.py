@@ -0,0 +1,91 @@
+"""
+Server-side filtering, sorting and paging over the insights_stats snapshot,
+so the dashboard only ever converts and sends one page of rows.
+"""
+
+import datetime
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.util import classify_last_insight_dates
+
+STATUS_DATE_COLUMN = "latest_daily_insights_date"
+
+
+def with_status(table: pa.Table, now: Optional[datetime.datetime] = None) -> pa.Table:
+    """
+    Add a `status` column classifying each row's last daily insight the same
+    way get_all_brand_statuses does.
+    """
+    dates = table[STATUS_DATE_COLUMN].to_pandas().astype("datetime64[ns]")
+    status = classify_last_insight_dates(dates, now=now)
+    return table.append_column(
+        "status", pa.DictionaryArray.from_pandas(pd.Series(status))
+    )
+
+
+def platform_names(table: pa.Table) -> List[str]:
+    """The platforms present in `table`, for the platform filter."""
+    return sorted(
+        pc.unique(table["platform"].cast(pa.string())).drop_null().to_pylist()
+    )
+
+
+def filter_table(
+    table: pa.Table,
+    statuses: Optional[Iterable[str]] = None,
+    platforms: Optional[Iterable[str]] = None,
+    brand_name: Optional[str] = None,
+) -> pa.Table:
+    mask = None
+    conditions = []
+    if statuses:
+        conditions.append(
+            pc.is_in(table["status"].cast(pa.string()), pa.array(list(statuses)))
+        )
+    if platforms:
+        conditions.append(
+            pc.is_in(table["platform"].cast(pa.string()), pa.array(list(platforms)))
+        )
+    if brand_name:
+        conditions.append(
+            pc.match_substring(table["brand_name"], brand_name, ignore_case=True)
+        )
+    for condition in conditions:
+        mask = condition if mask is None else pc.and_(mask, condition)
+    if mask is None:
+        return table
+    return table.filter(mask)
+
+
+def get_page(
+    table: pa.Table,
+    page: int = 0,
+    page_size: int = 50,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Return one page of `table` as a DataFrame, and the total row count.
+
+    Only the requested rows are materialised: sorting computes indices over
+    the sort column and takes the page's slice of them.
+    """
+    total = table.num_rows
+    offset = page * page_size
+    if sort_by:
+        keys = table[sort_by]
+        if pa.types.is_dictionary(keys.type):
+            keys = keys.cast(keys.type.value_type)
+        indices = pc.array_sort_indices(
+            keys,
+            order="descending" if descending else "ascending",
+            null_placement="at_end",
+        )
+        rows = table.take(indices.slice(offset, page_size))
+    else:
+        rows = table.slice(offset, page_size)
+    return rows.to_pandas(), total
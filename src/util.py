@@ -1,17 +1,111 @@
 import datetime
-from typing import List
+from typing import Iterable, List, Optional
 
+import numpy as np
+import pandas as pd
+
+from src import failed_jobs
 from src.model import AdvertisementChannel, Status
 from src.sql import sql_manager
 
+WARNING_AFTER = np.timedelta64(1, "D")
+FAILED_AFTER = np.timedelta64(2, "D")
+
 
 def get_brand_status(brand_id: int, channel: AdvertisementChannel) -> dict:
     return {
         "airbyte_status": _get_airbyte_status(brand_id, channel),
         "otl_status": _get_otl_status(brand_id, channel),
+        "pending_failed_jobs": failed_jobs.get_monitor().pending_for(brand_id, channel),
     }
 
 
+def get_all_brand_statuses(
+    brand_ids: Optional[Iterable[int]] = None,
+    channels: Optional[Iterable[AdvertisementChannel]] = None,
+    now: Optional[datetime.datetime] = None,
+) -> pd.DataFrame:
+    """
+    OTL status of every active brand and channel in one query.
+
+    Returns one row per (brand_id, channel) with the last insight date and
+    its Status name. Only brand/channel pairs that have a platform info are
+    listed, unless `channels` is given: then every brand found gets a row for
+    each of those channels, and the missing ones are UNKNOWN.
+    """
+    rows = sql_manager.get_latest_insight_dates(brand_ids=brand_ids, channels=channels)
+    statuses = pd.DataFrame(
+        rows, columns=["brand_id", "brand_name", "platform_id", "last_insight_date"]
+    )
+    statuses["last_insight_date"] = pd.to_datetime(statuses["last_insight_date"])
+
+    if channels is not None:
+        brand_names = statuses.groupby("brand_id")["brand_name"].first()
+        grid = pd.MultiIndex.from_product(
+            [brand_names.index, [c.value for c in channels]],
+            names=["brand_id", "platform_id"],
+        )
+        statuses = (
+            statuses.set_index(["brand_id", "platform_id"]).reindex(grid).reset_index()
+        )
+        statuses["brand_name"] = statuses["brand_id"].map(brand_names)
+
+    statuses["channel"] = pd.Categorical(
+        [AdvertisementChannel(p).name for p in statuses["platform_id"]],
+        categories=[c.name for c in AdvertisementChannel],
+    )
+    statuses["status"] = classify_last_insight_dates(
+        statuses["last_insight_date"], now=now
+    )
+    return statuses[
+        ["brand_id", "brand_name", "channel", "last_insight_date", "status"]
+    ]
+
+
+def classify_last_insight_dates(
+    last_insight_dates: pd.Series, now: Optional[datetime.datetime] = None
+) -> pd.Categorical:
+    """
+    Vectorised form of the _get_otl_status thresholds: older than two days
+    is FAILED, older than one day WARNING, no insights at all UNKNOWN.
+    """
+    now = np.datetime64(now or datetime.datetime.now(), "ns")
+    dates = last_insight_dates.to_numpy(dtype="datetime64[ns]")
+    age = now - dates
+    names = [status.name for status in Status]
+    codes = np.select(
+        [np.isnat(dates), age > FAILED_AFTER, age > WARNING_AFTER],
+        [
+            names.index(Status.UNKNOWN.name),
+            names.index(Status.FAILED.name),
+            names.index(Status.WARNING.name),
+        ],
+        default=names.index(Status.OK.name),
+    )
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
+def escalate_statuses(
+    statuses: pd.Series, volume_statuses: pd.Series
+) -> pd.Categorical:
+    """
+    Raise each status to its volume status where that is WARNING or FAILED
+    and worse, so a partial import shows even when MAX(date) looks fresh.
+    """
+    names = [status.name for status in Status]
+    current = np.array([Status[name].value for name in statuses.astype(str)])
+    volume = np.array(
+        [
+            Status[name].value
+            for name in volume_statuses.fillna(Status.UNKNOWN.name).astype(str)
+        ]
+    )
+    escalate = (volume > current) & (volume >= Status.WARNING.value)
+    result = np.where(escalate, volume, current)
+    codes = [names.index(Status(value).name) for value in result]
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
 def get_active_brands() -> List[int]:
     return sql_manager.get_active_brands()
 
@@ -30,9 +124,8 @@ def _get_airbyte_status(brand_id: int, channel: AdvertisementChannel) -> dict:
 
 
 def _get_otl_status(brand_id: int, channel: AdvertisementChannel) -> dict:
-    today = datetime.datetime.now()
-    last_insight_in_db = sql_manager.get_min_date_for_brand(brand_id, channel)
-    if last_insight_in_db is None:
+    statuses = get_all_brand_statuses(brand_ids=[brand_id], channels=[channel])
+    if statuses.empty or pd.isna(statuses["last_insight_date"].iloc[0]):
         return {
             "status": Status.UNKNOWN,
             "message": "No insights in DB",
@@ -40,26 +133,10 @@ def _get_otl_status(brand_id: int, channel: AdvertisementChannel) -> dict:
             "brand_id": brand_id,
         }
 
-    elif last_insight_in_db < today - datetime.timedelta(
-        days=1
-    ) and last_insight_in_db > today - datetime.timedelta(days=2):
-        return {
-            "status": Status.WARNING,
-            "message": f"last insight in DB: {last_insight_in_db}",
-            "channel": channel.name,
-            "brand_id": brand_id,
-        }
-    elif last_insight_in_db < today - datetime.timedelta(days=2):
-        return {
-            "status": Status.FAILED,
-            "message": f"last insight in DB: {last_insight_in_db}",
-            "channel": channel.name,
-            "brand_id": brand_id,
-        }
-    else:
-        return {
-            "status": "OK",
-            "message": f"last insight in DB: {last_insight_in_db}",
-            "channel": channel.name,
-            "brand_id": brand_id,
-        }
+    last_insight_in_db = statuses["last_insight_date"].iloc[0].date()
+    return {
+        "status": Status[statuses["status"].iloc[0]],
+        "message": f"last insight in DB: {last_insight_in_db}",
+        "channel": channel.name,
+        "brand_id": brand_id,
+    }
@@ -0,0 +1,5 @@
+import os
+
+# Tests never reach AWS or MySQL; modules read these at import time.
+os.environ.setdefault("USE_SECRET_MANAGER", "False")
+os.environ.setdefault("RESULT_CACHE_PATH", "")
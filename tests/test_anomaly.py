@@ -0,0 +1,114 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import anomaly
+from src.sql import sql_manager
+
+END = datetime.date(2026, 10, 16)
+TABLES = [table.__tablename__ for table in sql_manager.INSIGHT_TABLES]
+
+
+def daily_rows(series: dict, days: int = anomaly.ANOMALY_WINDOW_DAYS + 1):
+    """
+    Long-format rows like get_daily_insight_counts from
+    {(brand_id, platform_id, table_name): counts, oldest day first}.
+    """
+    dates = pd.date_range(end=END, periods=days, freq="D")
+    rows = [
+        (brand_id, platform_id, table_name, date, count)
+        for (brand_id, platform_id, table_name), counts in series.items()
+        for date, count in zip(dates, counts)
+    ]
+    df = pd.DataFrame(
+        rows, columns=["brand_id", "platform_id", "table_name", "date", "count"]
+    )
+    df["table_name"] = pd.Categorical(df["table_name"], categories=TABLES)
+    return df
+
+
+def volume_statuses(monkeypatch, rows: pd.DataFrame) -> pd.DataFrame:
+    monkeypatch.setattr(sql_manager, "get_daily_insight_counts", lambda *a: rows)
+    return anomaly.get_volume_statuses([1, 2], end=END).reset_index(drop=True)
+
+
+def test_robust_scores_match_a_plain_median_mad():
+    rng = np.random.default_rng(0)
+    counts = rng.poisson(rng.lognormal(4, 1, (50, 1)), size=(50, 40))
+    window = 28
+    medians, scores = anomaly.robust_scores(counts, window)
+
+    for day in range(window, counts.shape[1]):
+        history = counts[:, day - window : day].astype(float)
+        median = np.median(history, axis=1)
+        mad = np.median(np.abs(history - median[:, None]), axis=1)
+        scale = np.maximum.reduce(
+            [anomaly.MAD_TO_SIGMA * mad, 0.1 * median, np.sqrt(median), np.ones(50)]
+        )
+        expected = np.where(
+            median >= anomaly.ANOMALY_MIN_MEDIAN,
+            (counts[:, day] - median) / scale,
+            np.nan,
+        )
+        np.testing.assert_array_equal(medians[:, day], median)
+        np.testing.assert_allclose(scores[:, day], expected)
+    assert np.isnan(scores[:, :window]).all()
+
+
+def test_drop_fails_and_spike_warns(monkeypatch):
+    steady = [1000] * anomaly.ANOMALY_WINDOW_DAYS
+    rows = daily_rows(
+        {
+            (1, 1, TABLES[0]): steady + [100],
+            (1, 1, TABLES[1]): steady + [1010],
+            (2, 1, TABLES[0]): steady + [3000],
+        }
+    )
+    result = volume_statuses(monkeypatch, rows)
+    assert result[["brand_id", "volume_status", "volume_table"]].values.tolist() == [
+        [1, "FAILED", TABLES[0]],
+        [2, "WARNING", TABLES[0]],
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ties_do_not_depend_on_row_order(monkeypatch, seed):
+    quiet = [2] * (anomaly.ANOMALY_WINDOW_DAYS + 1)
+    busy = [500] * anomaly.ANOMALY_WINDOW_DAYS
+    rows = daily_rows(
+        {
+            # Too small to score: every table is UNKNOWN.
+            (1, 1, TABLES[2]): quiet,
+            (1, 1, TABLES[0]): quiet,
+            (1, 1, TABLES[1]): quiet,
+            # Two equally bad drops: the larger deviation wins, then table order.
+            (2, 1, TABLES[3]): busy + [0],
+            (2, 1, TABLES[1]): busy + [0],
+            (2, 2, TABLES[2]): busy + [50],
+            (2, 2, TABLES[1]): busy + [0],
+        }
+    )
+    shuffled = rows.sample(frac=1, random_state=seed).reset_index(drop=True)
+    expected = volume_statuses(monkeypatch, rows)
+    pd.testing.assert_frame_equal(volume_statuses(monkeypatch, shuffled), expected)
+
+    assert expected[["brand_id", "volume_status"]].values.tolist() == [
+        [1, "UNKNOWN"],
+        [2, "FAILED"],
+        [2, "FAILED"],
+    ]
+    assert pd.isna(expected["volume_table"][0])
+    assert expected["volume_table"][1:].tolist() == [TABLES[1], TABLES[1]]
+
+
+def test_no_series_keeps_key_types(monkeypatch):
+    rows = daily_rows({})
+    result = volume_statuses(monkeypatch, rows)
+    assert result.empty
+    assert result["brand_id"].dtype == np.int64
+    merged = pd.DataFrame({"brand_id": [1], "channel": ["FACEBOOK"]}).astype(
+        {"channel": str}
+    )
+    assert len(merged.merge(result, on=["brand_id", "channel"], how="left")) == 1
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from src.async_manager import AsyncAPIManager, CustomUnit, RetryPolicy
+
+
+def http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code}", response=response)
+
+
+class Flaky:
+    def __init__(self, error: Exception, failures: int = 100):
+        self.error = error
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def test_hung_units_time_out_without_holding_the_pool():
+    release = threading.Event()
+    units = [CustomUnit(release.wait, 3600).with_policy(timeout=0.3) for _ in range(2)]
+    units += [CustomUnit(lambda i=i: i).with_policy(timeout=5) for i in range(4)]
+
+    started = time.monotonic()
+    try:
+        outcomes = AsyncAPIManager().run_outcomes(units, nthreads=2)
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 3
+    assert [type(o.error) for o in outcomes[:2]] == [TimeoutError, TimeoutError]
+    assert [o.value for o in outcomes[2:]] == [0, 1, 2, 3]
+
+
+def test_queued_unit_times_out_from_submission():
+    release = threading.Event()
+    units = [
+        CustomUnit(release.wait, 3600),
+        CustomUnit(lambda: "never started").with_policy(timeout=0.2),
+    ]
+    stream = AsyncAPIManager().stream_outcomes(units, nthreads=1)
+    try:
+        first = next(stream)
+        assert first.index == 1
+        assert isinstance(first.error, TimeoutError)
+        assert first.attempts == 0
+    finally:
+        release.set()
+    assert [o.index for o in stream] == [0]
+
+
+def test_hung_units_do_not_block_interpreter_exit():
+    script = (
+        "import time\n"
+        "from src.async_manager import AsyncAPIManager, CustomUnit\n"
+        "units = [CustomUnit(time.sleep, 3600).with_policy(timeout=0.2)]\n"
+        "print(AsyncAPIManager().run_outcomes(units, nthreads=1)[0].error)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=30
+    )
+    assert result.returncode == 0, result.stderr
+    assert "timed out" in result.stdout
+
+
+def test_only_transient_errors_are_retried():
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    cases = {
+        "connection": (requests.ConnectionError("reset"), 3),
+        "timeout": (TimeoutError("slow"), 3),
+        "throttled": (http_error(429), 3),
+        "server": (http_error(503), 3),
+        "not found": (http_error(404), 1),
+        "forbidden": (http_error(403), 1),
+        "bug": (ValueError("bad payload"), 1),
+    }
+    funcs = {name: Flaky(error) for name, (error, _) in cases.items()}
+    units = [
+        CustomUnit(func).with_policy(timeout=5, retry_policy=policy)
+        for func in funcs.values()
+    ]
+    outcomes = AsyncAPIManager().run_outcomes(units, nthreads=2)
+
+    for (name, (_, expected)), outcome in zip(cases.items(), outcomes):
+        assert outcome.attempts == expected, name
+        assert not outcome.ok, name
+
+
+def test_retry_succeeds_within_policy():
+    func = Flaky(http_error(502), failures=2)
+    unit = CustomUnit(func).with_policy(retry_policy=RetryPolicy(base_delay=0))
+    [outcome] = AsyncAPIManager().run_outcomes([unit])
+    assert outcome.ok and outcome.value == "ok" and outcome.attempts == 3
@@ -0,0 +1,119 @@
+import datetime
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+from src import failed_jobs
+from src.model import AdvertisementChannel
+from src.sql import sql_manager
+
+Row = namedtuple(
+    "Row",
+    [
+        "job_id",
+        "platform_id",
+        "account_id",
+        "status",
+        "run_status",
+        "retry_count",
+        "time_of_failure",
+        "time_of_next_retry",
+    ],
+)
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+PLATFORM = AdvertisementChannel.FACEBOOK.value
+
+
+class FakeFailedJobs:
+    """The FailedJobs table behind the sql_manager queries the monitor uses."""
+
+    def __init__(self, monkeypatch):
+        self.rows = {}
+        self.refreshes = 0
+        self.delay = 0
+        monkeypatch.setattr(sql_manager, "get_live_accounts", self.get_live_accounts)
+        monkeypatch.setattr(sql_manager, "get_failed_jobs_after", self.get_after)
+        monkeypatch.setattr(sql_manager, "get_failed_jobs_by_ids", self.get_by_ids)
+
+    def add(self, job_id, minutes_ago, status="failed", account="act_1"):
+        self.rows[job_id] = Row(
+            job_id,
+            PLATFORM,
+            account,
+            status,
+            status,
+            0,
+            NOW - datetime.timedelta(minutes=minutes_ago),
+            None,
+        )
+
+    def get_live_accounts(self):
+        self.refreshes += 1
+        time.sleep(self.delay)
+        return [(PLATFORM, "act_1", 1)]
+
+    def get_after(self, after, limit):
+        rows = sorted(self.rows.values(), key=lambda r: (r.time_of_failure, r.job_id))
+        if after is not None:
+            rows = [r for r in rows if (r.time_of_failure, r.job_id) > after]
+        return rows[:limit]
+
+    def get_by_ids(self, job_ids):
+        return [self.rows[job_id] for job_id in job_ids if job_id in self.rows]
+
+
+@pytest.fixture
+def table(monkeypatch):
+    return FakeFailedJobs(monkeypatch)
+
+
+def test_late_commit_behind_the_cursor_is_loaded(table):
+    monitor = failed_jobs.FailedJobsMonitor(batch_size=2)
+    table.add(1, minutes_ago=10)
+    table.add(2, minutes_ago=5)
+    assert monitor.refresh(now=NOW)["new"] == 2
+
+    # Committed after the refresh, but failed before the cursor position.
+    table.add(3, minutes_ago=8)
+    changes = monitor.refresh(now=NOW)
+    assert changes["new"] == 1
+    assert monitor.pending_for(1) == 3
+    assert monitor.stats()["cursor"][1] == 2
+
+
+def test_deleted_pending_job_is_dropped(table):
+    monitor = failed_jobs.FailedJobsMonitor()
+    table.add(1, minutes_ago=10)
+    table.add(2, minutes_ago=5)
+    monitor.refresh(now=NOW)
+    assert monitor.pending_for(1, AdvertisementChannel.FACEBOOK) == 2
+
+    del table.rows[1]
+    assert monitor.refresh(now=NOW)["deleted"] == 1
+    assert monitor.pending_for(1, AdvertisementChannel.FACEBOOK) == 1
+    assert monitor.stats()["tracked_jobs"] == 1
+
+
+def test_resolved_job_stops_pending(table):
+    monitor = failed_jobs.FailedJobsMonitor()
+    table.add(1, minutes_ago=10)
+    monitor.refresh(now=NOW)
+    table.add(1, minutes_ago=10, status="resolved")
+    monitor.refresh(now=NOW)
+    assert not monitor.has_pending(1)
+
+
+def test_concurrent_stale_callers_share_one_refresh(table):
+    monitor = failed_jobs.FailedJobsMonitor()
+    table.add(1, minutes_ago=10)
+    table.delay = 0.2
+    threads = [threading.Thread(target=monitor.refresh_if_stale) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert table.refreshes == 1
+    assert monitor.pending_count() == 1
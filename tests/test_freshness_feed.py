@@ -0,0 +1,113 @@
+import datetime
+import socket
+
+import pytest
+import requests
+
+from src.freshness_feed import FreshnessEvent, FreshnessFeed, FreshnessIndex
+from src.model import AdvertisementChannel
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def feed():
+    feed = FreshnessFeed(host="127.0.0.1", port=free_port(), reconcile_seconds=0)
+    yield feed.start()
+    feed.stop()
+
+
+def test_events_are_served_back(feed):
+    url = f"http://127.0.0.1:{feed.port}"
+    event = {"platform_info_id": 7, "table": "daily_insights", "max_date": "2026-10-16"}
+    assert requests.post(f"{url}/events", json=event).json() == {
+        "applied": 1,
+        "ignored": 0,
+    }
+    response = requests.get(f"{url}/freshness/7")
+    assert response.json() == {"daily_insights": "2026-10-16"}
+
+
+def test_malformed_requests_are_rejected(feed):
+    url = f"http://127.0.0.1:{feed.port}"
+    assert requests.get(f"{url}/freshness/not-an-id").status_code == 400
+    bad_event = {"platform_info_id": 7, "table": "unknown", "max_date": "2026-10-16"}
+    assert requests.post(f"{url}/events", json=bad_event).status_code == 400
+
+
+def test_second_process_on_the_port_only_reconciles(feed):
+    other = FreshnessFeed(host="127.0.0.1", port=feed.port, reconcile_seconds=0)
+    try:
+        other.start()
+        assert feed.listening
+        assert not other.listening
+        assert not other.stats()["listening"]
+    finally:
+        other.stop()
+
+
+def test_public_host_requires_a_token():
+    with pytest.raises(Exception, match="FRESHNESS_FEED_TOKEN"):
+        FreshnessFeed(host="0.0.0.0", port=free_port(), reconcile_seconds=0).start()
+
+
+def test_token_is_enforced():
+    feed = FreshnessFeed(
+        host="0.0.0.0", port=free_port(), token="secret", reconcile_seconds=0
+    ).start()
+    try:
+        url = f"http://127.0.0.1:{feed.port}/events"
+        event = {
+            "platform_info_id": 7,
+            "table": "daily_insights",
+            "max_date": "2026-10-16",
+        }
+        assert requests.post(url, json=event).status_code == 401
+        headers = {"Authorization": "Bearer secret"}
+        assert requests.post(url, json=event, headers=headers).status_code == 200
+    finally:
+        feed.stop()
+
+
+def event(max_date, platform_info_id=7):
+    return FreshnessEvent.from_dict(
+        {
+            "platform_info_id": platform_info_id,
+            "table": "daily_insights",
+            "max_date": max_date,
+        }
+    )
+
+
+def test_future_dated_event_is_rejected():
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    assert event(today + datetime.timedelta(days=1)).max_date > today
+    with pytest.raises(Exception, match="future"):
+        event(today + datetime.timedelta(days=2))
+
+
+def test_reconcile_resets_a_mark_ahead_of_sql():
+    index = FreshnessIndex()
+    index.set_owners([(7, 1, AdvertisementChannel.FACEBOOK.value)])
+    index.apply(event("2026-10-16"))
+    as_of = datetime.datetime.now() + datetime.timedelta(seconds=1)
+
+    key = (7, "daily_insights")
+    assert index.reconcile({key: datetime.date(2026, 10, 10)}, as_of=as_of) == 0
+    assert index.get(7, "daily_insights") == datetime.date(2026, 10, 10)
+    assert index.get_for_brand(
+        1, AdvertisementChannel.FACEBOOK, "daily_insights"
+    ) == datetime.date(2026, 10, 10)
+    assert index.stats()["reconcile_resets"] == 1
+
+
+def test_reconcile_keeps_a_mark_set_during_the_sql_read():
+    index = FreshnessIndex()
+    as_of = datetime.datetime.now() - datetime.timedelta(seconds=1)
+    index.apply(event("2026-10-16"))
+    index.reconcile({(7, "daily_insights"): datetime.date(2026, 10, 10)}, as_of=as_of)
+    assert index.get(7, "daily_insights") == datetime.date(2026, 10, 16)
@@ -0,0 +1,63 @@
+import pytest
+import sqlalchemy
+
+from src.sql import instrumentation
+
+
+@pytest.fixture
+def engine():
+    engine = sqlalchemy.create_engine("sqlite://")
+    instrumentation.instrument(engine)
+    instrumentation.reset()
+    yield engine
+    instrumentation.reset()
+    engine.dispose()
+
+
+def select_in(conn, ids):
+    return conn.execute(
+        sqlalchemy.text("SELECT :x AS x WHERE 1 IN :ids").bindparams(
+            sqlalchemy.bindparam("ids", expanding=True)
+        ),
+        {"x": 1, "ids": ids},
+    ).all()
+
+
+def test_in_lists_of_any_length_share_one_entry(engine):
+    with engine.connect() as conn:
+        for n in (1, 5, 50):
+            select_in(conn, list(range(n)))
+    [stats] = instrumentation.get_query_stats()
+    assert stats["count"] == 3
+    assert "IN (...)" in stats["statement"]
+
+
+def test_failed_statements_do_not_leak_start_times(engine):
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(sqlalchemy.exc.OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+        assert not conn.info["query_start"]
+        conn.exec_driver_sql("SELECT 1").all()
+    assert [s["count"] for s in instrumentation.get_query_stats()] == [1]
+
+
+def test_unknown_rowcounts_are_not_summed(engine):
+    with engine.connect() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        conn.exec_driver_sql("INSERT INTO t VALUES (1), (2)")
+        conn.exec_driver_sql("SELECT x FROM t").all()
+    rows = {s["statement"]: s["rows"] for s in instrumentation.get_query_stats()}
+    assert rows["INSERT INTO t VALUES (1), (2)"] == 2
+    assert rows["SELECT x FROM t"] is None
+
+
+def test_statement_table_is_capped(engine, monkeypatch):
+    monkeypatch.setattr(instrumentation, "MAX_TRACKED_STATEMENTS", 3)
+    with engine.connect() as conn:
+        for n in range(10):
+            conn.exec_driver_sql(f"SELECT {n}").all()
+    stats = instrumentation.get_query_stats()
+    assert len(stats) == 4
+    other = [s for s in stats if s["statement"] == instrumentation.OTHER_STATEMENTS]
+    assert other[0]["count"] == 7
@@ -0,0 +1,37 @@
+import datetime
+
+import pytest
+
+from src import refresh
+from src.sql import engine as sql_engine
+from src.sql import sql_manager
+from src.sql.fixture import create_fixture_engine, seed_fixture
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+
+@pytest.fixture
+def fixture_db(tmp_path):
+    url = f"sqlite:///{tmp_path}/fixture.sqlite"
+    seed_fixture(
+        create_fixture_engine(url),
+        n_brands=10,
+        insight_rows_per_platform_info=5,
+        entities_per_platform_info=1,
+        today=NOW.date(),
+    )
+    sql_engine.use_database_url(url)
+    yield
+    sql_engine.shutdown()
+
+
+def test_shard_without_platform_infos_is_empty(fixture_db):
+    assert refresh.refresh_shard([99999], now=NOW).empty
+
+
+def test_empty_shard_does_not_abort_the_rebuild(fixture_db):
+    brand_ids = sql_manager.get_all_brand_ids()[:1]
+    # Sorted contiguous shards put 99999 in a shard of its own.
+    report = refresh.run_refresh(brand_ids=brand_ids + [99999], shards=2, now=NOW)
+    assert set(report["brand_id"]) == set(brand_ids)
+    assert "volume_status" in report.columns
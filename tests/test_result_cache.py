@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from src.sql import engine as sql_engine
+from src.sql import result_cache
+from src.sql.result_cache import ResultCache, cached_result
+
+
+class SlowQuery:
+    def __init__(self, values=None, delay=0.2):
+        self.values = values or ["rows"]
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            value = self.values[min(self.calls, len(self.values)) - 1]
+        time.sleep(self.delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def run_concurrently(func, n=8):
+    results = []
+    errors = []
+
+    def call():
+        try:
+            results.append(func())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_misses_share_one_fill():
+    cache = ResultCache(path=None)
+    query = SlowQuery()
+    results, errors = run_concurrently(
+        lambda: cache.get_or_fill("stats", "stats:1", query, ttl=60)
+    )
+
+    assert query.calls == 1
+    assert results == ["rows"] * 8 and not errors
+    stats = cache.stats()["stats"]
+    assert stats["misses"] + stats["coalesced"] + stats["memory_hits"] == 8
+    assert stats["misses"] == 1 and stats["fills"] == 1
+
+
+def test_failed_fill_reaches_every_waiter_and_is_retried():
+    cache = ResultCache(path=None)
+    query = SlowQuery(values=[Exception("deadlock"), "rows"])
+    results, errors = run_concurrently(
+        lambda: cache.get_or_fill("stats", "stats:1", query, ttl=60)
+    )
+    assert query.calls == 1
+    assert not results and len(errors) == 8
+
+    assert cache.get_or_fill("stats", "stats:1", query, ttl=60) == "rows"
+    assert query.calls == 2
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    cache = ResultCache(path=None)
+    query = SlowQuery(values=["old", "new"])
+    assert cache.get_or_fill("stats", "k", query, ttl=60, stale_ttl=600) == "old"
+
+    now[0] += 120
+    results, _ = run_concurrently(
+        lambda: cache.get_or_fill("stats", "k", query, ttl=60, stale_ttl=600)
+    )
+    assert results == ["old"] * 8
+    deadline = time.monotonic() + 5
+    while cache.stats()["stats"]["fills"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert query.calls == 2
+    assert cache.get_or_fill("stats", "k", query, ttl=60, stale_ttl=600) == "new"
+
+
+def test_disk_tier_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    query = SlowQuery(delay=0)
+    ResultCache(path=path).get_or_fill("stats", "k", query, ttl=60)
+
+    other = ResultCache(path=path)
+    assert other.get_or_fill("stats", "k", query, ttl=60) == "rows"
+    assert query.calls == 1
+    assert other.stats()["stats"]["disk_hits"] == 1
+
+
+@pytest.fixture
+def shared_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        result_cache, "_result_cache", ResultCache(path=str(tmp_path / "c.sqlite"))
+    )
+    yield
+    sql_engine.shutdown()
+
+
+def test_cached_results_are_keyed_by_database(tmp_path, shared_cache, monkeypatch):
+    monkeypatch.setattr(sql_engine, "DB_URL", None)
+    calls = []
+
+    @cached_result(ttl=60)
+    def get_brand_count(table):
+        calls.append(sql_engine.DB_URL)
+        return sql_engine.DB_URL
+
+    first = f"sqlite:///{tmp_path}/first.sqlite"
+    second = f"sqlite:///{tmp_path}/second.sqlite"
+    sql_engine.use_database_url(first)
+    assert get_brand_count("Brand") == first
+    assert get_brand_count("Brand") == first
+    sql_engine.use_database_url(second)
+    assert get_brand_count("Brand") == second
+    assert calls == [first, second]
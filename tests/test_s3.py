@@ -0,0 +1,96 @@
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import s3
+from src.s3 import CachedS3Reader, S3Storage
+
+BUCKET = "dashboard-test"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    for name, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }.items():
+        monkeypatch.setenv(name, value)
+    with mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def reader(client, tmp_path):
+    return CachedS3Reader(client=client, cache_dir=str(tmp_path), revalidate_after=0)
+
+
+@pytest.fixture
+def storage(client, reader, monkeypatch):
+    monkeypatch.setattr(s3, "_client", client)
+    monkeypatch.setattr(s3, "_reader", reader)
+    return S3Storage(BUCKET)
+
+
+def test_first_read_downloads_and_caches(client, reader):
+    client.put_object(Bucket=BUCKET, Key="report.html", Body=b"<p>ok</p>")
+    assert reader.read(BUCKET, "report.html") == b"<p>ok</p>"
+    assert reader.get_metrics()["downloads"] == 1
+    assert reader.get_metrics()["bytes_downloaded"] == len(b"<p>ok</p>")
+
+
+def test_unchanged_object_is_revalidated_with_a_304(client, reader):
+    client.put_object(Bucket=BUCKET, Key="report.html", Body=b"<p>v1</p>")
+    reader.read(BUCKET, "report.html")
+    assert reader.read(BUCKET, "report.html") == b"<p>v1</p>"
+    assert reader.get_metrics()["not_modified"] == 1
+    assert reader.get_metrics()["downloads"] == 1
+
+    client.put_object(Bucket=BUCKET, Key="report.html", Body=b"<p>v2</p>")
+    assert reader.read(BUCKET, "report.html") == b"<p>v2</p>"
+    assert reader.get_metrics()["downloads"] == 2
+
+
+def test_recently_checked_object_skips_s3(client, tmp_path):
+    reader = CachedS3Reader(client=client, cache_dir=str(tmp_path))
+    client.put_object(Bucket=BUCKET, Key="report.html", Body=b"<p>v1</p>")
+    reader.read(BUCKET, "report.html")
+    client.put_object(Bucket=BUCKET, Key="report.html", Body=b"<p>v2</p>")
+    assert reader.read(BUCKET, "report.html") == b"<p>v1</p>"
+    assert reader.get_metrics()["fresh_hits"] == 1
+
+
+def test_large_html_is_stored_gzipped_and_read_back_decoded(client, storage):
+    html = b"<tr><td>brand</td></tr>" * (s3.S3_GZIP_MIN_BYTES // 10)
+    storage.put("report.html", html, content_type="text/html")
+
+    stored = client.get_object(Bucket=BUCKET, Key="report.html")
+    assert stored["ContentEncoding"] == "gzip"
+    assert len(stored["Body"].read()) < len(html)
+    assert storage.get("report.html") == html
+
+
+def test_missing_key_is_none(storage):
+    assert storage.get("insights_stats/LATEST") is None
+
+
+def test_least_recently_read_objects_are_evicted_by_size(client, tmp_path):
+    reader = CachedS3Reader(
+        client=client, cache_dir=str(tmp_path), max_bytes=300, revalidate_after=0
+    )
+    for index, key in enumerate("abc"):
+        client.put_object(Bucket=BUCKET, Key=key, Body=key.encode() * 100)
+        reader.read(BUCKET, key)
+        # Read order, whatever the filesystem's timestamp resolution.
+        os.utime(reader._paths(BUCKET, key)[0], (index, index))
+    # Reading "a" again makes "b" the least recently read.
+    assert reader.read(BUCKET, "a") == b"a" * 100
+
+    client.put_object(Bucket=BUCKET, Key="d", Body=b"d" * 100)
+    reader.read(BUCKET, "d")
+    cached = {key for key in "abcd" if os.path.exists(reader._paths(BUCKET, key)[0])}
+    assert cached == {"a", "c", "d"}
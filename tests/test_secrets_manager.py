@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src import secrets_manager
+from src.secrets_manager import SecretCache
+
+
+class FakeClient:
+    def __init__(self, values=None, gate=None):
+        self.values = values or [{"DB_USER": "dashboard"}]
+        self.gate = gate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_secret_value(self, SecretId):
+        with self._lock:
+            self.calls += 1
+            value = self.values[min(self.calls, len(self.values)) - 1]
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        if isinstance(value, Exception):
+            raise value
+        return {"SecretString": json.dumps(value)}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def test_concurrent_misses_share_one_fetch():
+    gate = threading.Event()
+    client = FakeClient(gate=gate)
+    cache = SecretCache(client, ttl=60, refresh_ahead=0)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("prod")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: cache.stats()["misses"] == 8)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 1
+    assert results == [{"DB_USER": "dashboard"}] * 8
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 8,
+        "refreshes": 0,
+        "refresh_errors": 0,
+        "entries": 1,
+    }
+
+
+def test_failed_fetch_is_raised_to_every_waiter_and_not_cached():
+    client = FakeClient(values=[Exception("throttled"), {"DB_USER": "dashboard"}])
+    cache = SecretCache(client, ttl=60, refresh_ahead=0)
+    with pytest.raises(Exception, match="throttled"):
+        cache.get("prod")
+    assert cache.get("prod") == {"DB_USER": "dashboard"}
+    assert client.calls == 2
+
+
+def test_hits_near_expiry_refresh_in_background(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(secrets_manager.time, "monotonic", lambda: now[0])
+    client = FakeClient(values=[{"v": 1}, {"v": 2}])
+    cache = SecretCache(client, ttl=300, refresh_ahead=60)
+
+    assert cache.get("prod") == {"v": 1}
+    now[0] += 100
+    assert cache.get("prod") == {"v": 1}
+    assert client.calls == 1
+
+    # Inside the refresh-ahead window the cached value is still served.
+    now[0] += 150
+    assert cache.get("prod") == {"v": 1}
+    wait_for(lambda: cache.stats()["refreshes"] == 1)
+    assert cache.get("prod") == {"v": 2}
+    assert client.calls == 2
+    assert cache.stats()["hits"] == 3
+
+
+def test_failed_refresh_keeps_serving_until_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(secrets_manager.time, "monotonic", lambda: now[0])
+    client = FakeClient(
+        values=[{"v": 1}, Exception("throttled"), Exception("throttled"), {"v": 3}]
+    )
+    cache = SecretCache(client, ttl=300, refresh_ahead=60)
+
+    cache.get("prod")
+    now[0] += 250
+    assert cache.get("prod") == {"v": 1}
+    wait_for(lambda: cache.stats()["refresh_errors"] == 1)
+    assert cache.get("prod") == {"v": 1}
+    wait_for(lambda: cache.stats()["refresh_errors"] == 2)
+
+    now[0] += 100
+    assert cache.get("prod") == {"v": 3}
+    assert cache.stats()["misses"] == 2
+
+
+def test_invalidate_forces_a_fetch():
+    client = FakeClient(values=[{"v": 1}, {"v": 2}])
+    cache = SecretCache(client, ttl=300, refresh_ahead=0)
+    cache.get("prod")
+    cache.invalidate("prod")
+    assert cache.get("prod") == {"v": 2}
+    assert cache.stats()["entries"] == 1
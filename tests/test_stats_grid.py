@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+
+from src import snapshot, stats_grid
+from src.s3 import LocalStorage
+from src.sql import engine as sql_engine
+from src.sql.fixture import create_fixture_engine, seed_fixture
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def snapshot_table(tmp_path):
+    url = f"sqlite:///{tmp_path}/fixture.sqlite"
+    seed_fixture(
+        create_fixture_engine(url),
+        n_brands=20,
+        insight_rows_per_platform_info=5,
+        entities_per_platform_info=0,
+        today=NOW.date(),
+    )
+    sql_engine.use_database_url(url)
+    storage = LocalStorage(str(tmp_path / "snapshots"))
+    try:
+        version = snapshot.produce_snapshot(storage, now=NOW)
+    finally:
+        sql_engine.shutdown()
+    return snapshot.load_snapshot_table(storage, version)
+
+
+def test_grid_pages_a_published_snapshot(snapshot_table):
+    table = stats_grid.with_status(snapshot_table, now=NOW.replace(tzinfo=None))
+    platforms = stats_grid.platform_names(table)
+    assert platforms and platforms == sorted(set(platforms))
+
+    filtered = stats_grid.filter_table(table, platforms=platforms[:1])
+    assert 0 < filtered.num_rows < table.num_rows
+    assert set(filtered["platform"].cast("string").to_pylist()) == {platforms[0]}
+
+    rows, total = stats_grid.get_page(
+        filtered, page=0, page_size=5, sort_by="brand_name", descending=True
+    )
+    assert total == filtered.num_rows
+    assert len(rows) == min(5, total)
+    assert list(rows["brand_name"]) == sorted(rows["brand_name"], reverse=True)
+    assert set(rows["status"].astype(str)) <= {"OK", "WARNING", "FAILED", "UNKNOWN"}